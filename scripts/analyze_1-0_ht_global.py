@@ -3,11 +3,17 @@ Análisis global de la estrategia "Ganando 1-0 al Descanso"
 Evalúa el rendimiento en múltiples ligas del mundo
 """
 
-import pandas as pd
-import glob
+import sys
 from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+import pyarrow.dataset as ds
 from collections import defaultdict
 
+from src.data.global_dataset import DatasetGlobal
+
 # Mapeo de códigos de liga a nombres
 LIGAS_NOMBRES = {
     'E0': 'Premier League',
@@ -35,42 +41,22 @@ LIGAS_NOMBRES = {
 
 def cargar_datos_globales():
     """
-    Carga todos los CSVs descargados
+    Carga del dataset global particionado solo las columnas del análisis
+    (los CSV nuevos se convierten a Parquet antes de leer)
     """
-    data_dir = Path(__file__).parent.parent / 'data' / 'global'
-    csv_files = list(data_dir.glob('*.csv'))
-    
-    print(f"📂 Cargando {len(csv_files)} archivos...")
-    
-    all_data = []
-    
-    for csv_file in csv_files:
-        try:
-            df = pd.read_csv(csv_file, encoding='latin-1', on_bad_lines='skip')
-            
-            # Extraer metadatos del nombre del archivo
-            parts = csv_file.stem.split('_')
-            liga_code = parts[0]
-            temporada = parts[1] if len(parts) > 1 else 'unknown'
-            
-            # Verificar que tiene datos de medio tiempo
-            if 'HTHG' not in df.columns or 'HTAG' not in df.columns:
-                continue
-            
-            # Añadir metadatos
-            df['Liga_Code'] = liga_code
-            df['Liga_Nombre'] = LIGAS_NOMBRES.get(liga_code, liga_code)
-            df['Temporada'] = temporada
-            
-            all_data.append(df)
-            
-        except Exception as e:
-            print(f"  ⚠️ Error en {csv_file.name}: {e}")
-    
-    if not all_data:
+    dataset = DatasetGlobal()
+    dataset.ingerir()
+    
+    # Solo partidos con datos de medio tiempo
+    df_global = dataset.cargar(
+        columnas=['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'HTHG', 'HTAG'],
+        filtro=ds.field('HTHG').is_valid() & ds.field('HTAG').is_valid()
+    )
+    
+    if df_global.empty:
         return None
     
-    df_global = pd.concat(all_data, ignore_index=True)
+    df_global['Liga_Nombre'] = df_global['Liga_Code'].map(LIGAS_NOMBRES).fillna(df_global['Liga_Code'])
     
     print(f"✅ {len(df_global)} partidos cargados de {df_global['Liga_Nombre'].nunique()} ligas")
     
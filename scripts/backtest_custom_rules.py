@@ -8,6 +8,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
 from src.rules.custom_rules import crear_reglas_personalizadas
+from src.data.equipos import REGISTRO_EQUIPOS
 from src.backtest.engine import BacktestEngine
 from src.backtest.metrics import calcular_metricas
 from src.backtest.validation import DataValidator
@@ -24,6 +25,11 @@ def cargar_datos_con_medio_tiempo():
     
     if data_path.exists():
         df = pd.read_parquet(data_path)
+        
+        # IDs canónicos (Gol_2H_Equipos_Grandes filtra por Local_ID/Visitante_ID)
+        if 'Local_ID' not in df.columns or 'Visitante_ID' not in df.columns:
+            df = REGISTRO_EQUIPOS.añadir_ids(df)
+        
         print(f"✅ Datos cargados: {len(df)} partidos")
         return df
     
@@ -55,6 +61,9 @@ def cargar_datos_con_medio_tiempo():
         
         df = df.rename(columns=column_mapping)
         
+        # IDs canónicos (Gol_2H_Equipos_Grandes filtra por Local_ID/Visitante_ID)
+        df = REGISTRO_EQUIPOS.añadir_ids(df)
+        
         # Guardar procesado
         data_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_parquet(data_path, index=False)
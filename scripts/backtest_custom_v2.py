@@ -10,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 import glob
 from src.rules.custom_rules import crear_reglas_personalizadas
+from src.data.equipos import REGISTRO_EQUIPOS
 from src.backtest.validation import DataValidator
 from datetime import datetime
 
@@ -48,6 +49,9 @@ def cargar_datos_originales():
         'B365A': 'Cuota_Visitante'
     })
     
+    # IDs canónicos (Gol_2H_Equipos_Grandes filtra por Local_ID/Visitante_ID)
+    df = REGISTRO_EQUIPOS.añadir_ids(df)
+    
     # Convertir fecha
     df['Fecha'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
     
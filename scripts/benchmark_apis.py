@@ -0,0 +1,100 @@
+"""
+Benchmark de los clientes de API contra el servidor local
+Uso: python scripts/benchmark_apis.py [--peticiones N] [--latencia S]
+
+Levanta ServidorAPI con las fixtures de data/fixtures_api (sin red ni
+API key) y mide el rendimiento de UnifiedAPIClient sin caché, con caché,
+con API-Sports caída (cortacircuitos + TheSportsDB) y el de una jornada
+completa pedida en secuencia frente a AsyncAPIClient.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import logging
+import tempfile
+import time
+from dataclasses import replace
+
+from src.config import API_CONFIG
+from src.data.unified_api import UnifiedAPIClient
+from src.utils.servidor_api import ServidorAPI
+
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def medir(servidor: ServidorAPI, funcion, repeticiones: int):
+    """(segundos, peticiones recibidas por el servidor) de repetir funcion"""
+    servidor.reiniciar_estadisticas()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return time.perf_counter() - inicio, servidor.estadisticas()['peticiones']
+
+
+def jornada_secuencial(cliente: UnifiedAPIClient):
+    """Partidos, clasificación y estadísticas de cada equipo, una petición tras otra"""
+    partidos = cliente.get_proximos_partidos()
+    cliente.api_sports.get_clasificacion()
+    for partido in partidos:
+        for team_id in (partido['local_id'], partido['visitante_id']):
+            cliente.api_sports.get_estadisticas_equipo(team_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de clientes de API con el servidor local")
+    parser.add_argument('--peticiones', type=int, default=50, help="Llamadas por escenario")
+    parser.add_argument('--latencia', type=float, default=0.05, help="Latencia del servidor (s)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp, \
+            ServidorAPI(puerto=0, latencia=args.latencia, limite_dia=10 ** 6, limite_minuto=10 ** 6) as servidor:
+        base = servidor.config_api(replace(
+            API_CONFIG,
+            api_sports_key='benchmark',
+            api_sports_limite_dia=10 ** 6,
+            api_sports_limite_minuto=10 ** 6,
+            cache_path=Path(tmp) / 'api_cache.sqlite'
+        ))
+        sin_cache = replace(base, cache_habilitada=False)
+        
+        resultados = []
+        
+        cliente = UnifiedAPIClient(sin_cache)
+        resultados.append(('Sin caché', args.peticiones,
+                           *medir(servidor, cliente.get_proximos_partidos, args.peticiones)))
+        
+        cliente = UnifiedAPIClient(base)
+        resultados.append(('Con caché', args.peticiones,
+                           *medir(servidor, cliente.get_proximos_partidos, args.peticiones)))
+        
+        servidor.configurar(caidas='api_sports')
+        cliente = UnifiedAPIClient(sin_cache)
+        resultados.append(('API-Sports caída', args.peticiones,
+                           *medir(servidor, cliente.get_proximos_partidos, args.peticiones)))
+        estado_circuito = cliente.get_estado_apis()['api_sports']['circuitos'].get('/fixtures', {}).get('estado')
+        servidor.configurar(caidas='')
+        cliente.reactivar_api_sports()
+        
+        cliente = UnifiedAPIClient(sin_cache)
+        jornadas = max(args.peticiones // 10, 1)
+        resultados.append(('Jornada secuencial', jornadas,
+                           *medir(servidor, lambda: jornada_secuencial(cliente), jornadas)))
+        resultados.append(('Jornada async', jornadas,
+                           *medir(servidor, cliente.get_jornada, jornadas)))
+    
+    print(f"\n📊 Servidor local con {args.latencia * 1000:.0f} ms de latencia")
+    print(f"{'Escenario':>20} | {'Llamadas':>8} | {'Tiempo (s)':>10} | {'Llamadas/s':>10} | {'Al servidor':>11}")
+    print("-" * 72)
+    for nombre, llamadas, segundos, peticiones in resultados:
+        print(f"{nombre:>20} | {llamadas:>8} | {segundos:>10.2f} | {llamadas / segundos:>10.1f} | {peticiones:>11}")
+    print(f"\nCircuito /fixtures con API-Sports caída: {estado_circuito}")
+
+
+if __name__ == "__main__":
+    main()
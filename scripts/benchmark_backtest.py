@@ -0,0 +1,113 @@
+"""
+Benchmark del backtest paralelo
+Uso: python scripts/benchmark_backtest.py [--procesos 1 2 4 8] [--replicas N] [--fila-a-fila] [--compacto]
+
+Ejecuta las reglas de La Liga sobre todos los CSV de data/global con
+distinto número de procesos y muestra tiempo, speedup y si los
+resultados coinciden con la ejecución en serie.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import logging
+import os
+import time
+import pandas as pd
+
+from src.data.cleaner import DataCleaner
+from src.data.feature_engineering import FeatureEngineer
+from src.rules.laliga_rules import crear_reglas_laliga
+from src.backtest.engine import BacktestEngine
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def cargar_dataset_global(compacto: bool = False) -> pd.DataFrame:
+    """Carga data/global/*.csv, limpia (opcionalmente en modo compacto) y genera features"""
+    data_dir = Path(__file__).parent.parent / 'data' / 'global'
+    
+    dfs = []
+    for csv_file in sorted(data_dir.glob('*.csv')):
+        df = pd.read_csv(csv_file, encoding='latin-1', on_bad_lines='skip')
+        temporada = csv_file.stem.split('_')[-1]
+        if temporada.isdigit():
+            df['Temporada'] = f"20{temporada[:2]}-{temporada[2:]}"
+        dfs.append(df)
+    
+    if not dfs:
+        raise FileNotFoundError(f"No hay CSV en {data_dir} (ejecuta download_global_data.py)")
+    
+    df_raw = pd.concat(dfs, ignore_index=True)
+    df_clean = DataCleaner.limpiar(df_raw, compacto=compacto)
+    
+    if compacto:
+        informe = DataCleaner.informe_memoria(df_raw, df_clean)
+        print(
+            f"\n💾 Memoria: {informe['antes_mb']:.1f} MB (crudo, {informe['columnas_antes']} columnas) → "
+            f"{informe['despues_mb']:.1f} MB (compacto, {informe['columnas_despues']} columnas)"
+        )
+    
+    return FeatureEngineer().generar_todas_features(df_clean)
+
+
+def reglas_fila_a_fila():
+    """Reglas de La Liga sin máscara vectorizada (evaluación por fila)"""
+    reglas = crear_reglas_laliga()
+    for regla in reglas:
+        regla.condicion_vectorizada = None
+    return reglas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del backtest paralelo")
+    parser.add_argument('--procesos', type=int, nargs='+', default=None,
+                        help="Números de procesos a probar (por defecto 1, 2, 4... hasta cpu_count)")
+    parser.add_argument('--replicas', type=int, default=1,
+                        help="Replica el dataset N veces para aumentar la carga")
+    parser.add_argument('--fila-a-fila', action='store_true',
+                        help="Evalúa las reglas fila a fila (carga de CPU alta)")
+    parser.add_argument('--compacto', action='store_true',
+                        help="Limpia en modo compacto (category/int8/float32)")
+    args = parser.parse_args()
+    
+    n_cpus = os.cpu_count() or 1
+    procesos = args.procesos or sorted({1, *[2 ** i for i in range(1, n_cpus.bit_length()) if 2 ** i <= n_cpus], n_cpus})
+    
+    df = cargar_dataset_global(compacto=args.compacto)
+    if args.replicas > 1:
+        df = pd.concat([df] * args.replicas, ignore_index=True)
+    
+    reglas = reglas_fila_a_fila() if args.fila_a_fila else crear_reglas_laliga()
+    
+    print(f"\n📊 {len(df)} partidos, {len(reglas)} reglas, {n_cpus} núcleos disponibles")
+    print(f"{'Procesos':>9} | {'Tiempo (s)':>10} | {'Speedup':>7} | Resultados")
+    print("-" * 48)
+    
+    referencia = None
+    tiempo_base = None
+    
+    for n in procesos:
+        inicio = time.perf_counter()
+        resultados = BacktestEngine(df, reglas).ejecutar(verbose=False, n_procesos=n)
+        tiempo = time.perf_counter() - inicio
+        
+        if referencia is None:
+            referencia, tiempo_base = resultados, tiempo
+        
+        iguales = all(
+            resultados[nombre][m] == referencia[nombre][m]
+            for nombre in referencia
+            for m in ('aciertos', 'disparos', 'ganancia_total')
+        )
+        
+        print(f"{n:>9} | {tiempo:>10.2f} | {tiempo_base / tiempo:>6.2f}x | {'✓ iguales' if iguales else '✗ DIFERENTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Latencia de las alertas de descanso contra el servidor local
+Uso: python scripts/benchmark_descanso.py [--rondas N] [--intervalo S] [--latencia S]
+
+Levanta ServidorAPI con las fixtures de data/fixtures_api y sirve tres
+partidos en el minuto 45 de la primera parte. En cada ronda, tras una
+espera aleatoria, el servidor pasa los tres partidos a HT (el "evento")
+y se mide el tiempo hasta que SondeoDescanso genera sus alertas: espera
+al siguiente sondeo + petición + evaluación de las reglas.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import replace
+
+from src.alerts.monitor_live import LiveMonitor
+from src.alerts.sondeo_vivo import SondeoDescanso
+from src.config import ALERT_CONFIG, API_CONFIG
+from src.data.api_sports import APISportsClient
+from src.utils.servidor_api import ServidorAPI
+
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def ronda(servidor: ServidorAPI, cuerpos, config, api_config, espera: float, timeout: float = 30.0):
+    """(latencias evento → alerta, latencias sondeo → alerta) de una ronda"""
+    fixture = servidor.buscar_fixture('api_sports', 'fixtures', {'live': 'all'})
+    fixture.secuencia = [cuerpos['primera_parte']]
+    
+    sondeo = SondeoDescanso(LiveMonitor(config), APISportsClient(api_config), config)
+    hilo = threading.Thread(target=sondeo.ejecutar, daemon=True)
+    hilo.start()
+    
+    time.sleep(espera)
+    evento = time.monotonic()
+    fixture.secuencia = [cuerpos['descanso']]
+    
+    limite = evento + timeout
+    while len(sondeo.descansos) < len(cuerpos['descanso']['response']) and time.monotonic() < limite:
+        time.sleep(0.005)
+    
+    sondeo.detener()
+    hilo.join()
+    return (
+        [d['alertado'] - evento for d in sondeo.descansos],
+        [d['alertado'] - d['sondeo'] for d in sondeo.descansos],
+        sum(d['alertas'] for d in sondeo.descansos),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de las alertas de descanso con el servidor local")
+    parser.add_argument('--rondas', type=int, default=10)
+    parser.add_argument('--intervalo', type=float, default=2.0, help="Intervalo rápido de sondeo (s)")
+    parser.add_argument('--latencia', type=float, default=0.05, help="Latencia del servidor (s)")
+    args = parser.parse_args()
+    
+    # Todas las ligas: la secuencia grabada es /fixtures?live=all y sin calendario se sondea siempre
+    config = replace(ALERT_CONFIG, email_enabled=False, sondeo_intervalo_rapido=args.intervalo, sondeo_ligas=None)
+    rng = random.Random(0)
+    
+    with tempfile.TemporaryDirectory() as tmp, \
+            ServidorAPI(puerto=0, latencia=args.latencia, limite_dia=10 ** 6, limite_minuto=10 ** 6) as servidor:
+        api_config = servidor.config_api(replace(
+            API_CONFIG,
+            api_sports_key='benchmark',
+            api_sports_limite_dia=10 ** 6,
+            api_sports_limite_minuto=10 ** 6,
+            cache_path=Path(tmp) / 'api_cache.sqlite'
+        ))
+        
+        # Minuto 45 de la primera parte y descanso de la secuencia grabada
+        secuencia = servidor.buscar_fixture('api_sports', 'fixtures', {'live': 'all'}).secuencia
+        cuerpos = {'primera_parte': secuencia[2], 'descanso': secuencia[3]}
+        
+        evento_alerta, sondeo_alerta, alertas = [], [], 0
+        for _ in range(args.rondas):
+            latencias, procesado, n = ronda(servidor, cuerpos, config, api_config, rng.uniform(0.2, 0.2 + args.intervalo))
+            evento_alerta.extend(latencias)
+            sondeo_alerta.extend(procesado)
+            alertas += n
+    
+    print(f"\n📊 Descansos: {len(evento_alerta)} en {args.rondas} rondas, {alertas} alertas")
+    print(f"   Sondeo rápido cada {args.intervalo:.1f}s, servidor con {args.latencia * 1000:.0f} ms de latencia\n")
+    print(f"{'Latencia':>22} | {'Mín':>7} | {'Mediana':>7} | {'Máx':>7}")
+    print("-" * 52)
+    for nombre, valores in (('Evento HT → alerta', evento_alerta), ('Sondeo → alerta', sondeo_alerta)):
+        if valores:
+            print(f"{nombre:>22} | {min(valores):>6.3f}s | {statistics.median(valores):>6.3f}s | {max(valores):>6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark de memoria del pipeline
+Uso: python scripts/benchmark_memoria.py [--compacto]
+
+Ejecuta limpieza, features, split train/test y backtest sobre todos los
+CSV de data/global midiendo con tracemalloc el pico de memoria de cada
+paso sobre los datos reales. El ratio es pico / tamaño de la tabla final.
+Los umbrales por paso se comprueban en tests/test_memoria.py.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import logging
+import tracemalloc
+import pandas as pd
+
+from src.data.cleaner import DataCleaner, añadir_columnas
+from src.data.feature_engineering import FeatureEngineer
+from src.rules.laliga_rules import crear_reglas_laliga
+from src.backtest.engine import BacktestEngine
+from src.backtest.validation import DataValidator
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def cargar_csv_globales() -> pd.DataFrame:
+    """Concatena data/global/*.csv sin limpiar"""
+    data_dir = Path(__file__).parent.parent / 'data' / 'global'
+    
+    dfs = []
+    for csv_file in sorted(data_dir.glob('*.csv')):
+        df = pd.read_csv(csv_file, encoding='latin-1', on_bad_lines='skip')
+        temporada = csv_file.stem.split('_')[-1]
+        if temporada.isdigit():
+            df = añadir_columnas(df, {'Temporada': f"20{temporada[:2]}-{temporada[2:]}"})
+        dfs.append(df)
+    
+    if not dfs:
+        raise FileNotFoundError(f"No hay CSV en {data_dir} (ejecuta download_global_data.py)")
+    
+    return pd.concat(dfs, ignore_index=True)
+
+
+def medir(funcion, *args, **kwargs):
+    """Ejecuta funcion y devuelve (resultado, pico de memoria en MB)"""
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria del pipeline")
+    parser.add_argument('--compacto', action='store_true',
+                        help="Limpia en modo compacto (category/int8/float32)")
+    args = parser.parse_args()
+    
+    df_raw = cargar_csv_globales()
+    reglas = crear_reglas_laliga()
+    validator = DataValidator()
+    
+    df_clean, pico_limpieza = medir(DataCleaner.limpiar, df_raw, compacto=args.compacto)
+    df_features, pico_features = medir(FeatureEngineer().generar_todas_features, df_clean)
+    (df_train, df_test), pico_split = medir(validator.split_temporal, df_features)
+    _, pico_backtest = medir(lambda: BacktestEngine(df_features, reglas).ejecutar(verbose=False))
+    
+    tamaño = df_features.memory_usage(deep=True).sum() / 1024 ** 2
+    pasos = {
+        'Limpieza': pico_limpieza,
+        'Features': pico_features,
+        'Split': pico_split,
+        'Backtest': pico_backtest,
+    }
+    
+    print(f"\n📊 {len(df_features)} partidos, {df_features.shape[1]} columnas, {tamaño:.1f} MB con features")
+    print(f"{'Paso':>10} | {'Pico (MB)':>9} | {'Ratio':>6}")
+    print("-" * 32)
+    for paso, pico in pasos.items():
+        print(f"{paso:>10} | {pico:>9.1f} | {pico / tamaño:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
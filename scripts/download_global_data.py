@@ -3,10 +3,14 @@ Script para descargar datos históricos de múltiples ligas
 desde Football-Data.co.uk
 """
 
-import requests
-import pandas as pd
+import sys
 from pathlib import Path
-import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import DATA_CONFIG
+from src.data.downloader import Descargador, DESCARGADO, SIN_CAMBIOS, OMITIDO, ERROR
+from src.data.global_dataset import DatasetGlobal
 
 # Configuración de ligas y temporadas
 LIGAS = {
@@ -37,135 +41,69 @@ LIGAS = {
     'USA': 'MLS'
 }
 
+# Ligas que Football-Data sirve en /new/ (un CSV con todas las temporadas,
+# columnas Home/Away/HG/AG/Res; src/data/esquemas.py las normaliza)
+LIGAS_EXTRA = ['ARG', 'BRA', 'MX1', 'USA']
+
 # Temporadas a descargar (últimas 7 temporadas)
 TEMPORADAS = [
     '1819', '1920', '2021', '2122', '2223', '2324', '2425'
 ]
 
-BASE_URL = 'https://www.football-data.co.uk/mmz4281'
-
-
-def descargar_liga_temporada(liga_code: str, temporada: str, output_dir: Path) -> bool:
-    """
-    Descarga datos de una liga y temporada específica
-    
-    Args:
-        liga_code: Código de la liga (ej: 'E0', 'SP1')
-        temporada: Código de temporada (ej: '2425')
-        output_dir: Directorio de salida
-    
-    Returns:
-        True si se descargó exitosamente
-    """
-    url = f"{BASE_URL}/{temporada}/{liga_code}.csv"
-    
-    try:
-        print(f"  Descargando {liga_code} {temporada}...", end=" ")
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            # Guardar CSV
-            filename = output_dir / f"{liga_code}_{temporada}.csv"
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            
-            print("✅")
-            return True
-        else:
-            print(f"❌ (HTTP {response.status_code})")
-            return False
-    
-    except Exception as e:
-        print(f"❌ ({str(e)})")
-        return False
-
-
-def descargar_todas_las_ligas():
+def descargar_todas_las_ligas(refrescar: bool = False):
     """
     Descarga datos de todas las ligas configuradas
+    
+    Las descargas se hacen en paralelo (Descargador). Los ficheros ya
+    descargados solo se revalidan si son de la temporada en curso o con
+    refrescar=True; si no han cambiado, el servidor responde 304.
     """
-    output_dir = Path(__file__).parent.parent / 'data' / 'global'
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = DATA_CONFIG.global_csv_dir
+    ligas_temporada = [liga_code for liga_code in LIGAS if liga_code not in LIGAS_EXTRA]
     
     print("="*70)
     print("📥 DESCARGA DE DATOS GLOBALES")
     print("="*70)
     print(f"\nLigas a descargar: {len(LIGAS)}")
-    print(f"Temporadas por liga: {len(TEMPORADAS)}")
-    print(f"Total archivos: {len(LIGAS) * len(TEMPORADAS)}\n")
+    print(f"Temporadas por liga: {len(TEMPORADAS)} ({len(LIGAS_EXTRA)} ligas extra en un único fichero)")
+    print(f"Total archivos: {len(ligas_temporada) * len(TEMPORADAS) + len(LIGAS_EXTRA)}\n")
     
-    exitosos = 0
-    fallidos = 0
-    
-    for liga_code, liga_nombre in LIGAS.items():
-        print(f"\n🏆 {liga_nombre} ({liga_code})")
-        
-        for temporada in TEMPORADAS:
-            if descargar_liga_temporada(liga_code, temporada, output_dir):
-                exitosos += 1
-            else:
-                fallidos += 1
-            
-            # Pausa para no saturar el servidor
-            time.sleep(0.5)
+    descargador = Descargador()
+    pares = [(liga_code, temporada) for liga_code in ligas_temporada for temporada in TEMPORADAS]
+    estados = descargador.descargar_temporadas(pares, output_dir, refrescar=refrescar)
+    estados.update(descargador.descargar_ligas_extra(LIGAS_EXTRA, output_dir))
     
     print("\n" + "="*70)
     print("📊 RESUMEN DE DESCARGA")
     print("="*70)
-    print(f"✅ Exitosos: {exitosos}")
-    print(f"❌ Fallidos: {fallidos}")
+    print(f"✅ Descargados: {sum(e == DESCARGADO for e in estados.values())}")
+    print(f"♻️ Sin cambios: {sum(e == SIN_CAMBIOS for e in estados.values())}")
+    print(f"⏭ Ya existentes: {sum(e == OMITIDO for e in estados.values())}")
+    print(f"❌ Fallidos: {sum(e == ERROR for e in estados.values())}")
     print(f"📁 Directorio: {output_dir}")
     print("="*70 + "\n")
 
 
 def consolidar_datos():
     """
-    Consolida todos los CSVs descargados en un solo DataFrame
+    Convierte los CSVs descargados en el dataset Parquet particionado
+    (data/processed/global_dataset/Liga_Code=.../Temporada=...) y lo carga
     """
-    data_dir = Path(__file__).parent.parent / 'data' / 'global'
-    
-    if not data_dir.exists():
-        print("❌ No hay datos descargados")
-        return None
-    
     print("\n📊 Consolidando datos...")
     
-    all_dfs = []
-    csv_files = list(data_dir.glob('*.csv'))
-    
-    for csv_file in csv_files:
-        try:
-            df = pd.read_csv(csv_file, encoding='latin-1', on_bad_lines='skip')
-            
-            # Extraer liga y temporada del nombre del archivo
-            parts = csv_file.stem.split('_')
-            liga_code = parts[0]
-            temporada = parts[1] if len(parts) > 1 else 'unknown'
-            
-            # Añadir columnas de metadatos
-            df['Liga_Code'] = liga_code
-            df['Liga_Nombre'] = LIGAS.get(liga_code, 'Unknown')
-            df['Temporada'] = temporada
-            
-            all_dfs.append(df)
-            
-        except Exception as e:
-            print(f"  ⚠️ Error leyendo {csv_file.name}: {e}")
+    dataset = DatasetGlobal()
     
-    if not all_dfs:
-        print("❌ No se pudieron leer datos")
+    try:
+        dataset.ingerir()
+        df_global = dataset.cargar()
+    except FileNotFoundError:
+        print("❌ No hay datos descargados")
         return None
     
-    # Concatenar todos los DataFrames
-    df_global = pd.concat(all_dfs, ignore_index=True)
-    
-    # Guardar consolidado
-    output_file = data_dir.parent / 'processed' / 'global_consolidated.parquet'
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    df_global.to_parquet(output_file, index=False)
+    df_global['Liga_Nombre'] = df_global['Liga_Code'].map(LIGAS).fillna('Unknown')
     
     print(f"✅ Datos consolidados: {len(df_global)} partidos")
-    print(f"✅ Guardado en: {output_file}")
+    print(f"✅ Dataset particionado en: {dataset.directorio}")
     
     return df_global
 
@@ -10,9 +10,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import logging
+from src.config import DATA_CONFIG
 from src.data.loader import LaLigaLoader
 from src.data.cleaner import DataCleaner
-from src.data.feature_engineering import FeatureEngineer
+from src.data.feature_cache import FeatureCache
 from src.rules.laliga_rules import crear_reglas_laliga
 from src.backtest.engine import BacktestEngine
 from src.backtest.validation import DataValidator
@@ -54,7 +55,7 @@ def main():
         df_raw = loader.cargar_todas_temporadas()
         
         cleaner = DataCleaner()
-        df = cleaner.limpiar(df_raw)
+        df = cleaner.limpiar(df_raw, compacto=DATA_CONFIG.modo_compacto)
         
         # Guardar para futuros usos
         loader.guardar_procesado(df, 'laliga_completo')
@@ -65,16 +66,10 @@ def main():
     # =============================================
     logger.info("🔧 PASO 2: Generando features...\n")
     
-    try:
-        df_features = loader.cargar_procesado('laliga_features')
-        logger.info("✓ Features cargadas desde caché\n")
-    except FileNotFoundError:
-        engineer = FeatureEngineer()
-        df_features = engineer.generar_todas_features(df)
-        
-        # Guardar features
-        loader.guardar_procesado(df_features, 'laliga_features')
-        logger.info("")
+    # Caché por FeatureConfig + huella de los datos: nunca devuelve features obsoletas
+    cache = FeatureCache()
+    df_features = cache.obtener_o_calcular(df)
+    logger.info("")
     
     # =============================================
     # PASO 3: SPLIT TRAIN/TEST
@@ -125,6 +120,10 @@ def main():
     else:
         logger.info("✓ No se detectó overfitting significativo\n")
     
+    # Walk-forward: varios orígenes en lugar de un único corte train/test
+    walk_forward = validator.walk_forward(df_features, reglas)
+    walk_forward['folds'].to_csv('outputs/reports/walk_forward_folds.csv', index=False)
+    
     # =============================================
     # PASO 7: EXPORTAR RESULTADOS
     # =============================================
@@ -0,0 +1,69 @@
+"""
+Servidor local de APIs (API-Sports y TheSportsDB) con respuestas grabadas
+Uso: python scripts/servidor_api.py [--puerto 8765] [--latencia S] [--prob-429 P] [--caida RUTA] [--grabar]
+
+Sirve las fixtures de data/fixtures_api. Para usarlo desde otro proceso:
+    API_SPORTS_BASE_URL=http://127.0.0.1:8765/api_sports
+    THESPORTSDB_BASE_URL=http://127.0.0.1:8765/thesportsdb
+Los fallos se cambian en caliente con /_control?latencia=0.5&caidas=api_sports
+y las peticiones servidas se consultan en /_estadisticas.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import logging
+import time
+
+from src.utils.servidor_api import ServidorAPI, DIRECTORIO_FIXTURES
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de APIs con fixtures grabadas")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--directorio', type=Path, default=DIRECTORIO_FIXTURES)
+    parser.add_argument('--latencia', type=float, default=0.0, help="Segundos de latencia por petición")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latencia extra aleatoria (0..jitter s)")
+    parser.add_argument('--prob-429', type=float, default=0.0, help="Probabilidad de responder 429")
+    parser.add_argument('--prob-error', type=float, default=0.0, help="Probabilidad de responder 500")
+    parser.add_argument('--caida', action='append', default=[],
+                        help="Prefijo de ruta caído (503): api_sports, api_sports/fixtures, '*'")
+    parser.add_argument('--limite-dia', type=int, default=100, help="Cuota diaria simulada de API-Sports")
+    parser.add_argument('--limite-minuto', type=int, default=10, help="Peticiones por minuto antes de 429")
+    parser.add_argument('--grabar', action='store_true',
+                        help="Reenvía al origen real las peticiones sin fixture y las guarda")
+    args = parser.parse_args()
+    
+    servidor = ServidorAPI(
+        directorio=args.directorio,
+        puerto=args.puerto,
+        latencia=args.latencia,
+        jitter=args.jitter,
+        prob_429=args.prob_429,
+        prob_error=args.prob_error,
+        caidas=args.caida,
+        limite_dia=args.limite_dia,
+        limite_minuto=args.limite_minuto,
+        grabar=args.grabar
+    ).iniciar()
+    
+    print(f"\nexport API_SPORTS_BASE_URL={servidor.url_api_sports}")
+    print(f"export THESPORTSDB_BASE_URL={servidor.url_thesportsdb}\n")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.detener()
+        logger.info(f"Peticiones servidas: {servidor.estadisticas()['por_estado']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Script para iniciar el monitor de descansos en directo
+Uso: python scripts/start_live_monitor.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+from src.alerts.sondeo_vivo import SondeoDescanso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('outputs/logs/monitor_live.log')
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Inicia el sondeo de partidos en directo y las alertas de medio tiempo"""
+    
+    logger.info("\n" + "="*70)
+    logger.info("🚀 ALERTAS DE MEDIO TIEMPO - EN DIRECTO")
+    logger.info("="*70 + "\n")
+    
+    sondeo = SondeoDescanso()
+    sondeo.ejecutar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 """
 Script de actualización de datos
-Uso: python scripts/update_data.py
+Uso: python scripts/update_data.py [--verificar]
+
+Las features se calculan solo para los partidos nuevos (FeatureStore).
+Con --verificar se comparan contra un recálculo completo.
 """
 
 import sys
@@ -8,10 +11,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import argparse
 import logging
 from src.data.loader import LaLigaLoader
 from src.data.cleaner import DataCleaner
-from src.data.feature_engineering import FeatureEngineer
+from src.data.feature_store import FeatureStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +28,14 @@ logger = logging.getLogger(__name__)
 def main():
     """Actualiza datos desde football-data.co.uk"""
     
+    parser = argparse.ArgumentParser(description="Actualiza datos y features")
+    parser.add_argument(
+        '--verificar',
+        action='store_true',
+        help="Comprueba que las features incrementales coinciden con un recálculo completo"
+    )
+    args = parser.parse_args()
+    
     logger.info("\n" + "="*60)
     logger.info("🔄 ACTUALIZACIÓN DE DATOS")
     logger.info("="*60 + "\n")
@@ -36,13 +48,16 @@ def main():
     cleaner = DataCleaner()
     df_clean = cleaner.limpiar(df_raw)
     
-    # Generar features
-    engineer = FeatureEngineer()
-    df_features = engineer.generar_todas_features(df_clean)
+    # Generar features (solo partidos nuevos) y guardar junto al estado por equipo
+    store = FeatureStore(loader.config)
+    store.actualizar(df_clean)
     
     # Guardar
     loader.guardar_procesado(df_clean, 'laliga_completo')
-    loader.guardar_procesado(df_features, 'laliga_features')
+    
+    if args.verificar and not store.verificar(df_clean):
+        logger.error("\n❌ Las features incrementales no coinciden con el recálculo completo\n")
+        sys.exit(1)
     
     logger.info("\n✅ Datos actualizados correctamente\n")
 
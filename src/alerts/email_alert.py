@@ -169,3 +169,28 @@ class EmailAlertSystem:
         except Exception as e:
             logger.error(f"✗ Error enviando resumen: {e}")
 
+
+
+class EmailAlert:
+    """
+    Envío de alertas ya construidas por los monitores de reglas
+    
+    Recibe el dict de alerta completo (partido, regla, tipo de apuesta,
+    cuota, confianza y stake) y lo envía con EmailAlertSystem.
+    """
+    
+    def __init__(self, config=ALERT_CONFIG):
+        self.sistema = EmailAlertSystem(config)
+    
+    def enviar_alerta(self, alerta: Dict[str, Any]) -> bool:
+        partido = {
+            **alerta['partido'],
+            'tipo_apuesta': alerta.get('tipo_apuesta', 'N/A'),
+            'cuota': alerta.get('cuota', 0),
+        }
+        return self.sistema.enviar_alerta(
+            partido=partido,
+            regla=alerta['regla'],
+            confianza=alerta['confianza'],
+            stake_recomendado=alerta['stake']
+        )
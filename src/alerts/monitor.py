@@ -3,6 +3,7 @@ Monitor de alertas automáticas
 Responsabilidad: Evaluar próximos partidos y enviar alertas
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Dict
 from datetime import datetime
@@ -10,25 +11,121 @@ import logging
 import time
 
 from src.data.unified_api import UnifiedAPIClient
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.data.feature_store import FeatureStore, TablaEstadoEquipos
+from src.rules.base import Regla
+from src.rules.dsl import Condicion
 from src.rules.laliga_rules import crear_reglas_laliga
+from src.rules.evaluador import EvaluadorReglas
 from src.risk.kelly import recomendar_stake
 from src.alerts.email_alert import EmailAlertSystem
+from src.alerts.registro_alertas import clave_alerta, registro_compartido
 from src.config import ALERT_CONFIG
 
 logger = logging.getLogger(__name__)
 
 
+# Cuotas que puede traer un partido normalizado -> columnas de las reglas
+COLUMNAS_CUOTAS = {
+    'cuota_local': 'Cuota_Local',
+    'cuota_empate': 'Cuota_Empate',
+    'cuota_visitante': 'Cuota_Visitante',
+    'cuota_btts': 'Cuota_BTTS',
+}
+
+# Columna de cuota según Regla.tipo_apuesta
+CUOTA_POR_APUESTA = {
+    'Local': 'Cuota_Local',
+    'Visitante': 'Cuota_Visitante',
+    'Empate': 'Cuota_Empate',
+    'BTTS': 'Cuota_BTTS',
+}
+
+
+def preparar_partidos(partidos: List[Dict], estado_equipos: TablaEstadoEquipos) -> pd.DataFrame:
+    """
+    Convierte partidos de la API al formato evaluable por las reglas
+    
+    Las features de cada equipo salen de la tabla de estado actual
+    (FeatureStore) en un solo paso vectorizado. Las cuotas salen de las
+    claves cuota_* (UnifiedAPIClient.añadir_cuotas); las que no trae el
+    partido quedan a NaN, así que las reglas que las usan no disparan.
+    
+    Args:
+        partidos: Lista de dicts normalizados (UnifiedAPIClient)
+        estado_equipos: Tabla de features actuales por ID de equipo
+    
+    Returns:
+        DataFrame con un partido por fila, en el mismo orden
+    """
+    df = pd.DataFrame(partidos)
+    if df.empty:
+        return df
+    
+    # IDs canónicos (los trae el cliente unificado; si no, se resuelven por nombre)
+    for prefijo, columna in (('local', 'Local_ID'), ('visitante', 'Visitante_ID')):
+        ids = REGISTRO_EQUIPOS.ids(df[prefijo])
+        if f'{prefijo}_equipo_id' in df.columns:
+            ids = df[f'{prefijo}_equipo_id'].fillna(pd.Series(ids, index=df.index)).to_numpy(dtype=np.int64)
+        df[columna] = ids
+    
+    resultado = pd.DataFrame({
+        'Date': df['fecha'].to_numpy(),
+        'Local': df['local'].to_numpy(),
+        'Visitante': df['visitante'].to_numpy(),
+        'Local_ID': df['Local_ID'].to_numpy(),
+        'Visitante_ID': df['Visitante_ID'].to_numpy(),
+    })
+    
+    for origen, columna in COLUMNAS_CUOTAS.items():
+        if origen in df.columns:
+            resultado[columna] = pd.to_numeric(df[origen], errors='coerce').to_numpy(dtype=float)
+        else:
+            resultado[columna] = np.nan
+    
+    features = estado_equipos.features_partidos(resultado['Local_ID'], resultado['Visitante_ID'])
+    return pd.concat([resultado, features], axis=1)
+
+
+def reglas_con_cuotas(reglas: List[Regla]) -> List[str]:
+    """Nombres de las reglas cuya condición usa alguna columna de cuota"""
+    cuotas = set(COLUMNAS_CUOTAS.values())
+    return [
+        regla.nombre for regla in reglas
+        if isinstance(regla.condicion, Condicion) and regla.condicion.columnas & cuotas
+    ]
+
+
+def avisar_sin_cuotas(df: pd.DataFrame, reglas: List[str]):
+    """Avisa de los partidos sin cuotas 1X2: en ellos no pueden disparar las reglas con cuota"""
+    if df.empty or not reglas:
+        return
+    
+    sin_cuotas = int(df['Cuota_Local'].isna().sum())
+    if sin_cuotas == len(df):
+        logger.warning(f"⚠️ Ningún partido con cuotas 1X2: desactivadas en este ciclo {', '.join(reglas)}")
+    elif sin_cuotas:
+        logger.warning(f"⚠️ {sin_cuotas}/{len(df)} partidos sin cuotas 1X2: en ellos no disparan {', '.join(reglas)}")
+
+
 class AlertMonitor:
     """Monitor que evalúa próximos partidos y genera alertas"""
     
-    def __init__(self, config=ALERT_CONFIG):
+    def __init__(self, config=ALERT_CONFIG, feature_store: FeatureStore = None):
         self.config = config
         self.api_client = UnifiedAPIClient()
+        self.feature_store = feature_store or FeatureStore()
+        self.estado_equipos = None
+        self._version_estado = None
+        self._cargar_estado_equipos()
         self.reglas = crear_reglas_laliga()
         self.email_system = EmailAlertSystem(config)
+        self.registro = registro_compartido(config)
         
         # Filtrar solo reglas activas y rentables
         self.reglas_activas = [r for r in self.reglas if r.activa]
+        self.evaluador = EvaluadorReglas(self.reglas_activas)
+        self.reglas_cuotas = reglas_con_cuotas(self.reglas_activas)
         logger.info(f"✓ Monitor inicializado con {len(self.reglas_activas)} reglas activas")
     
     def evaluar_proximos_partidos(self, dias: int = 7) -> List[Dict]:
@@ -54,85 +151,77 @@ class AlertMonitor:
         
         logger.info(f"📅 Partidos a evaluar: {len(partidos)}\n")
         
+        # Cuotas 1X2 (una petición por día) para las reglas que las usan
+        self.api_client.añadir_cuotas(partidos)
+        
+        # Features reales de todos los partidos y todas las reglas de una vez
+        self._cargar_estado_equipos()
+        df_partidos = self.preparar_partidos(partidos)
+        avisar_sin_cuotas(df_partidos, self.reglas_cuotas)
+        disparos = self.evaluador.disparos(df_partidos)
+        cuotas = self.evaluador.cuotas(df_partidos, disparos, CUOTA_POR_APUESTA)
+        
         alertas = []
         
-        for partido in partidos:
-            logger.info(f"⚽ {partido['local']} vs {partido['visitante']}")
-            logger.info(f"   Fecha: {partido['fecha']}")
+        for fila, regla, tipo_apuesta, confianza, cuota in zip(
+            disparos['fila'], disparos['regla'], disparos['tipo_apuesta'],
+            disparos['confianza'], cuotas
+        ):
+            partido = partidos[fila]
+            logger.info(f"⚽ {partido['local']} vs {partido['visitante']} ({partido['fecha']})")
+            logger.info(f"   ✓ Dispara regla: {regla}")
             
-            # Convertir a formato evaluable
-            partido_eval = self._preparar_partido_para_evaluacion(partido)
+            # Calcular stake recomendado (1.5 si el partido no trae cuota)
+            stake_info = recomendar_stake(
+                confianza=confianza,
+                cuota=1.5 if np.isnan(cuota) else float(cuota),
+                bankroll=1000  # Bankroll ejemplo
+            )
             
-            # Evaluar contra cada regla
-            for regla in self.reglas_activas:
-                if regla.evaluar(partido_eval):
-                    logger.info(f"   ✓ Dispara regla: {regla.nombre}")
-                    
-                    # Calcular stake recomendado
-                    stake_info = recomendar_stake(
-                        confianza=regla.confianza_esperada,
-                        cuota=partido_eval.get('cuota', 1.5),
-                        bankroll=1000  # Bankroll ejemplo
-                    )
-                    
-                    # Crear alerta
-                    alerta = {
-                        'partido': partido,
-                        'regla': regla.nombre,
-                        'tipo_apuesta': regla.tipo_apuesta,
-                        'confianza': regla.confianza_esperada,
-                        'stake': stake_info['stake'],
-                        'edge': stake_info['edge'],
-                        'tiene_valor': stake_info['valor']
-                    }
-                    
-                    alertas.append(alerta)
-                    
-                    # Enviar email si cumple umbral de confianza
-                    if regla.confianza_esperada >= self.config.min_confidence:
-                        self.email_system.enviar_alerta(
-                            partido=partido,
-                            regla=regla.nombre,
-                            confianza=regla.confianza_esperada,
-                            stake_recomendado=stake_info['stake']
-                        )
+            # Crear alerta
+            alerta = {
+                'partido': partido,
+                'regla': regla,
+                'tipo_apuesta': tipo_apuesta,
+                'confianza': confianza,
+                'stake': stake_info['stake'],
+                'edge': stake_info['edge'],
+                'tiene_valor': stake_info['valor']
+            }
             
-            logger.info("")
+            alertas.append(alerta)
+            
+            # Enviar email si cumple umbral de confianza y no se envió en un ciclo anterior
+            if confianza >= self.config.min_confidence:
+                clave = clave_alerta(partido, regla, tipo_apuesta)
+                if self.registro.ya_enviada(clave):
+                    logger.info("   📭 Alerta ya enviada, no se reenvía")
+                elif self.email_system.enviar_alerta(
+                    partido=partido,
+                    regla=regla,
+                    confianza=confianza,
+                    stake_recomendado=stake_info['stake']
+                ):
+                    self.registro.registrar(clave)
         
         logger.info(f"{'='*70}")
         logger.info(f"✅ Evaluación completada: {len(alertas)} alertas generadas")
+        logger.info(f"📭 Envíos suprimidos (ya enviados): {self.registro.estadisticas()['suprimidas']}")
         logger.info(f"{'='*70}\n")
         
         return alertas
     
-    def _preparar_partido_para_evaluacion(self, partido: Dict) -> pd.Series:
-        """
-        Convierte un partido de la API a formato evaluable por las reglas
-        
-        Args:
-            partido: Dict con datos del partido
-        
-        Returns:
-            Serie de pandas con formato estándar
-        """
-        # NOTA: En producción, aquí se calcularían las features reales
-        # (forma, rachas, etc.) consultando el historial del equipo
-        
-        # Por ahora, valores por defecto para testing
-        return pd.Series({
-            'Date': partido.get('fecha'),
-            'Local': partido.get('local'),
-            'Visitante': partido.get('visitante'),
-            'Cuota_Local': 1.5,  # Placeholder
-            'Cuota_Visitante': 2.5,  # Placeholder
-            'Cuota_Empate': 3.0,  # Placeholder
-            'Local_Forma_L5': 10,  # Placeholder
-            'Visitante_Forma_L5': 8,  # Placeholder
-            'Local_Derrotas_L3': 0,  # Placeholder
-            'Visitante_Derrotas_L3': 0,  # Placeholder
-            'Local_Goles_Prom_L5': 1.8,  # Placeholder
-            'Visitante_Goles_Prom_L5': 1.5,  # Placeholder
-        })
+    def preparar_partidos(self, partidos: List[Dict]) -> pd.DataFrame:
+        """Partidos de la API en formato evaluable, con las features actuales"""
+        return preparar_partidos(partidos, self.estado_equipos)
+    
+    def _cargar_estado_equipos(self):
+        """(Re)carga la tabla de estado si update_data.py la actualizó desde la última carga"""
+        ruta = self.feature_store.estado_path
+        version = ruta.stat().st_mtime if ruta.exists() else None
+        if self.estado_equipos is None or version != self._version_estado:
+            self.estado_equipos = self.feature_store.tabla_estado()
+            self._version_estado = version
     
     def ejecutar_monitor_continuo(self):
         """
@@ -158,7 +247,7 @@ class AlertMonitor:
                 # Esperar hasta el próximo chequeo
                 logger.info(f"\n💤 Esperando {self.config.check_interval_hours}h hasta próximo chequeo...")
                 time.sleep(self.config.check_interval_hours * 3600)
-                
+        
         except KeyboardInterrupt:
             logger.info("\n\n🛑 Monitor detenido por el usuario")
 
@@ -12,8 +12,13 @@ from typing import List, Dict, Any
 
 from src.rules.laliga_rules import crear_reglas_laliga
 from src.rules.custom_rules import crear_reglas_personalizadas
+from src.rules.evaluador import EvaluadorReglas, filas_disparo
 from src.data.unified_api import UnifiedAPIClient
+from src.data.feature_store import FeatureStore
 from src.alerts.email_alert import EmailAlert
+from src.alerts.registro_alertas import clave_alerta, registro_compartido
+from src.alerts.monitor import avisar_sin_cuotas, preparar_partidos, reglas_con_cuotas
+from src.alerts.monitor_live import preparar_medio_tiempo
 from src.risk.kelly import KellyCalculator
 from src.config import ALERT_CONFIG
 
@@ -25,7 +30,7 @@ class EnhancedMonitor:
     Monitor mejorado con reglas originales y personalizadas
     """
     
-    def __init__(self):
+    def __init__(self, config=ALERT_CONFIG, feature_store: FeatureStore = None):
         # Reglas originales (pre-partido)
         self.reglas_pre_partido = crear_reglas_laliga()
         
@@ -52,8 +57,14 @@ class EnhancedMonitor:
             ]
         ]
         
+        self.evaluador_pre_partido = EvaluadorReglas(self.reglas_pre_partido_activas)
+        self.reglas_pre_partido_cuotas = reglas_con_cuotas(self.reglas_pre_partido_activas)
+        self.evaluador_medio_tiempo = EvaluadorReglas(self.reglas_medio_tiempo_activas)
+        
         self.api_client = UnifiedAPIClient()
-        self.email_alert = EmailAlert()
+        self.feature_store = feature_store or FeatureStore()
+        self.email_alert = EmailAlert(config)
+        self.registro = registro_compartido(config)
         self.kelly_calc = KellyCalculator()
         
         logger.info(f"Monitor inicializado:")
@@ -82,38 +93,47 @@ class EnhancedMonitor:
             
             logger.info(f"Partidos obtenidos: {len(partidos)}")
             
+            # Las tres reglas pre-partido comparan cuotas 1X2
+            self.api_client.añadir_cuotas(partidos)
+            
+            # Features actuales y todas las reglas pre-partido de una vez
+            df = preparar_partidos(partidos, self.feature_store.tabla_estado())
+            avisar_sin_cuotas(df, self.reglas_pre_partido_cuotas)
+            disparos = self.evaluador_pre_partido.disparos(df)
+            
             alertas = []
             
-            for partido in partidos:
-                # Evaluar contra reglas pre-partido
-                for regla in self.reglas_pre_partido_activas:
-                    if regla.evaluar(partido):
-                        # Obtener cuota
-                        cuota = self._obtener_cuota_pre_partido(regla, partido)
-                        
-                        # Calcular stake
-                        win_rate = self._obtener_win_rate_pre_partido(regla.nombre)
-                        stake = self.kelly_calc.calcular_stake(win_rate, cuota)
-                        
-                        alerta = {
-                            'partido': {
-                                'local': partido.get('local', ''),
-                                'visitante': partido.get('visitante', ''),
-                                'fecha': partido.get('fecha', ''),
-                                'estadio': partido.get('estadio', '')
-                            },
-                            'regla': regla.nombre,
-                            'descripcion': regla.descripcion,
-                            'tipo_apuesta': regla.tipo_apuesta,
-                            'cuota': cuota,
-                            'confianza': win_rate,
-                            'stake': stake,
-                            'roi_historico': self._obtener_roi_pre_partido(regla.nombre),
-                            'momento': 'pre-partido'
-                        }
-                        
-                        alertas.append(alerta)
-                        logger.info(f"Alerta pre-partido: {regla.nombre} para {partido.get('local')} vs {partido.get('visitante')}")
+            for fila, indice in zip(disparos['fila'], disparos['indice_regla']):
+                regla = self.evaluador_pre_partido.reglas[indice]
+                partido = partidos[fila]
+                
+                # Obtener cuota
+                cuota = self._obtener_cuota_pre_partido(regla, partido)
+                
+                # Calcular stake
+                win_rate = self._obtener_win_rate_pre_partido(regla.nombre)
+                stake = self.kelly_calc.calcular_stake(win_rate, cuota)
+                
+                alerta = {
+                    'partido': {
+                        'id': partido.get('id'),
+                        'local': partido.get('local', ''),
+                        'visitante': partido.get('visitante', ''),
+                        'fecha': partido.get('fecha', ''),
+                        'estadio': partido.get('estadio', '')
+                    },
+                    'regla': regla.nombre,
+                    'descripcion': regla.descripcion,
+                    'tipo_apuesta': regla.tipo_apuesta,
+                    'cuota': cuota,
+                    'confianza': win_rate,
+                    'stake': stake,
+                    'roi_historico': self._obtener_roi_pre_partido(regla.nombre),
+                    'momento': 'pre-partido'
+                }
+                
+                alertas.append(alerta)
+                logger.info(f"Alerta pre-partido: {regla.nombre} para {partido.get('local')} vs {partido.get('visitante')}")
             
             # Enviar alertas si hay
             if alertas:
@@ -135,43 +155,51 @@ class EnhancedMonitor:
         Returns:
             Lista de alertas generadas
         """
+        return self.evaluar_partidos_medio_tiempo([partido])
+    
+    def evaluar_partidos_medio_tiempo(self, partidos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evalúa todos los partidos al descanso con reglas personalizadas de una vez
+        
+        Args:
+            partidos: Lista de partidos al medio tiempo
+        
+        Returns:
+            Lista de alertas generadas, por partido y regla
+        """
+        df = preparar_medio_tiempo(partidos)
+        disparos = self.evaluador_medio_tiempo.disparos(df)
+        registros = filas_disparo(df, disparos)
+        
         alertas = []
         
-        for regla in self.reglas_medio_tiempo_activas:
-            # Preparar datos
-            p_dict = {
-                'Local': partido.get('local', ''),
-                'Visitante': partido.get('visitante', ''),
-                'HT_Home': partido.get('ht_home', 0),
-                'HT_Away': partido.get('ht_away', 0),
-                'Cuota_Local': partido.get('cuota_local', 999),
-                'Cuota_Empate': partido.get('cuota_empate', 999),
-                'Cuota_Visitante': partido.get('cuota_visitante', 999)
+        for fila, indice, p_dict in zip(disparos['fila'], disparos['indice_regla'], registros):
+            regla = self.evaluador_medio_tiempo.reglas[indice]
+            partido = partidos[fila]
+            
+            cuota = self._obtener_cuota_medio_tiempo(regla.tipo_apuesta, p_dict)
+            win_rate = self._obtener_win_rate_medio_tiempo(regla.nombre)
+            stake = self.kelly_calc.calcular_stake(win_rate, cuota)
+            
+            alerta = {
+                'partido': {
+                    'id': partido.get('id'),
+                    'local': partido.get('local', ''),
+                    'visitante': partido.get('visitante', ''),
+                    'ht_score': f"{partido.get('ht_home', 0)}-{partido.get('ht_away', 0)}",
+                    'fecha': partido.get('fecha', datetime.now())
+                },
+                'regla': regla.nombre,
+                'descripcion': regla.descripcion,
+                'tipo_apuesta': regla.tipo_apuesta,
+                'cuota': cuota,
+                'confianza': win_rate,
+                'stake': stake,
+                'roi_historico': self._obtener_roi_medio_tiempo(regla.nombre),
+                'momento': 'medio-tiempo'
             }
             
-            if regla.evaluar(p_dict):
-                cuota = self._obtener_cuota_medio_tiempo(regla.tipo_apuesta, p_dict)
-                win_rate = self._obtener_win_rate_medio_tiempo(regla.nombre)
-                stake = self.kelly_calc.calcular_stake(win_rate, cuota)
-                
-                alerta = {
-                    'partido': {
-                        'local': partido.get('local', ''),
-                        'visitante': partido.get('visitante', ''),
-                        'ht_score': f"{partido.get('ht_home', 0)}-{partido.get('ht_away', 0)}",
-                        'fecha': partido.get('fecha', datetime.now())
-                    },
-                    'regla': regla.nombre,
-                    'descripcion': regla.descripcion,
-                    'tipo_apuesta': regla.tipo_apuesta,
-                    'cuota': cuota,
-                    'confianza': win_rate,
-                    'stake': stake,
-                    'roi_historico': self._obtener_roi_medio_tiempo(regla.nombre),
-                    'momento': 'medio-tiempo'
-                }
-                
-                alertas.append(alerta)
+            alertas.append(alerta)
         
         return alertas
     
@@ -235,10 +263,17 @@ class EnhancedMonitor:
     
     def _enviar_alertas_agrupadas(self, alertas: List[Dict[str, Any]], tipo: str):
         """Envía alertas agrupadas por email"""
+        enviadas = 0
         try:
             for alerta in alertas:
-                self.email_alert.enviar_alerta(alerta)
-            logger.info(f"Emails enviados: {len(alertas)} alertas de {tipo}")
+                # Una alerta de un partido que aún no ha empezado sale en cada revisión
+                clave = clave_alerta(alerta['partido'], alerta['regla'], alerta['tipo_apuesta'])
+                if self.registro.ya_enviada(clave):
+                    continue
+                if self.email_alert.enviar_alerta(alerta):
+                    self.registro.registrar(clave)
+                    enviadas += 1
+            logger.info(f"Emails enviados: {enviadas} de {len(alertas)} alertas de {tipo}")
         except Exception as e:
             logger.error(f"Error enviando emails: {e}")
     
@@ -257,6 +292,7 @@ class EnhancedMonitor:
         
         logger.info(f"\n📊 Resumen:")
         logger.info(f"  - Alertas pre-partido: {len(alertas_pre)}")
+        logger.info(f"  - Envíos suprimidos (ya enviados): {self.registro.estadisticas()['suprimidas']}")
         
         logger.info("\n" + "="*70)
         logger.info("✅ REVISIÓN COMPLETADA")
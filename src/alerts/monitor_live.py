@@ -11,21 +11,48 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+import pandas as pd
+
 from src.rules.custom_rules import crear_reglas_personalizadas
+from src.rules.evaluador import EvaluadorReglas, filas_disparo, tabla_partidos
+from src.data.equipos import REGISTRO_EQUIPOS
 from src.alerts.email_alert import EmailAlert
+from src.alerts.registro_alertas import clave_alerta, registro_compartido
 from src.config import ALERT_CONFIG
 
 logger = logging.getLogger(__name__)
 
 
+# Datos de medio tiempo -> columnas de las reglas (con su valor por defecto)
+COLUMNAS_MEDIO_TIEMPO = {
+    'local': ('Local', ''),
+    'visitante': ('Visitante', ''),
+    'ht_home': ('HT_Home', 0),
+    'ht_away': ('HT_Away', 0),
+    'cuota_local': ('Cuota_Local', 999),
+    'cuota_empate': ('Cuota_Empate', 999),
+    'cuota_visitante': ('Cuota_Visitante', 999),
+}
+
+
+def preparar_medio_tiempo(partidos: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Partidos al descanso en formato evaluable (un partido por fila, mismo orden)"""
+    df = tabla_partidos(partidos, COLUMNAS_MEDIO_TIEMPO)
+    df['Local_ID'] = REGISTRO_EQUIPOS.ids(df['Local'])
+    df['Visitante_ID'] = REGISTRO_EQUIPOS.ids(df['Visitante'])
+    return df
+
+
 class LiveMonitor:
     """
     Monitor de alertas en vivo para estrategias de medio tiempo
     """
     
-    def __init__(self):
+    def __init__(self, config=ALERT_CONFIG):
+        self.config = config
         self.reglas = crear_reglas_personalizadas()
-        self.email_alert = EmailAlert()
+        self.email_alert = EmailAlert(config)
+        self.registro = registro_compartido(config)
         
         # Filtrar solo las mejores reglas (ROI > 55%)
         self.reglas_activas = [
@@ -37,6 +64,7 @@ class LiveMonitor:
                 'Under25_Si_0-0_HT'
             ]
         ]
+        self.evaluador = EvaluadorReglas(self.reglas_activas)
         
         logger.info(f"Monitor inicializado con {len(self.reglas_activas)} reglas activas")
     
@@ -60,49 +88,56 @@ class LiveMonitor:
         Returns:
             Lista de alertas generadas
         """
+        return self.evaluar_partidos_medio_tiempo([partido])
+    
+    def evaluar_partidos_medio_tiempo(self, partidos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evalúa todos los partidos al descanso contra todas las reglas de una vez
+        
+        Args:
+            partidos: Lista de partidos (mismo formato que evaluar_partido_medio_tiempo)
+        
+        Returns:
+            Lista de alertas generadas, por partido y regla
+        """
+        df = preparar_medio_tiempo(partidos)
+        disparos = self.evaluador.disparos(df)
+        registros = filas_disparo(df, disparos)
+        
         alertas = []
         
-        for regla in self.reglas_activas:
-            # Preparar datos para evaluación
-            p_dict = {
-                'Local': partido.get('local', ''),
-                'Visitante': partido.get('visitante', ''),
-                'HT_Home': partido.get('ht_home', 0),
-                'HT_Away': partido.get('ht_away', 0),
-                'Cuota_Local': partido.get('cuota_local', 999),
-                'Cuota_Empate': partido.get('cuota_empate', 999),
-                'Cuota_Visitante': partido.get('cuota_visitante', 999)
+        for fila, indice, p_dict in zip(disparos['fila'], disparos['indice_regla'], registros):
+            regla = self.evaluador.reglas[indice]
+            partido = partidos[fila]
+            
+            # Determinar cuota según tipo de apuesta
+            cuota = self._obtener_cuota(regla.tipo_apuesta, p_dict)
+            
+            # Obtener win rate histórico
+            win_rate = self._obtener_win_rate_historico(regla.nombre)
+            
+            # Calcular stake (Kelly fraccionado)
+            stake = self._calcular_stake(win_rate, cuota)
+            
+            alerta = {
+                'partido': {
+                    'id': partido.get('id'),
+                    'local': partido.get('local', ''),
+                    'visitante': partido.get('visitante', ''),
+                    'ht_score': f"{partido.get('ht_home', 0)}-{partido.get('ht_away', 0)}",
+                    'fecha': partido.get('fecha', datetime.now())
+                },
+                'regla': regla.nombre,
+                'descripcion': regla.descripcion,
+                'tipo_apuesta': regla.tipo_apuesta,
+                'cuota': cuota,
+                'confianza': win_rate,
+                'stake': stake,
+                'roi_historico': self._obtener_roi_historico(regla.nombre)
             }
             
-            # Evaluar regla
-            if regla.evaluar(p_dict):
-                # Determinar cuota según tipo de apuesta
-                cuota = self._obtener_cuota(regla.tipo_apuesta, p_dict)
-                
-                # Obtener win rate histórico
-                win_rate = self._obtener_win_rate_historico(regla.nombre)
-                
-                # Calcular stake (Kelly fraccionado)
-                stake = self._calcular_stake(win_rate, cuota)
-                
-                alerta = {
-                    'partido': {
-                        'local': partido.get('local', ''),
-                        'visitante': partido.get('visitante', ''),
-                        'ht_score': f"{partido.get('ht_home', 0)}-{partido.get('ht_away', 0)}",
-                        'fecha': partido.get('fecha', datetime.now())
-                    },
-                    'regla': regla.nombre,
-                    'descripcion': regla.descripcion,
-                    'tipo_apuesta': regla.tipo_apuesta,
-                    'cuota': cuota,
-                    'confianza': win_rate,
-                    'stake': stake,
-                    'roi_historico': self._obtener_roi_historico(regla.nombre)
-                }
-                
-                alertas.append(alerta)
-                logger.info(f"Alerta generada: {regla.nombre} para {partido.get('local')} vs {partido.get('visitante')}")
+            alertas.append(alerta)
+            logger.info(f"Alerta generada: {regla.nombre} para {partido.get('local')} vs {partido.get('visitante')}")
         
         return alertas
     
@@ -180,9 +215,15 @@ class LiveMonitor:
             return
         
         for alerta in alertas:
+            clave = clave_alerta(alerta['partido'], alerta['regla'], alerta['tipo_apuesta'])
+            if self.registro.ya_enviada(clave):
+                logger.info(f"Alerta ya enviada, no se reenvía: {alerta['regla']}")
+                continue
+            
             try:
-                self.email_alert.enviar_alerta(alerta)
-                logger.info(f"Email enviado para {alerta['regla']}")
+                if self.email_alert.enviar_alerta(alerta):
+                    self.registro.registrar(clave)
+                    logger.info(f"Email enviado para {alerta['regla']}")
             except Exception as e:
                 logger.error(f"Error enviando email: {e}")
     
@@ -196,11 +237,7 @@ class LiveMonitor:
         Returns:
             Lista de todas las alertas generadas
         """
-        todas_alertas = []
-        
-        for partido in partidos:
-            alertas = self.evaluar_partido_medio_tiempo(partido)
-            todas_alertas.extend(alertas)
+        todas_alertas = self.evaluar_partidos_medio_tiempo(partidos)
         
         # Enviar alertas
         if todas_alertas:
@@ -0,0 +1,144 @@
+"""
+Registro de alertas enviadas
+Responsabilidad: Recordar en SQLite qué alertas (partido, regla, mercado)
+ya se enviaron para no repetir el email en cada ciclo de los monitores
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+import sqlite3
+import threading
+import time
+
+from src.config import ALERT_CONFIG
+from src.data.equipos import REGISTRO_EQUIPOS, SIN_EQUIPO
+
+logger = logging.getLogger(__name__)
+
+
+def clave_alerta(partido: Dict[str, Any], regla: str, mercado: str) -> str:
+    """
+    Clave (partido, regla, mercado) de una alerta
+    
+    El partido se identifica por los IDs canónicos de local y visitante
+    (REGISTRO_EQUIPOS) y el día: la clave es la misma si un ciclo lo sirvió
+    API-Sports y otro TheSportsDB, aunque sus IDs de partido no coincidan.
+    Sin equipos o sin fecha, por el ID de la API precedido de su fuente.
+    """
+    local = REGISTRO_EQUIPOS.id(partido.get('local'))
+    visitante = REGISTRO_EQUIPOS.id(partido.get('visitante'))
+    dia = _dia_partido(partido.get('fecha'))
+    
+    if SIN_EQUIPO not in (local, visitante) and dia:
+        id_partido = f"{local}-{visitante}-{dia}"
+    elif partido.get('id') is not None and partido.get('id') != '':
+        id_partido = f"{partido.get('fuente', 'api')}:{partido['id']}"
+    else:
+        id_partido = f"{partido.get('local')}-{partido.get('visitante')}-{partido.get('fecha')}"
+    return f"{id_partido}|{regla}|{mercado}"
+
+
+def _dia_partido(fecha: Any) -> str:
+    """'2026-10-18' de un datetime/date o de una fecha ISO ('2026-10-18T19:00:00+00:00', '2026-10-18 19:00:00')"""
+    if fecha is None or fecha != fecha:
+        return ''
+    return str(fecha)[:10]
+
+
+class RegistroAlertas:
+    """
+    Alertas enviadas con caducidad
+    
+    - Las claves vigentes se cargan en memoria al abrir el registro:
+      comprobar una alerta ya vista es una consulta O(1) a un dict
+    - Una clave que no está en memoria se busca en SQLite (por clave
+      primaria) por si la envió otro proceso (web, cron)
+    - Cada clave caduca config.registro_alertas_horas después del envío;
+      las caducadas se borran al abrir el registro y con purgar()
+    - Solo se registran los envíos que salieron bien: si el email falla,
+      la alerta se reintenta en el siguiente ciclo
+    """
+    
+    def __init__(self, config=ALERT_CONFIG, ruta: Optional[Path] = None, reloj=time.time):
+        self.config = config
+        self.ruta = Path(ruta or config.registro_alertas_path)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.reloj = reloj
+        
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS enviadas ("
+            "clave TEXT PRIMARY KEY, enviada REAL NOT NULL, expira REAL NOT NULL)"
+        )
+        self._conexion.commit()
+        
+        self._expiraciones: Dict[str, float] = {}
+        self.purgar()
+        self._expiraciones = dict(self._conexion.execute("SELECT clave, expira FROM enviadas").fetchall())
+        self.contadores = {'enviadas': 0, 'suprimidas': 0}
+    
+    def ya_enviada(self, clave: str) -> bool:
+        """True (y cuenta un envío suprimido) si la alerta se envió y no ha caducado"""
+        ahora = self.reloj()
+        
+        with self._lock:
+            expira = self._expiraciones.get(clave)
+            if expira is None:
+                fila = self._conexion.execute(
+                    "SELECT expira FROM enviadas WHERE clave = ?", (clave,)
+                ).fetchone()
+                if fila is not None:
+                    expira = self._expiraciones[clave] = fila[0]
+            
+            if expira is None or expira <= ahora:
+                return False
+            
+            self.contadores['suprimidas'] += 1
+            return True
+    
+    def registrar(self, clave: str, horas: Optional[float] = None):
+        """Marca la alerta como enviada durante `horas` (default: config.registro_alertas_horas)"""
+        ahora = self.reloj()
+        expira = ahora + (self.config.registro_alertas_horas if horas is None else horas) * 3600
+        
+        with self._lock:
+            self._expiraciones[clave] = expira
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO enviadas (clave, enviada, expira) VALUES (?, ?, ?)",
+                (clave, ahora, expira)
+            )
+            self._conexion.commit()
+            self.contadores['enviadas'] += 1
+    
+    def purgar(self) -> int:
+        """Borra las claves caducadas; devuelve cuántas"""
+        ahora = self.reloj()
+        with self._lock:
+            borradas = self._conexion.execute("DELETE FROM enviadas WHERE expira <= ?", (ahora,)).rowcount
+            self._conexion.commit()
+            self._expiraciones = {c: e for c, e in self._expiraciones.items() if e > ahora}
+        return borradas
+    
+    def estadisticas(self) -> Dict[str, int]:
+        """Envíos registrados y suprimidos en este proceso, y claves vigentes"""
+        with self._lock:
+            ahora = self.reloj()
+            return {
+                **self.contadores,
+                'vigentes': sum(1 for expira in self._expiraciones.values() if expira > ahora),
+            }
+
+
+_REGISTROS: Dict[tuple, RegistroAlertas] = {}
+_REGISTROS_LOCK = threading.Lock()
+
+
+def registro_compartido(config=ALERT_CONFIG) -> RegistroAlertas:
+    """Registro único por fichero y caducidad dentro del proceso (monitores creados en cada petición web)"""
+    clave = (Path(config.registro_alertas_path), config.registro_alertas_horas)
+    with _REGISTROS_LOCK:
+        if clave not in _REGISTROS:
+            _REGISTROS[clave] = RegistroAlertas(config)
+        return _REGISTROS[clave]
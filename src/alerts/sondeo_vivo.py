@@ -0,0 +1,283 @@
+"""
+Sondeo de partidos en directo
+Responsabilidad: Consultar periódicamente los partidos en juego de
+API-Sports, detectar el paso de cada partido al descanso (HT) y lanzar
+las reglas de medio tiempo de LiveMonitor en ese momento
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+import logging
+import math
+import threading
+import time
+
+from src.alerts.monitor_live import LiveMonitor
+from src.config import ALERT_CONFIG, API_CONFIG
+from src.data.api_sports import APISportsClient
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.data.presupuesto_api import ALTA, MEDIA
+
+logger = logging.getLogger(__name__)
+
+
+# Estados cortos de API-Sports
+PRIMERA_PARTE = '1H'
+DESCANSO = 'HT'
+
+
+def normalizar_en_vivo(partido: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Partido en directo de API-Sports al formato de LiveMonitor
+    
+    El marcador al descanso sale de score.halftime; mientras la API no lo
+    rellena se usa el marcador actual (goals).
+    """
+    fixture = partido.get('fixture', {})
+    estado = fixture.get('status', {})
+    teams = partido.get('teams', {})
+    goles = partido.get('goals', {})
+    descanso = partido.get('score', {}).get('halftime', {})
+    
+    local = teams.get('home', {}).get('name')
+    visitante = teams.get('away', {}).get('name')
+    
+    return {
+        'id': fixture.get('id'),
+        'fecha': fixture.get('date'),
+        'liga': partido.get('league', {}).get('id'),
+        'local': local,
+        'visitante': visitante,
+        'local_equipo_id': REGISTRO_EQUIPOS.id(local),
+        'visitante_equipo_id': REGISTRO_EQUIPOS.id(visitante),
+        'estado': estado.get('short'),
+        'minuto': estado.get('elapsed') or 0,
+        'ht_home': descanso.get('home') if descanso.get('home') is not None else goles.get('home') or 0,
+        'ht_away': descanso.get('away') if descanso.get('away') is not None else goles.get('away') or 0,
+    }
+
+
+class SondeoDescanso:
+    """
+    Planificador de sondeos para las reglas de medio tiempo
+    
+    - Cada sondeo es una petición ALTA a /fixtures?live=... (sin caché)
+    - Un partido dispara las reglas una sola vez, en el primer sondeo en
+      el que aparece en HT (también si el sondeo empieza con el partido
+      ya en el descanso)
+    - Las cuotas 1X2 se piden al ver el partido en juego (en la primera
+      parte, para no retrasar la alerta del descanso) y se repiten en cada
+      sondeo hasta obtenerlas o hasta el descanso
+    - El intervalo se adapta: rápido desde config.sondeo_minuto_rapido de
+      la primera parte, normal (o hasta ese minuto) antes, y reposo si no
+      hay primeras partes en juego
+    - Con ligas fijas (config.sondeo_ligas) se lee su calendario cada
+      config.sondeo_calendario_horas: fuera de las ventanas de partido
+      (config.sondeo_ventana_minutos desde cada inicio) no se sondea y se
+      espera al siguiente inicio, para no gastar la cuota diaria en vacío
+    
+    Los descansos detectados se guardan en `descansos` con el instante de
+    detección y de la alerta (reloj del proceso) para medir la latencia.
+    """
+    
+    def __init__(
+        self,
+        monitor: Optional[LiveMonitor] = None,
+        cliente: Optional[APISportsClient] = None,
+        config=ALERT_CONFIG,
+        api_config=API_CONFIG,
+        reloj=time.monotonic,
+        ahora=lambda: datetime.now(timezone.utc)
+    ):
+        self.config = config
+        self.monitor = monitor or LiveMonitor(config)
+        self.cliente = cliente or APISportsClient(api_config)
+        self.reloj = reloj
+        self.ahora = ahora
+        
+        self.calendario: Optional[List[datetime]] = None  # Inicios (UTC); None: desconocido
+        self._calendario_leido: Optional[float] = None
+        self.estados: Dict[int, str] = {}  # Último estado visto por partido
+        self.cuotas: Dict[int, Dict[str, float]] = {}
+        self.disparados: Set[int] = set()
+        self.descansos: List[Dict[str, Any]] = []
+        self.sondeos = 0
+        self.fallos = 0
+        self.intervalo_actual = config.sondeo_intervalo_reposo
+        self._parar = threading.Event()
+    
+    def sondear(self) -> List[Dict[str, Any]]:
+        """
+        Un sondeo: pide los partidos en juego y evalúa los que acaban de llegar al descanso
+        
+        Returns:
+            Alertas generadas en este sondeo
+        """
+        self._actualizar_calendario()
+        if not self.estados and not self.en_ventana():
+            self.intervalo_actual = self._intervalo_reposo()
+            return []
+        
+        self.sondeos += 1
+        inicio = self.reloj()
+        respuesta = self.cliente.get_partidos_en_vivo(self.config.sondeo_ligas, prioridad=ALTA)
+        
+        if respuesta is None:
+            # Sin datos no se sabe si hay partidos: se reintenta al ritmo actual
+            self.fallos += 1
+            return []
+        
+        recibido = self.reloj()
+        partidos = [normalizar_en_vivo(partido) for partido in respuesta]
+        
+        nuevos_descansos = []
+        for partido in partidos:
+            id_partido = partido['id']
+            anterior = self.estados.get(id_partido)
+            self.estados[id_partido] = partido['estado']
+            
+            pendientes = id_partido not in self.cuotas and id_partido not in self.disparados
+            if pendientes and partido['estado'] in (PRIMERA_PARTE, DESCANSO):
+                # Vacío si la petición falla o aún no hay mercado: se reintenta en el siguiente sondeo
+                cuotas = self.cliente.get_cuotas(id_partido, prioridad=MEDIA)
+                if cuotas:
+                    self.cuotas[id_partido] = cuotas
+            
+            if partido['estado'] == DESCANSO and id_partido not in self.disparados:
+                self.disparados.add(id_partido)
+                partido.update(self.cuotas.get(id_partido, {}))
+                nuevos_descansos.append(partido)
+                logger.info(
+                    f"⏸️ Descanso: {partido['local']} {partido['ht_home']}-{partido['ht_away']} "
+                    f"{partido['visitante']} ({anterior or 'visto ya en HT'})"
+                )
+        
+        alertas = []
+        if nuevos_descansos:
+            alertas = self.monitor.procesar_partidos_medio_tiempo(nuevos_descansos)
+            alertado = self.reloj()
+            for partido in nuevos_descansos:
+                self.descansos.append({
+                    'id': partido['id'],
+                    'local': partido['local'],
+                    'visitante': partido['visitante'],
+                    'sondeo': inicio,
+                    'detectado': recibido,
+                    'alertado': alertado,
+                    'alertas': sum(1 for alerta in alertas if alerta['partido']['id'] == partido['id']),
+                })
+        
+        # Los partidos que ya no están en directo se olvidan
+        en_juego = {partido['id'] for partido in partidos}
+        for id_partido in list(self.estados):
+            if id_partido not in en_juego:
+                self.estados.pop(id_partido)
+                self.cuotas.pop(id_partido, None)
+                self.disparados.discard(id_partido)
+        
+        self.intervalo_actual = self.intervalo(partidos)
+        return alertas
+    
+    def intervalo(self, partidos: List[Dict[str, Any]]) -> float:
+        """Segundos hasta el próximo sondeo según el minuto de las primeras partes en juego"""
+        minutos = [
+            partido['minuto'] for partido in partidos
+            if partido['estado'] == PRIMERA_PARTE and partido['id'] not in self.disparados
+        ]
+        
+        if not minutos:
+            return self._intervalo_reposo()
+        
+        restante = (self.config.sondeo_minuto_rapido - max(minutos)) * 60
+        if restante <= 0:
+            return self.config.sondeo_intervalo_rapido
+        
+        return max(self.config.sondeo_intervalo_rapido, min(self.config.sondeo_intervalo_normal, restante))
+    
+    def en_ventana(self) -> bool:
+        """True si algún partido del calendario empezó hace menos de la ventana (o no hay calendario)"""
+        if self.calendario is None:
+            return True
+        
+        ahora = self.ahora()
+        ventana = timedelta(minutes=self.config.sondeo_ventana_minutos)
+        return any(inicio <= ahora < inicio + ventana for inicio in self.calendario)
+    
+    def _intervalo_reposo(self) -> float:
+        """Reposo dentro de una ventana (o sin calendario); fuera, hasta el próximo inicio o la relectura del calendario"""
+        if self.en_ventana():
+            return self.config.sondeo_intervalo_reposo
+        
+        ahora = self.ahora()
+        proximos = [inicio for inicio in self.calendario if inicio > ahora]
+        hasta_inicio = (proximos[0] - ahora).total_seconds() if proximos else math.inf
+        hasta_calendario = self.config.sondeo_calendario_horas * 3600 - (self.reloj() - self._calendario_leido)
+        return max(self.config.sondeo_intervalo_rapido, min(hasta_inicio, hasta_calendario))
+    
+    def _actualizar_calendario(self):
+        """Relee los inicios de las ligas sondeadas cada config.sondeo_calendario_horas"""
+        if not self.config.sondeo_ligas:
+            return
+        
+        horas = self.config.sondeo_calendario_horas
+        if self._calendario_leido is not None and self.reloj() - self._calendario_leido < horas * 3600:
+            return
+        
+        inicios = self.cliente.get_calendario(self.config.sondeo_ligas, dias=math.ceil(horas / 24) + 1)
+        if inicios is None:
+            logger.warning("⚠️ Calendario no disponible: se sondea al intervalo de reposo")
+            return
+        
+        self.calendario = inicios
+        self._calendario_leido = self.reloj()
+        logger.info(f"📅 Calendario: {len(inicios)} partidos en los próximos días")
+    
+    def ejecutar(self, max_sondeos: Optional[int] = None):
+        """
+        Sondea hasta detener() (o Ctrl+C), esperando el intervalo adaptativo
+        
+        Args:
+            max_sondeos: Número de sondeos antes de parar (default: sin límite)
+        """
+        logger.info("🚀 Sondeo de descansos iniciado")
+        logger.info(
+            f"⏱️ Intervalos: {self.config.sondeo_intervalo_rapido:.0f}s desde el minuto "
+            f"{self.config.sondeo_minuto_rapido}, {self.config.sondeo_intervalo_normal:.0f}s antes, "
+            f"{self.config.sondeo_intervalo_reposo:.0f}s sin partidos"
+        )
+        logger.info(f"🏟️ Ligas: {self.config.sondeo_ligas or 'todas (sin calendario)'}")
+        
+        self._parar.clear()
+        try:
+            while not self._parar.is_set():
+                try:
+                    self.sondear()
+                except Exception as e:
+                    self.fallos += 1
+                    logger.error(f"✗ Error en el sondeo: {e}")
+                
+                if max_sondeos is not None and self.sondeos >= max_sondeos:
+                    break
+                
+                logger.debug(f"💤 Próximo sondeo en {self.intervalo_actual:.0f}s ({datetime.now():%H:%M:%S})")
+                self._parar.wait(self.intervalo_actual)
+        
+        except KeyboardInterrupt:
+            logger.info("\n\n🛑 Sondeo detenido por el usuario")
+    
+    def detener(self):
+        self._parar.set()
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """Sondeos, descansos detectados y latencia sondeo → alerta"""
+        latencias = [d['alertado'] - d['sondeo'] for d in self.descansos]
+        return {
+            'sondeos': self.sondeos,
+            'fallos': self.fallos,
+            'en_juego': len(self.estados),
+            'descansos': len(self.descansos),
+            'alertas': sum(d['alertas'] for d in self.descansos),
+            'latencia_media': sum(latencias) / len(latencias) if latencias else None,
+            'intervalo_actual': self.intervalo_actual,
+            'envios_suprimidos': self.monitor.registro.estadisticas()['suprimidas'],
+        }
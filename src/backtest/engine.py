@@ -3,12 +3,13 @@ Motor principal de backtesting
 Responsabilidad: Ejecutar reglas contra datos históricos
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 
 from src.rules.base import Regla
-from src.backtest.metrics import calcular_metricas
+from src.backtest.metrics import calcular_metricas, calcular_max_drawdown
 from src.config import BACKTEST_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -18,17 +19,21 @@ class BacktestEngine:
     """Motor de backtesting robusto"""
     
     def __init__(self, df: pd.DataFrame, reglas: List[Regla], config=BACKTEST_CONFIG):
-        self.df = df.copy()
+        # El motor solo lee el DataFrame: se comparte sin copiar
+        self.df = df
         self.reglas = reglas
         self.config = config
         self.resultados = {}
+        self._resultados_por_tipo = {}
     
-    def ejecutar(self, verbose: bool = True) -> Dict[str, Dict[str, Any]]:
+    def ejecutar(self, verbose: bool = True, n_procesos: int = None) -> Dict[str, Dict[str, Any]]:
         """
         Ejecuta backtest completo de todas las reglas
         
         Args:
             verbose: Si mostrar progreso en consola
+            n_procesos: Procesos para el modo paralelo (regla × liga × temporada).
+                Por defecto config.n_procesos; 1 ejecuta en serie.
         
         Returns:
             Dict con resultados por regla
@@ -39,8 +44,20 @@ class BacktestEngine:
             logger.info("📊 EJECUTANDO BACKTEST")
             logger.info("="*70 + "\n")
         
+        if n_procesos is None:
+            n_procesos = self.config.n_procesos
+        
+        if n_procesos != 1:
+            from src.backtest.parallel import ejecutar_en_paralelo
+            apuestas = ejecutar_en_paralelo(self, n_procesos)
+        else:
+            apuestas = None
+        
         for regla in self.reglas:
-            resultado = self._testear_regla(regla)
+            if apuestas is not None:
+                resultado = self._metricas_apuestas(*apuestas[regla.nombre])
+            else:
+                resultado = self._testear_regla(regla)
             self.resultados[regla.nombre] = resultado
             
             if verbose:
@@ -52,86 +69,120 @@ class BacktestEngine:
         """
         Testea una regla individual contra el dataset
         
+        La regla se evalúa como máscara sobre todo el DataFrame
+        (ver Regla.evaluar_mascara); las reglas sin condición vectorizada
+        se evalúan fila a fila.
+        
         Returns:
             Dict con métricas de rendimiento
         """
         
-        aciertos = 0
-        disparos = 0
-        stake_total = 0.0
-        ganancia_total = 0.0
-        partidos_disparados = []
-        
-        for idx, partido in self.df.iterrows():
-            # Evaluar si la regla dispara
-            if regla.evaluar(partido):
-                disparos += 1
-                stake = 1.0  # Apuesta unitaria
-                stake_total += stake
-                
-                # Verificar resultado
-                acerto = self._verificar_acierto(partido, regla.tipo_apuesta)
-                cuota = self._obtener_cuota(partido, regla.tipo_apuesta)
-                
-                if acerto:
-                    aciertos += 1
-                    ganancia = stake * (cuota - 1)
-                    ganancia_total += ganancia
-                else:
-                    ganancia_total -= stake
-                
-                # Guardar info del partido
-                partidos_disparados.append({
-                    'fecha': partido['Date'],
-                    'local': partido['Local'],
-                    'visitante': partido['Visitante'],
-                    'acerto': acerto,
-                    'cuota': cuota
-                })
+        return self._metricas_apuestas(*self._apuestas_regla(regla))
+    
+    def _apuestas_regla(self, regla: Regla) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Partidos en los que dispara la regla
+        
+        Un partido sin cuota (NaN) para el tipo de apuesta no cuenta como
+        apuesta: no se podría haber apostado y su ganancia no está definida.
+        
+        Returns:
+            (posiciones de los partidos, aciertos, cuotas)
+        """
+        aciertos_tipo, cuotas_tipo = self._resultados_apuesta(regla.tipo_apuesta)
+        disparados = np.flatnonzero(regla.evaluar_mascara(self.df) & ~np.isnan(cuotas_tipo))
+        return disparados, aciertos_tipo[disparados], cuotas_tipo[disparados]
+    
+    def _metricas_apuestas(
+        self,
+        disparados: np.ndarray,
+        aciertos: np.ndarray,
+        cuotas: np.ndarray
+    ) -> Dict[str, Any]:
+        """Métricas y detalle de partidos a partir de las apuestas de una regla"""
+        
+        stake = 1.0  # Apuesta unitaria
+        ganancias = np.where(aciertos, stake * (cuotas - 1), -stake)
         
         # Calcular métricas
         metricas = calcular_metricas(
-            aciertos=aciertos,
-            disparos=disparos,
-            ganancia_total=ganancia_total,
-            stake_total=stake_total
+            aciertos=int(aciertos.sum()),
+            disparos=len(disparados),
+            ganancia_total=float(ganancias.sum()),
+            stake_total=stake * len(disparados)
         )
         
-        metricas['partidos'] = partidos_disparados
+        # Caída máxima de la curva de bankroll con stake plano
+        curva = self.config.bankroll_inicial + np.concatenate([[0.0], np.cumsum(ganancias)])
+        metricas['max_drawdown'] = calcular_max_drawdown(curva)
+        
+        # Guardar info de los partidos
+        metricas['partidos'] = [
+            {
+                'fecha': fecha,
+                'local': local,
+                'visitante': visitante,
+                'acerto': acerto,
+                'cuota': cuota
+            }
+            for fecha, local, visitante, acerto, cuota in zip(
+                self.df['Date'].iloc[disparados].tolist(),
+                self.df['Local'].iloc[disparados].tolist(),
+                self.df['Visitante'].iloc[disparados].tolist(),
+                aciertos.tolist(),
+                cuotas.tolist()
+            )
+        ]
         
         return metricas
     
-    def _verificar_acierto(self, partido: pd.Series, tipo_apuesta: str) -> bool:
-        """Verifica si la apuesta fue correcta"""
-        resultado = partido['Resultado']
-        
-        if tipo_apuesta == 'Local':
-            return resultado == 'H'
-        elif tipo_apuesta == 'Visitante':
-            return resultado == 'A'
-        elif tipo_apuesta == 'Empate':
-            return resultado == 'D'
-        elif tipo_apuesta == 'BTTS':
-            return partido.get('BTTS', False)
-        elif tipo_apuesta == 'Over':
-            return partido.get('Total_Goles', 0) > 2.5
+    def _resultados_apuesta(self, tipo_apuesta: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aciertos y cuotas de todo el dataset para un tipo de apuesta
+        
+        Se calculan una vez por tipo y se reutilizan entre reglas
+        """
+        if tipo_apuesta not in self._resultados_por_tipo:
+            self._resultados_por_tipo[tipo_apuesta] = (
+                self._verificar_aciertos(self.df, tipo_apuesta),
+                self._obtener_cuotas(self.df, tipo_apuesta)
+            )
+        
+        return self._resultados_por_tipo[tipo_apuesta]
+    
+    def _verificar_aciertos(self, df: pd.DataFrame, tipo_apuesta: str) -> np.ndarray:
+        """Verifica qué apuestas fueron correctas (una por fila)"""
+        if tipo_apuesta in ('Local', 'Visitante', 'Empate'):
+            esperado = {'Local': 'H', 'Visitante': 'A', 'Empate': 'D'}[tipo_apuesta]
+            return (df['Resultado'] == esperado).to_numpy(dtype=bool)
+        elif tipo_apuesta == 'BTTS' and 'BTTS' in df.columns:
+            return df['BTTS'].fillna(False).to_numpy(dtype=bool)
+        elif tipo_apuesta in ('Over', 'Under') and 'Total_Goles' in df.columns:
+            total = df['Total_Goles'].to_numpy(dtype=float)
+            return total > 2.5 if tipo_apuesta == 'Over' else total < 2.5
         elif tipo_apuesta == 'Under':
-            return partido.get('Total_Goles', 0) < 2.5
+            # Sin columna Total_Goles se asume 0 goles
+            return np.ones(len(df), dtype=bool)
         
-        return False
+        return np.zeros(len(df), dtype=bool)
     
-    def _obtener_cuota(self, partido: pd.Series, tipo_apuesta: str) -> float:
-        """Obtiene cuota del partido según tipo de apuesta"""
-        if tipo_apuesta == 'Local':
-            return partido.get('Cuota_Local', 1.5)
-        elif tipo_apuesta == 'Visitante':
-            return partido.get('Cuota_Visitante', 2.5)
-        elif tipo_apuesta == 'Empate':
-            return partido.get('Cuota_Empate', 3.0)
-        elif tipo_apuesta == 'BTTS':
-            return partido.get('Cuota_BTTS', 1.8)
-        
-        return 1.0
+    def _obtener_cuotas(self, df: pd.DataFrame, tipo_apuesta: str) -> np.ndarray:
+        """Obtiene cuotas de los partidos según tipo de apuesta"""
+        columnas = {
+            'Local': ('Cuota_Local', 1.5),
+            'Visitante': ('Cuota_Visitante', 2.5),
+            'Empate': ('Cuota_Empate', 3.0),
+            'BTTS': ('Cuota_BTTS', 1.8),
+        }
+        
+        if tipo_apuesta not in columnas:
+            return np.ones(len(df))
+        
+        columna, defecto = columnas[tipo_apuesta]
+        if columna not in df.columns:
+            return np.full(len(df), defecto)
+        
+        return df[columna].to_numpy(dtype=float)
     
     def _mostrar_resultado(self, regla: Regla, resultado: Dict[str, Any]):
         """Muestra resultado de una regla en consola"""
@@ -155,7 +206,8 @@ class BacktestEngine:
             f"{emoji} {regla.nombre}: "
             f"{resultado['aciertos']}/{disparos} "
             f"({win_rate:.1%}) | "
-            f"ROI: {roi:.1%}"
+            f"ROI: {roi:.1%} | "
+            f"Max DD: {resultado['max_drawdown']:.1%}"
         )
     
     def ejecutar_periodicamente(self, intervalo_horas: int = 24):
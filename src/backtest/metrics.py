@@ -90,15 +90,20 @@ def calcular_max_drawdown(cumulative_returns: list) -> float:
     if len(cumulative_returns) == 0:
         return 0.0
     
-    peak = cumulative_returns[0]
-    max_dd = 0.0
+    return float(calcular_max_drawdown_matriz(np.asarray(cumulative_returns, dtype=float)[None, :])[0])
+
+
+def calcular_max_drawdown_matriz(curvas: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown de varias curvas a la vez (una por fila)
     
-    for value in cumulative_returns:
-        if value > peak:
-            peak = value
-        dd = (peak - value) / peak if peak > 0 else 0.0
-        if dd > max_dd:
-            max_dd = dd
+    Args:
+        curvas: Array (n_curvas, n_puntos) de valores acumulados
     
-    return max_dd
-
+    Returns:
+        Array (n_curvas,) con el max drawdown de cada curva
+    """
+    picos = np.maximum.accumulate(curvas, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        caidas = np.where(picos > 0, (picos - curvas) / picos, 0.0)
+    return np.maximum(caidas.max(axis=1), 0.0)
@@ -0,0 +1,165 @@
+"""
+Backtest paralelo
+Responsabilidad: Repartir el backtest en tareas (regla × liga × temporada)
+entre varios procesos que comparten la matriz de features
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import pickle
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+# Columnas que el motor necesita además de las de las reglas
+COLUMNAS_MOTOR = [
+    'Date', 'Local', 'Visitante', 'Resultado', 'BTTS', 'Total_Goles',
+    'Cuota_Local', 'Cuota_Visitante', 'Cuota_Empate', 'Cuota_BTTS'
+]
+
+# Columnas por las que se reparten las tareas (las que existan)
+COLUMNAS_GRUPO = ['Div', 'Temporada']
+
+# Estado de cada proceso trabajador (se inicializa una vez por proceso)
+_ESTADO = {}
+
+
+def ejecutar_en_paralelo(
+    engine,
+    n_procesos: int = 0
+) -> Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Ejecuta las reglas de un BacktestEngine en un pool de procesos
+    
+    El DataFrame se escribe una vez en un fichero Arrow IPC que los
+    procesos abren con memory-map; cada tarea solo materializa las filas
+    de su liga y temporada. Las reglas se envían una vez por proceso.
+    
+    Args:
+        engine: BacktestEngine con el dataset y las reglas
+        n_procesos: Número de procesos (0 = todos los núcleos)
+    
+    Returns:
+        Dict {nombre_regla: (posiciones, aciertos, cuotas)} con las
+        posiciones en el orden del DataFrame original, o None si las
+        reglas o los datos no se pueden compartir (ejecutar en serie)
+    """
+    n_procesos = n_procesos or os.cpu_count() or 1
+    reglas = engine.reglas
+    if not reglas:
+        return {}
+    
+    try:
+        pickle.dumps(reglas)
+    except Exception as e:
+        logger.warning(f"⚠️ Reglas no serializables ({e}), backtest en serie")
+        return None
+    
+    df = engine.df[_columnas_necesarias(engine.df, reglas)]
+    grupos = _grupos(engine.df)
+    
+    with tempfile.TemporaryDirectory(prefix='backtest_') as directorio:
+        ruta = Path(directorio) / 'features.arrow'
+        
+        try:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.warning(f"⚠️ No se pudo convertir el dataset a Arrow ({e}), backtest en serie")
+            return None
+        
+        with pa.OSFile(str(ruta), 'wb') as sink:
+            with pa.ipc.new_file(sink, tabla.schema) as writer:
+                writer.write_table(tabla)
+        del tabla
+        
+        # Tareas ordenadas por grupo: cada bloque de len(reglas) tareas
+        # comparte el mismo subconjunto de filas
+        tareas = [(g, i) for g in range(len(grupos)) for i in range(len(reglas))]
+        
+        logger.info(
+            f"⚙️ Backtest paralelo: {len(tareas)} tareas "
+            f"({len(reglas)} reglas × {len(grupos)} grupos) en {n_procesos} procesos"
+        )
+        
+        with ProcessPoolExecutor(
+            max_workers=n_procesos,
+            initializer=_inicializar_proceso,
+            initargs=(str(ruta), grupos, reglas, engine.config)
+        ) as pool:
+            parciales = list(pool.map(_ejecutar_tarea, tareas, chunksize=len(reglas)))
+    
+    return _combinar(reglas, tareas, parciales)
+
+
+def _columnas_necesarias(df: pd.DataFrame, reglas: List) -> List[str]:
+    """Columnas a compartir: todas si alguna regla no es declarativa"""
+    columnas = set(COLUMNAS_MOTOR)
+    for regla in reglas:
+        columnas_regla = getattr(regla.condicion, 'columnas', None)
+        if columnas_regla is None:
+            return list(df.columns)
+        columnas |= columnas_regla
+    
+    return [c for c in df.columns if c in columnas]
+
+
+def _grupos(df: pd.DataFrame) -> List[np.ndarray]:
+    """Posiciones de las filas de cada (liga, temporada)"""
+    columnas = [c for c in COLUMNAS_GRUPO if c in df.columns]
+    if not columnas:
+        return [np.arange(len(df))]
+    
+    # Se identifican por índice: las claves con NaN no sobreviven a pickle
+    grupos = df.groupby(columnas, sort=True, dropna=False, observed=True).indices
+    return list(grupos.values())
+
+
+def _combinar(reglas: List, tareas: List[tuple], parciales: List[tuple]) -> Dict[str, tuple]:
+    """Une los resultados de cada grupo en el orden original de las filas"""
+    por_regla = {i: [] for i in range(len(reglas))}
+    for (_, i), parcial in zip(tareas, parciales):
+        por_regla[i].append(parcial)
+    
+    apuestas = {}
+    for i, regla in enumerate(reglas):
+        posiciones, aciertos, cuotas = (np.concatenate(partes) for partes in zip(*por_regla[i]))
+        orden = np.argsort(posiciones, kind='stable')
+        apuestas[regla.nombre] = (posiciones[orden], aciertos[orden], cuotas[orden])
+    
+    return apuestas
+
+
+def _inicializar_proceso(ruta: str, grupos: List[np.ndarray], reglas: List, config):
+    """Abre el dataset compartido (memory-map) en el proceso trabajador"""
+    fuente = pa.memory_map(ruta, 'r')
+    _ESTADO['tabla'] = pa.ipc.open_file(fuente).read_all()
+    _ESTADO['grupos'] = grupos
+    _ESTADO['reglas'] = reglas
+    _ESTADO['config'] = config
+    _engine_grupo.cache_clear()
+
+
+@lru_cache(maxsize=4)
+def _engine_grupo(grupo: int):
+    """BacktestEngine sobre las filas de un grupo (reutilizado entre reglas)"""
+    from src.backtest.engine import BacktestEngine
+    
+    posiciones = _ESTADO['grupos'][grupo]
+    df = _ESTADO['tabla'].take(pa.array(posiciones)).to_pandas()
+    return BacktestEngine(df, [], _ESTADO['config'])
+
+
+def _ejecutar_tarea(tarea: tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evalúa una regla sobre un grupo y devuelve sus apuestas con posiciones globales"""
+    grupo, i = tarea
+    engine = _engine_grupo(grupo)
+    disparados, aciertos, cuotas = engine._apuestas_regla(_ESTADO['reglas'][i])
+    return _ESTADO['grupos'][grupo][disparados], aciertos, cuotas
@@ -0,0 +1,195 @@
+"""
+Barrido de parámetros de reglas
+Responsabilidad: Evaluar todas las combinaciones de umbrales de una
+plantilla de regla en una sola pasada sobre el dataset
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence
+from scipy.stats import binom
+import logging
+
+from src.backtest.engine import BacktestEngine
+from src.rules.dsl import Condicion, ErrorDSL, compilar
+from src.config import BACKTEST_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class BarridoParametros:
+    """
+    Grid search de umbrales sobre una plantilla DSL
+    
+    Ejemplo:
+        barrido = BarridoParametros(df)
+        tabla = barrido.ejecutar(
+            "Cuota_Local < {cuota_max} & Local_Forma_L5 >= {forma_min}",
+            {'cuota_max': np.arange(1.3, 2.5, 0.05), 'forma_min': range(0, 16)},
+            tipo_apuesta='Local'
+        )
+    
+    Los aciertos y cuotas del tipo de apuesta se obtienen una vez del
+    BacktestEngine. Cada término de la conjunción se evalúa una vez por
+    valor de sus propios parámetros; las combinaciones se forman con AND
+    de esas máscaras y las métricas se acumulan con un producto matricial
+    por bloques de combinaciones.
+    """
+    
+    def __init__(self, df: pd.DataFrame, config=BACKTEST_CONFIG, max_elementos_bloque: int = 8_000_000):
+        self.engine = BacktestEngine(df, [], config)
+        self.df = self.engine.df
+        self.config = config
+        self.max_elementos_bloque = max_elementos_bloque
+    
+    def ejecutar(
+        self,
+        plantilla: str,
+        rangos: Dict[str, Sequence],
+        tipo_apuesta: str,
+        min_disparos: int = None,
+        ordenar_por: str = 'roi'
+    ) -> pd.DataFrame:
+        """
+        Evalúa todas las combinaciones de parámetros de la plantilla
+        
+        Args:
+            plantilla: Expresión DSL con parámetros entre llaves ({cuota_max})
+            rangos: Valores a probar para cada parámetro
+            tipo_apuesta: Tipo de apuesta (como en Regla.tipo_apuesta)
+            min_disparos: Descarta combinaciones con menos disparos
+                (por defecto config.min_sample_size)
+            ordenar_por: Columna por la que ordenar (descendente)
+        
+        Returns:
+            DataFrame con una fila por combinación: parámetros, disparos,
+            aciertos, win_rate, roi, ganancia_total y p_value
+        """
+        
+        condicion = compilar(plantilla)
+        parametros = sorted(condicion.parametros)
+        
+        faltan = set(parametros) - set(rangos)
+        if faltan:
+            raise ErrorDSL(f"Sin rango para los parámetros: {sorted(faltan)}")
+        
+        if min_disparos is None:
+            min_disparos = self.config.min_sample_size
+        
+        valores = {p: list(rangos[p]) for p in parametros}
+        forma = tuple(len(valores[p]) for p in parametros)
+        n_combinaciones = int(np.prod(forma))
+        
+        # Índice de cada combinación en cada eje de parámetro
+        ejes = np.indices(forma).reshape(len(forma), -1) if parametros else np.zeros((0, 1), dtype=int)
+        
+        terminos = self._mascaras_terminos(condicion, valores)
+        filas = self._filas_candidatas(terminos)
+        
+        aciertos_tipo, cuotas_tipo = self.engine._resultados_apuesta(tipo_apuesta)
+        # Sin cuota no hay apuesta (como en BacktestEngine): un pago NaN anularía todo el producto matricial
+        filas = filas[~np.isnan(cuotas_tipo[filas])]
+        aciertos_filas = aciertos_tipo[filas]
+        pagos = np.where(aciertos_filas, cuotas_tipo[filas] - 1, -1.0)
+        # Columnas: disparos, aciertos, ganancia
+        pesos = np.column_stack([np.ones(len(filas)), aciertos_filas.astype(float), pagos])
+        
+        indices_terminos = [
+            np.ravel_multi_index([ejes[parametros.index(p)] for p in params], mascaras.shape[:-1])
+            if params else np.zeros(n_combinaciones, dtype=int)
+            for params, mascaras in terminos
+        ]
+        mascaras_filas = [mascaras.reshape(-1, mascaras.shape[-1])[:, filas] for _, mascaras in terminos]
+        
+        totales = np.empty((n_combinaciones, 3))
+        bloque = max(1, self.max_elementos_bloque // max(len(filas), 1))
+        for inicio in range(0, n_combinaciones, bloque):
+            fin = min(inicio + bloque, n_combinaciones)
+            
+            mascara = mascaras_filas[0][indices_terminos[0][inicio:fin]]
+            for mascaras, indices in zip(mascaras_filas[1:], indices_terminos[1:]):
+                mascara = mascara & mascaras[indices[inicio:fin]]
+            
+            totales[inicio:fin] = mascara.astype(float) @ pesos
+        
+        logger.info(
+            f"🔎 Barrido: {n_combinaciones} combinaciones × {len(filas)} partidos candidatos "
+            f"({len(self.df)} en total)"
+        )
+        
+        tabla = self._tabla_resultados(parametros, valores, ejes, totales)
+        tabla = tabla[tabla['disparos'] >= max(min_disparos, 1)]
+        
+        return tabla.sort_values(ordenar_por, ascending=False, kind='mergesort').reset_index(drop=True)
+    
+    def _mascaras_terminos(self, condicion: Condicion, valores: Dict[str, List]) -> List[tuple]:
+        """
+        Máscaras de cada término de la conjunción para cada valor de sus parámetros
+        
+        Returns:
+            Lista de (parámetros del término, array bool de forma
+            (len(valores p1), len(valores p2), ..., n_partidos))
+        """
+        terminos = []
+        
+        for termino in condicion.terminos():
+            params = sorted(termino.parametros)
+            forma = tuple(len(valores[p]) for p in params)
+            mascaras = np.empty(forma + (len(self.df),), dtype=bool)
+            
+            for indice in np.ndindex(*forma):
+                asignacion = {p: valores[p][i] for p, i in zip(params, indice)}
+                mascaras[indice] = termino.mascara(self.df, **asignacion)
+            
+            terminos.append((params, mascaras))
+        
+        return terminos
+    
+    @staticmethod
+    def _filas_candidatas(terminos: List[tuple]) -> np.ndarray:
+        """
+        Partidos que pueden disparar con alguna combinación
+        
+        Un partido se descarta si algún término es falso para todos los
+        valores de sus parámetros.
+        """
+        posible = np.ones(terminos[0][1].shape[-1], dtype=bool)
+        for _, mascaras in terminos:
+            posible &= mascaras.reshape(-1, mascaras.shape[-1]).any(axis=0)
+        return np.flatnonzero(posible)
+    
+    def _tabla_resultados(
+        self,
+        parametros: List[str],
+        valores: Dict[str, List],
+        ejes: np.ndarray,
+        totales: np.ndarray
+    ) -> pd.DataFrame:
+        """Construye la tabla de métricas (mismas definiciones que calcular_metricas)"""
+        disparos = totales[:, 0].round().astype(int)
+        aciertos = totales[:, 1].round().astype(int)
+        ganancia = totales[:, 2]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            win_rate = np.where(disparos > 0, aciertos / disparos, 0.0)
+            roi = np.where(disparos > 0, ganancia / disparos, 0.0)
+        
+        # Test binomial unilateral (H1: p > null_hypothesis_prob), como DataValidator
+        p_value = np.where(
+            disparos > 0,
+            binom.sf(aciertos - 1, disparos, self.config.null_hypothesis_prob),
+            1.0
+        )
+        
+        tabla = pd.DataFrame(
+            {p: pd.Series(valores[p]).to_numpy()[ejes[i]] for i, p in enumerate(parametros)},
+            index=pd.RangeIndex(len(totales))
+        )
+        tabla['disparos'] = disparos
+        tabla['aciertos'] = aciertos
+        tabla['win_rate'] = win_rate
+        tabla['roi'] = roi
+        tabla['ganancia_total'] = np.where(disparos > 0, ganancia, 0.0)
+        tabla['p_value'] = p_value
+        
+        return tabla
@@ -3,12 +3,16 @@ Validación estadística de resultados
 Responsabilidad: Detectar overfitting y validar significancia
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 from scipy.stats import binomtest
 import logging
+import os
 
 from src.config import BACKTEST_CONFIG
+from src.backtest.metrics import calcular_metricas
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,10 @@ class DataValidator:
         """
         Divide dataset en train/test por fecha
         
+        Con el DataFrame ordenado por fecha (DataCleaner) los splits son
+        rebanadas (iloc) que comparten los datos de `df`; si no, se filtra
+        con máscaras.
+        
         Args:
             df: DataFrame completo
         
@@ -30,8 +38,14 @@ class DataValidator:
             (df_train, df_test)
         """
         
-        df_train = df[df['Date'] <= self.config.train_end_date].copy()
-        df_test = df[df['Date'] >= self.config.test_start_date].copy()
+        fechas = df['Date']
+        if fechas.is_monotonic_increasing:
+            fin_train = fechas.searchsorted(pd.Timestamp(self.config.train_end_date), side='right')
+            inicio_test = fechas.searchsorted(pd.Timestamp(self.config.test_start_date), side='left')
+            df_train, df_test = df.iloc[:fin_train], df.iloc[inicio_test:]
+        else:
+            df_train = df[fechas <= self.config.train_end_date]
+            df_test = df[fechas >= self.config.test_start_date]
         
         logger.info(f"📊 Split temporal:")
         logger.info(f"   Train: {len(df_train)} partidos (hasta {self.config.train_end_date})")
@@ -119,10 +133,7 @@ class DataValidator:
             roi_test = test['roi']
             
             # Detectar overfitting
-            overfitting_regla = (
-                degradacion > umbral_degradacion or
-                (roi_train > 0.10 and roi_test < 0)
-            )
+            overfitting_regla = self._hay_overfitting(train, test, umbral_degradacion)
             
             if overfitting_regla:
                 overfitting_detectado = True
@@ -138,6 +149,194 @@ class DataValidator:
         
         return overfitting_detectado
     
+    @staticmethod
+    def _hay_overfitting(train: Dict, test: Dict, umbral_degradacion: float) -> bool:
+        """Criterio de overfitting: caída de win rate o ROI positivo que pasa a negativo"""
+        return (
+            train['win_rate'] - test['win_rate'] > umbral_degradacion or
+            (train['roi'] > 0.10 and test['roi'] < 0)
+        )
+    
+    def walk_forward(
+        self,
+        df: pd.DataFrame,
+        reglas: List,
+        unidad: str = None,
+        ventana_train: int = None,
+        ventana_test: int = None,
+        expandir: bool = None,
+        umbral_degradacion: float = 0.15,
+        n_hilos: int = 0
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Validación walk-forward (rolling origin)
+        
+        El dataset se divide en periodos ordenados (temporadas o jornadas).
+        Cada fold entrena con `ventana_train` periodos y testea con los
+        `ventana_test` siguientes; el origen avanza `ventana_test` periodos.
+        
+        Las máscaras de las reglas, los aciertos y las cuotas se calculan una
+        vez sobre `df` (p.ej. la matriz de FeatureCache); cada fold solo
+        selecciona filas por periodo, sin construir DataFrames nuevos.
+        
+        Args:
+            df: DataFrame con features
+            reglas: Reglas a validar
+            unidad: 'temporada' o 'jornada' (por defecto config.wf_unidad)
+            ventana_train: Periodos de entrenamiento por fold
+            ventana_test: Periodos de test por fold
+            expandir: Si True, el train empieza siempre en el primer periodo
+            umbral_degradacion: Máxima degradación aceptable en win rate
+            n_hilos: Hilos para evaluar folds en paralelo (0 = todos los núcleos)
+        
+        Returns:
+            Dict con 'folds' (una fila por fold y regla) y 'agregado'
+            (una fila por regla con el test acumulado de todos los folds)
+        """
+        
+        from src.backtest.engine import BacktestEngine
+        
+        unidad = unidad or self.config.wf_unidad
+        ventana_train = ventana_train or self.config.wf_ventana_train
+        ventana_test = ventana_test or self.config.wf_ventana_test
+        expandir = self.config.wf_expandir if expandir is None else expandir
+        
+        periodos, etiquetas = self._periodos(df, unidad)
+        folds = self._folds(len(etiquetas), ventana_train, ventana_test, expandir)
+        
+        if not folds:
+            raise ValueError(
+                f"Solo hay {len(etiquetas)} {unidad}s: se necesitan al menos "
+                f"{ventana_train + ventana_test} para un fold"
+            )
+        
+        # Apuestas de cada regla sobre todo el dataset (una sola evaluación)
+        engine = BacktestEngine(df, reglas, self.config)
+        apuestas = {}
+        for regla in reglas:
+            disparados, aciertos, cuotas = engine._apuestas_regla(regla)
+            apuestas[regla.nombre] = (
+                periodos[disparados],
+                aciertos,
+                np.where(aciertos, cuotas - 1, -1.0)
+            )
+        
+        def evaluar_fold(fold):
+            numero, (inicio_train, fin_train, fin_test) = fold
+            filas = []
+            for nombre, (periodo, aciertos, ganancias) in apuestas.items():
+                en_train = (periodo >= inicio_train) & (periodo < fin_train)
+                en_test = (periodo >= fin_train) & (periodo < fin_test)
+                train = self._metricas_filas(aciertos, ganancias, en_train)
+                test = self._metricas_filas(aciertos, ganancias, en_test)
+                filas.append({
+                    'fold': numero,
+                    'regla': nombre,
+                    'train_desde': etiquetas[inicio_train],
+                    'train_hasta': etiquetas[fin_train - 1],
+                    'test_desde': etiquetas[fin_train],
+                    'test_hasta': etiquetas[fin_test - 1],
+                    'disparos_train': train['disparos'],
+                    'disparos_test': test['disparos'],
+                    'aciertos_test': test['aciertos'],
+                    'ganancia_test': test['ganancia_total'],
+                    'wr_train': train['win_rate'],
+                    'wr_test': test['win_rate'],
+                    'roi_train': train['roi'],
+                    'roi_test': test['roi'],
+                    'degradacion': train['win_rate'] - test['win_rate'],
+                    'overfitting': self._hay_overfitting(train, test, umbral_degradacion)
+                })
+            return filas
+        
+        with ThreadPoolExecutor(max_workers=n_hilos or os.cpu_count() or 1) as pool:
+            resultados = list(pool.map(evaluar_fold, enumerate(folds, start=1)))
+        
+        df_folds = pd.DataFrame([fila for filas in resultados for fila in filas])
+        df_agregado = self._agregar_folds(df_folds)
+        
+        self._mostrar_walk_forward(df_agregado, len(folds), unidad)
+        
+        return {'folds': df_folds, 'agregado': df_agregado}
+    
+    @staticmethod
+    def _periodos(df: pd.DataFrame, unidad: str) -> Tuple[np.ndarray, List[str]]:
+        """
+        Código de periodo de cada fila y etiqueta de cada periodo
+        
+        Las jornadas se aproximan dentro de cada (liga, temporada) como
+        bloques de (equipos / 2) partidos consecutivos.
+        """
+        if unidad == 'temporada':
+            codigos, etiquetas = pd.factorize(df['Temporada'], sort=True)
+            return codigos, [str(e) for e in etiquetas]
+        
+        if unidad != 'jornada':
+            raise ValueError(f"Unidad de walk-forward desconocida: {unidad}")
+        
+        grupo = [c for c in ('Div', 'Temporada') if c in df.columns]
+        agrupado = df.groupby(grupo, sort=False, dropna=False, observed=True)
+        partidos_por_jornada = (agrupado['Local'].transform('nunique') // 2).clip(lower=1)
+        jornada = agrupado.cumcount() // partidos_por_jornada + 1
+        
+        claves = pd.MultiIndex.from_arrays([df['Temporada'].to_numpy(), jornada.to_numpy()])
+        codigos, etiquetas = pd.factorize(claves, sort=True)
+        return codigos, [f"{temporada} J{j}" for temporada, j in etiquetas]
+    
+    @staticmethod
+    def _folds(n_periodos: int, ventana_train: int, ventana_test: int, expandir: bool) -> List[Tuple[int, int, int]]:
+        """Límites (inicio_train, fin_train, fin_test) de cada fold, en periodos"""
+        folds = []
+        fin_train = ventana_train
+        while fin_train + ventana_test <= n_periodos:
+            inicio_train = 0 if expandir else fin_train - ventana_train
+            folds.append((inicio_train, fin_train, fin_train + ventana_test))
+            fin_train += ventana_test
+        return folds
+    
+    @staticmethod
+    def _metricas_filas(aciertos: np.ndarray, ganancias: np.ndarray, seleccion: np.ndarray) -> Dict[str, Any]:
+        disparos = int(seleccion.sum())
+        return calcular_metricas(
+            aciertos=int(aciertos[seleccion].sum()),
+            disparos=disparos,
+            ganancia_total=float(ganancias[seleccion].sum()),
+            stake_total=float(disparos)
+        )
+    
+    @staticmethod
+    def _agregar_folds(df_folds: pd.DataFrame) -> pd.DataFrame:
+        """Test acumulado de todos los folds y degradación media por regla"""
+        agrupado = df_folds.groupby('regla', sort=False)
+        agregado = agrupado.agg(
+            folds=('fold', 'count'),
+            disparos_test=('disparos_test', 'sum'),
+            aciertos_test=('aciertos_test', 'sum'),
+            ganancia_test=('ganancia_test', 'sum'),
+            wr_train_medio=('wr_train', 'mean'),
+            degradacion_media=('degradacion', 'mean'),
+            degradacion_max=('degradacion', 'max'),
+            folds_overfitting=('overfitting', 'sum')
+        )
+        
+        disparos = agregado['disparos_test'].where(agregado['disparos_test'] > 0)
+        agregado['wr_test'] = (agregado['aciertos_test'] / disparos).fillna(0.0)
+        agregado['roi_test'] = (agregado['ganancia_test'] / disparos).fillna(0.0)
+        
+        return agregado.reset_index()
+    
+    def _mostrar_walk_forward(self, df_agregado: pd.DataFrame, n_folds: int, unidad: str):
+        logger.info(f"\n🔁 Walk-forward: {n_folds} folds por {unidad}")
+        logger.info("="*60)
+        
+        for fila in df_agregado.itertuples(index=False):
+            emoji = "⚠️" if fila.folds_overfitting > 0 else "✓"
+            logger.info(f"{emoji} {fila.regla}:")
+            logger.info(f"   Test acumulado: {fila.disparos_test} disparos, WR={fila.wr_test:.1%}, ROI={fila.roi_test:.1%}")
+            logger.info(f"   Degradación media: {fila.degradacion_media:.1%} (máx {fila.degradacion_max:.1%})")
+            logger.info(f"   Folds con overfitting: {fila.folds_overfitting}/{fila.folds}")
+            logger.info("")
+    
     def validar_regla(self, resultado: Dict[str, Any]) -> bool:
         """
         Valida si una regla cumple criterios mínimos
@@ -4,8 +4,8 @@ Todos los parámetros configurables en un solo lugar
 """
 
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 import os
 
 # Rutas base
@@ -22,10 +22,28 @@ class DataConfig:
     splits_dir: Path = DATA_DIR / "splits"
     proximos_dir: Path = DATA_DIR / "proximos"
     
+    # Datos de todas las ligas (CSV descargados y dataset Parquet particionado)
+    global_csv_dir: Path = DATA_DIR / "global"
+    global_dataset_dir: Path = DATA_DIR / "processed" / "global_dataset"
+    
+    # Modo compacto de DataCleaner (category/int8/float32, sin columnas sin usar)
+    modo_compacto: bool = False
+    
+    # Caché de features (variantes por FeatureConfig + datos de entrada)
+    feature_cache_dir: Path = DATA_DIR / "processed" / "feature_cache"
+    feature_cache_max_mb: float = 500.0
+    
     # URLs de descarga (Football-Data.co.uk - histórico)
-    base_url: str = "https://www.football-data.co.uk/mmz4281/"
+    base_url: str = os.getenv('FOOTBALL_DATA_BASE_URL', "https://www.football-data.co.uk/mmz4281/")
+    # Ligas extra (ARG, BRA, MX1, USA...): un CSV por liga con todas las temporadas
+    base_url_ligas_extra: str = os.getenv('FOOTBALL_DATA_EXTRA_URL', "https://www.football-data.co.uk/new/")
     liga_code: str = "SP1"  # La Liga
     
+    # Descargas concurrentes
+    descarga_max_workers: int = 8
+    descarga_intervalo_host: float = 0.2  # Segundos mínimos entre peticiones al mismo host
+    descarga_timeout: int = 10
+    
     # Temporadas a cargar
     temporadas: List[str] = None  # ['1819', '1920', ..., '2425']
     
@@ -41,17 +59,51 @@ class APIConfig:
     
     # API-Sports.io (Principal)
     api_sports_key: str = os.getenv('API_SPORTS_KEY', 'TU_API_KEY_AQUI')
-    api_sports_base_url: str = "https://v3.football.api-sports.io"
+    api_sports_base_url: str = os.getenv('API_SPORTS_BASE_URL', "https://v3.football.api-sports.io")
     api_sports_league_id: int = 140  # La Liga
+    api_sports_limite_dia: int = 100  # Plan gratuito (se ajusta con las cabeceras)
+    api_sports_limite_minuto: int = 10
+    
+    # Fracción de cada límite que una prioridad deja para las superiores
+    presupuesto_reservas: Dict[str, float] = field(default_factory=lambda: {
+        'alta': 0.0,
+        'media': 0.1,
+        'baja': 0.3,
+    })
     
     # TheSportsDB (Respaldo gratuito)
-    thesportsdb_base_url: str = "https://www.thesportsdb.com/api/v1/json/3"
+    thesportsdb_base_url: str = os.getenv('THESPORTSDB_BASE_URL', "https://www.thesportsdb.com/api/v1/json/3")
     thesportsdb_league_id: str = "4335"  # La Liga
     
     # Configuración de fallback
     use_fallback: bool = True
     max_retries: int = 3
     timeout: int = 10
+    
+    # Caché de respuestas en disco (compartida entre instancias del cliente)
+    cache_habilitada: bool = os.getenv('API_CACHE', '1') != '0'
+    cache_path: Path = DATA_DIR / "cache" / "api_cache.sqlite"
+    cache_ttl: Dict[str, int] = field(default_factory=lambda: {
+        'partidos': 10 * 60,  # Calendario y resultados
+        'clasificacion': 60 * 60,
+        'cuotas': 2 * 60,  # /odds (1X2 pre-partido; se mueven poco en unos minutos)
+        'equipos': 24 * 60 * 60,  # Estadísticas y fichas de equipo
+        'en_vivo': 0,  # /fixtures?live=, /fixtures/statistics, /fixtures/events, /odds/live (en juego)
+        'sin_cache': 0,  # /status (cuota restante)
+        'otros': 0,
+    })
+    cache_factor_stale: float = 6.0  # Se sirve caducada (y se revalida) hasta TTL × factor
+    
+    # Cortacircuitos por endpoint
+    circuito_umbral_fallos: int = 3  # Fallos seguidos para abrir
+    circuito_umbral_latencia: float = 5.0  # Segundos; una respuesta más lenta cuenta como fallo
+    circuito_enfriamiento: float = 60.0  # Segundos abierto antes de probar (se duplica al reabrir)
+    circuito_enfriamiento_max: float = 15 * 60
+    
+    # Cliente asíncrono (AsyncAPIClient)
+    async_max_conexiones: int = 10  # Conexiones keep-alive por fuente
+    async_max_concurrencia: int = 5  # Peticiones simultáneas
+    async_cobertura: Optional[float] = None  # Segundos antes de lanzar también TheSportsDB
 
 
 @dataclass
@@ -73,6 +125,21 @@ class BacktestConfig:
     # Gestión de riesgo
     kelly_fraction: float = 0.25  # Fracción de Kelly (conservador)
     max_stake: float = 0.05  # Máximo 5% del bankroll por apuesta
+    bankroll_inicial: float = 100.0  # En unidades de stake plano
+    
+    # Simulación Monte Carlo de bankroll
+    mc_simulaciones: int = 100_000
+    mc_umbral_ruina: float = 0.2  # Ruina: bankroll por debajo del 20% del inicial
+    mc_max_elementos_bloque: int = 4_000_000  # Caminos × apuestas por bloque (memoria acotada)
+    
+    # Ejecución
+    n_procesos: int = 1  # Procesos del backtest paralelo (0 = todos los núcleos)
+    
+    # Walk-forward (ventanas en temporadas o jornadas)
+    wf_unidad: str = "temporada"  # 'temporada' o 'jornada'
+    wf_ventana_train: int = 3
+    wf_ventana_test: int = 1
+    wf_expandir: bool = False  # True: el train crece desde el inicio (anclado)
 
 
 @dataclass
@@ -92,6 +159,20 @@ class AlertConfig:
     
     # Frecuencia de monitoreo
     check_interval_hours: int = 24  # Chequear cada 24 horas
+    
+    # Sondeo de partidos en directo (reglas de medio tiempo)
+    sondeo_intervalo_rapido: float = 15.0  # Segundos, desde sondeo_minuto_rapido hasta el descanso
+    sondeo_intervalo_normal: float = 60.0  # Primeras partes lejos del descanso
+    sondeo_intervalo_reposo: float = 600.0  # Sin primeras partes en juego, dentro de una ventana de partido
+    sondeo_minuto_rapido: int = 40
+    # IDs de liga de API-Sports (None: todas, sin calendario). Las reglas de HT están calibradas en LaLiga
+    sondeo_ligas: Optional[List[int]] = field(default_factory=lambda: [APIConfig.api_sports_league_id])
+    sondeo_ventana_minutos: int = 60  # Desde el inicio de un partido; fuera de ventanas no se sondea
+    sondeo_calendario_horas: float = 6.0  # Cada cuánto se relee el calendario (/fixtures, en caché)
+    
+    # Registro de alertas enviadas (no reenviar la misma alerta en cada ciclo)
+    registro_alertas_path: Path = DATA_DIR / "alertas" / "alertas_enviadas.sqlite"
+    registro_alertas_horas: float = 72.0  # Una alerta (partido, regla, mercado) no se reenvía en este tiempo
 
 
 @dataclass
@@ -101,6 +182,7 @@ class FeatureConfig:
     forma_window: int = 5  # Últimos N partidos para forma
     racha_window: int = 3  # Últimos N para racha
     goles_window: int = 5  # Últimos N para promedio goles
+    btts_window: int = 4  # Últimos N para BTTS histórico
     
     # Features a calcular
     calculate_form: bool = True
@@ -5,15 +5,41 @@ Responsabilidad: Obtener datos en tiempo real de La Liga
 
 import requests
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import time
 
 from src.config import API_CONFIG
+from src.data.cache_api import cache_compartida, clave_cache
+from src.data.circuito_api import circuitos_compartidos
+from src.data.presupuesto_api import ALTA, MEDIA, BAJA, presupuesto_compartido
 
 logger = logging.getLogger(__name__)
 
 
+# Valores del mercado Match Winner de /odds -> claves de cuota de los partidos
+_CLAVES_1X2 = {'Home': 'cuota_local', 'Draw': 'cuota_empate', 'Away': 'cuota_visitante'}
+
+
+def cuotas_1x2(cuotas_partido: Dict) -> Dict[str, float]:
+    """Cuotas 1X2 del primer bookmaker que ofrece Match Winner en una entrada de /odds (vacío si no hay)"""
+    for bookmaker in cuotas_partido.get('bookmakers', []):
+        for apuesta in bookmaker.get('bets', []):
+            if apuesta.get('name') != 'Match Winner':
+                continue
+            return {
+                _CLAVES_1X2[valor['value']]: float(valor['odd'])
+                for valor in apuesta.get('values', [])
+                if valor.get('value') in _CLAVES_1X2
+            }
+    return {}
+
+
+def temporada(dia: datetime) -> int:
+    """Temporada de API-Sports de un día (las ligas europeas empiezan en verano)"""
+    return dia.year if dia.month >= 7 else dia.year - 1
+
+
 class APISportsClient:
     """Cliente para API-Sports.io"""
     
@@ -26,54 +52,104 @@ class APISportsClient:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.cache = cache_compartida(config)
+        self.presupuesto = presupuesto_compartido(config)
+        self.circuitos = circuitos_compartidos(self.base_url, config)
     
-    def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+    def _make_request(self, endpoint: str, params: Dict = None, prioridad: str = MEDIA) -> Optional[Dict]:
         """
         Realiza una petición a la API con manejo de errores
         
+        Las respuestas se guardan en la caché en disco con el TTL del tipo
+        de endpoint (ver config.cache_ttl). Cada intento consume cuota del
+        presupuesto según su prioridad; sin cuota no se llama a la API y,
+        si la hay, se sirve la respuesta en caché aunque esté caducada.
+        
         Args:
             endpoint: Endpoint de la API (ej: '/fixtures')
             params: Parámetros de la query
+            prioridad: ALTA, MEDIA o BAJA (ver presupuesto_api)
         
         Returns:
             Respuesta JSON o None si falla
         """
+        return self.cache.obtener_o_pedir(
+            clave_cache(self.base_url, endpoint, params),
+            self.cache.ttl(endpoint, params),
+            lambda: self._pedir(endpoint, params, prioridad)
+        )
+    
+    def _pedir(self, endpoint: str, params: Dict = None, prioridad: str = MEDIA) -> Optional[Dict]:
+        """Petición a la API (sin caché) con reintentos"""
         url = f"{self.base_url}{endpoint}"
+        circuito = self.circuitos[endpoint]
         
         for attempt in range(self.config.max_retries):
+            if not circuito.permitir():
+                logger.info(f"🔌 API-Sports {endpoint}: circuito abierto, sin petición")
+                return None
+            
+            # Sin resultado registrado (sin cuota, 429 u otra excepción) se
+            # libera la prueba semiabierta
+            registrado = False
             try:
+                # /status no cuenta para la cuota de API-Sports
+                if endpoint != '/status' and not self.presupuesto.consumir(prioridad):
+                    return None
+                
+                inicio = time.monotonic()
                 response = self.session.get(
                     url,
                     params=params,
                     timeout=self.config.timeout
                 )
+                self.presupuesto.sincronizar_cabeceras(response.headers)
+                
+                if response.status_code == 429:
+                    logger.warning(f"⚠️ API-Sports: límite de peticiones alcanzado (429) en {endpoint}")
+                    self.presupuesto.agotar()
+                    return None
+                
                 response.raise_for_status()
                 
                 data = response.json()
+                circuito.registrar(True, time.monotonic() - inicio)
+                registrado = True
                 
                 # Verificar si la respuesta es válida
                 if data.get('errors'):
-                    logger.error(f"API Error: {data['errors']}")
+                    errores = data['errors']
+                    if isinstance(errores, dict) and ('requests' in errores or 'rateLimit' in errores):
+                        # Cuota agotada: no tiene sentido reintentar
+                        self.presupuesto.agotar(diaria='requests' in errores)
+                    logger.error(f"API Error: {errores}")
                     return None
                 
                 return data
-                
+            
             except requests.exceptions.RequestException as e:
+                circuito.registrar(False)
+                registrado = True
                 logger.warning(f"Intento {attempt + 1}/{self.config.max_retries} falló: {e}")
                 if attempt < self.config.max_retries - 1:
                     time.sleep(2 ** attempt)  # Exponential backoff
                 else:
                     logger.error(f"Error en petición a {endpoint}: {e}")
                     return None
+            
+            finally:
+                if not registrado:
+                    circuito.neutro()
         
         return None
     
-    def get_proximos_partidos(self, dias: int = 7) -> List[Dict]:
+    def get_proximos_partidos(self, dias: int = 7, prioridad: str = MEDIA) -> List[Dict]:
         """
         Obtiene próximos partidos de La Liga
         
         Args:
             dias: Número de días hacia adelante
+            prioridad: Prioridad de la petición en el presupuesto
         
         Returns:
             Lista de partidos
@@ -88,7 +164,7 @@ class APISportsClient:
             'to': fecha_hasta
         }
         
-        data = self._make_request('/fixtures', params)
+        data = self._make_request('/fixtures', params, prioridad)
         
         if data and 'response' in data:
             logger.info(f"✓ Obtenidos {len(data['response'])} próximos partidos")
@@ -96,31 +172,154 @@ class APISportsClient:
         
         return []
     
-    def get_estadisticas_partido(self, fixture_id: int) -> Optional[Dict]:
+    def get_calendario(self, ligas: List[int], dias: int = 2, prioridad: str = MEDIA) -> Optional[List[datetime]]:
+        """
+        Horas de inicio (UTC) de los partidos de unas ligas, de ayer a `dias` días
+        
+        Una petición a /fixtures por liga, con el TTL de calendario de la
+        caché.
+        
+        Args:
+            ligas: IDs de liga de API-Sports
+            dias: Días hacia adelante
+            prioridad: Prioridad de la petición en el presupuesto
+        
+        Returns:
+            Inicios ordenados, o None si falla alguna liga
+        """
+        hoy = datetime.now(timezone.utc)
+        inicios = []
+        for liga in ligas:
+            params = {
+                'league': liga,
+                'season': temporada(hoy),
+                'from': (hoy - timedelta(days=1)).strftime('%Y-%m-%d'),  # Partidos empezados antes de medianoche
+                'to': (hoy + timedelta(days=dias)).strftime('%Y-%m-%d')
+            }
+            data = self._make_request('/fixtures', params, prioridad)
+            if not data or 'response' not in data:
+                return None
+            
+            for partido in data['response']:
+                fecha = partido.get('fixture', {}).get('date')
+                if fecha:
+                    inicio = datetime.fromisoformat(fecha)
+                    inicios.append(inicio if inicio.tzinfo else inicio.replace(tzinfo=timezone.utc))
+        
+        return sorted(inicios)
+    
+    def get_partidos_en_vivo(self, ligas: Optional[List[int]] = None, prioridad: str = ALTA) -> Optional[List[Dict]]:
+        """
+        Obtiene los partidos que se están jugando ahora
+        
+        Sin caché: el TTL de '/fixtures' (calendario) dejaría pasar el
+        descanso sin verlo.
+        
+        Args:
+            ligas: IDs de liga de API-Sports (default: todas)
+            prioridad: Prioridad de la petición (ALTA: seguimiento en directo)
+        
+        Returns:
+            Lista de partidos en juego, o None si la petición falla
+        """
+        params = {'live': '-'.join(str(liga) for liga in ligas) if ligas else 'all'}
+        data = self._pedir('/fixtures', params, prioridad)
+        
+        if data and 'response' in data:
+            return data['response']
+        
+        return None
+    
+    def get_cuotas(self, fixture_id: int, prioridad: str = MEDIA) -> Dict[str, float]:
+        """
+        Obtiene las cuotas 1X2 (Match Winner) de un partido
+        
+        Args:
+            fixture_id: ID del partido
+            prioridad: Prioridad de la petición en el presupuesto
+        
+        Returns:
+            Dict con cuota_local, cuota_empate y cuota_visitante del primer
+            bookmaker que las ofrece (vacío si no hay)
+        """
+        data = self._make_request('/odds', {'fixture': fixture_id}, prioridad)
+        
+        for cuotas in (data or {}).get('response', []):
+            resultado = cuotas_1x2(cuotas)
+            if resultado:
+                return resultado
+        
+        return {}
+    
+    def get_cuotas_dia(self, fecha: str, prioridad: str = MEDIA) -> Optional[Dict[int, Dict[str, float]]]:
+        """
+        Obtiene las cuotas 1X2 de todos los partidos de La Liga de un día
+        
+        Una petición a /odds por página (10 partidos) en lugar de una por
+        partido: una jornada entera cabe en el límite por minuto.
+        
+        Args:
+            fecha: Día en formato 'YYYY-MM-DD' (UTC, como fixture.date)
+            prioridad: Prioridad de la petición en el presupuesto
+        
+        Returns:
+            {fixture_id: cuotas como get_cuotas} de los partidos con
+            Match Winner, o None si falla la primera página
+        """
+        params = {
+            'league': self.config.api_sports_league_id,
+            'season': temporada(datetime.strptime(fecha, '%Y-%m-%d')),
+            'date': fecha,
+        }
+        
+        cuotas = {}
+        pagina, paginas = 1, 1
+        while pagina <= paginas:
+            data = self._make_request('/odds', {**params, 'page': pagina} if pagina > 1 else params, prioridad)
+            if not data:
+                if pagina == 1:
+                    return None
+                logger.warning(f"⚠️ Cuotas del {fecha}: página {pagina}/{paginas} sin respuesta")
+                break
+            
+            for entrada in data.get('response', []):
+                id_partido = entrada.get('fixture', {}).get('id')
+                cuotas_partido = cuotas_1x2(entrada)
+                if id_partido is not None and cuotas_partido:
+                    cuotas[id_partido] = cuotas_partido
+            
+            paginas = data.get('paging', {}).get('total') or 1
+            pagina += 1
+        
+        return cuotas
+    
+    def get_estadisticas_partido(self, fixture_id: int, prioridad: str = ALTA) -> Optional[Dict]:
         """
         Obtiene estadísticas detalladas de un partido
         
         Args:
             fixture_id: ID del partido
+            prioridad: Prioridad de la petición (ALTA: seguimiento en directo)
         
         Returns:
             Dict con estadísticas o None
         """
         params = {'fixture': fixture_id}
-        data = self._make_request('/fixtures/statistics', params)
+        data = self._make_request('/fixtures/statistics', params, prioridad)
         
         if data and 'response' in data:
             return data['response']
         
         return None
     
-    def get_estadisticas_equipo(self, team_id: int, season: int = None) -> Optional[Dict]:
+    def get_estadisticas_equipo(self, team_id: int, season: int = None, prioridad: str = BAJA) -> Optional[Dict]:
         """
         Obtiene estadísticas de un equipo en la temporada
         
         Args:
             team_id: ID del equipo
             season: Año de la temporada (default: actual)
+            prioridad: Prioridad de la petición (BAJA: precarga)
         
         Returns:
             Dict con estadísticas o None
@@ -134,19 +333,20 @@ class APISportsClient:
             'season': season
         }
         
-        data = self._make_request('/teams/statistics', params)
+        data = self._make_request('/teams/statistics', params, prioridad)
         
         if data and 'response' in data:
             return data['response']
         
         return None
     
-    def get_clasificacion(self, season: int = None) -> List[Dict]:
+    def get_clasificacion(self, season: int = None, prioridad: str = BAJA) -> List[Dict]:
         """
         Obtiene la clasificación actual de La Liga
         
         Args:
             season: Año de la temporada (default: actual)
+            prioridad: Prioridad de la petición en el presupuesto
         
         Returns:
             Lista con la clasificación
@@ -159,7 +359,7 @@ class APISportsClient:
             'season': season
         }
         
-        data = self._make_request('/standings', params)
+        data = self._make_request('/standings', params, prioridad)
         
         if data and 'response' in data:
             return data['response']
@@ -170,16 +370,25 @@ class APISportsClient:
         """
         Verifica el estado de la API y el límite de requests
         
+        Sincroniza el presupuesto con la cuota que informa la API
+        (/status no consume cuota).
+        
         Returns:
             Dict con información del estado
         """
         data = self._make_request('/status')
         
         if data:
+            requests_info = data.get('response', {}).get('requests', {})
+            self.presupuesto.sincronizar_estado(
+                requests_info.get('current', 0),
+                requests_info.get('limit_day', 0)
+            )
             return {
                 'activa': True,
-                'requests_disponibles': data.get('response', {}).get('requests', {}).get('current', 0),
-                'limite_diario': data.get('response', {}).get('requests', {}).get('limit_day', 0)
+                'requests_disponibles': requests_info.get('current', 0),
+                'limite_diario': requests_info.get('limit_day', 0),
+                'presupuesto': self.presupuesto.estado()
             }
         
         return {'activa': False}
@@ -0,0 +1,391 @@
+"""
+Cliente asíncrono de APIs
+Responsabilidad: Pedir partidos, estadísticas y clasificación de forma
+concurrente (httpx + asyncio) con conexiones reutilizadas, compartiendo
+caché y presupuesto con los clientes síncronos
+"""
+
+import httpx
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
+
+from src.config import API_CONFIG
+from src.data.cache_api import CADUCADA, FRESCA, cache_compartida, clave_cache
+from src.data.circuito_api import circuitos_compartidos
+from src.data.presupuesto_api import ALTA, BAJA, MEDIA, presupuesto_compartido
+from src.data.unified_api import UnifiedAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIClient:
+    """
+    Cliente asíncrono sobre API-Sports y TheSportsDB
+    
+    - Un httpx.AsyncClient por fuente (pool de conexiones keep-alive)
+    - Como mucho config.async_max_concurrencia peticiones a la vez
+    - Misma caché en disco, mismas claves y mismo presupuesto que
+      APISportsClient/TheSportsDBClient
+    - Cobertura opcional (hedging): si API-Sports no ha respondido en
+      `cobertura` segundos se lanza también TheSportsDB y gana la primera
+      respuesta con partidos
+    
+    Uso:
+        async with AsyncAPIClient() as cliente:
+            jornada = await cliente.get_jornada(dias=7)
+    
+    Desde código síncrono: UnifiedAPIClient.get_jornada / ejecutar_sincrono.
+    """
+    
+    def __init__(self, config=API_CONFIG, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.config = config
+        self.cache = cache_compartida(config)
+        self.presupuesto = presupuesto_compartido(config)
+        self.circuitos_api_sports = circuitos_compartidos(config.api_sports_base_url, config)
+        self.circuitos_thesportsdb = circuitos_compartidos(config.thesportsdb_base_url, config)
+        
+        limites = httpx.Limits(
+            max_connections=config.async_max_conexiones,
+            max_keepalive_connections=config.async_max_conexiones
+        )
+        self.api_sports = httpx.AsyncClient(
+            base_url=config.api_sports_base_url,
+            headers={
+                'x-rapidapi-host': 'v3.football.api-sports.io',
+                'x-rapidapi-key': config.api_sports_key
+            },
+            timeout=config.timeout,
+            limits=limites,
+            transport=transport
+        )
+        self.thesportsdb = httpx.AsyncClient(
+            base_url=config.thesportsdb_base_url.rstrip('/') + '/',
+            timeout=config.timeout,
+            limits=limites,
+            transport=transport
+        )
+        
+        self._semaforo = asyncio.Semaphore(config.async_max_concurrencia)
+        self._revalidaciones = set()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+    
+    async def cerrar(self):
+        """Espera las revalidaciones pendientes y cierra las conexiones"""
+        if self._revalidaciones:
+            await asyncio.gather(*self._revalidaciones, return_exceptions=True)
+        await self.api_sports.aclose()
+        await self.thesportsdb.aclose()
+    
+    async def _make_request_api_sports(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        prioridad: str = MEDIA
+    ) -> Optional[Dict]:
+        """Petición a API-Sports a través de la caché (ver APISportsClient._make_request)"""
+        return await self._con_cache(
+            clave_cache(self.config.api_sports_base_url, endpoint, params),
+            self.cache.ttl(endpoint, params),
+            lambda: self._pedir_api_sports(endpoint, params, prioridad)
+        )
+    
+    async def _make_request_thesportsdb(self, endpoint: str) -> Optional[Dict]:
+        """Petición a TheSportsDB a través de la caché"""
+        return await self._con_cache(
+            clave_cache(self.config.thesportsdb_base_url, endpoint),
+            self.cache.ttl(endpoint),
+            lambda: self._pedir_thesportsdb(endpoint)
+        )
+    
+    async def _con_cache(
+        self,
+        clave: str,
+        ttl: float,
+        pedir: Callable[[], Awaitable[Optional[Dict]]]
+    ) -> Optional[Dict]:
+        """Misma política que CacheRespuestas.obtener_o_pedir, revalidando con una tarea"""
+        if ttl <= 0 or not self.config.cache_habilitada:
+            return await pedir()
+        
+        estado, guardado = self.cache.consultar(clave, ttl)
+        if estado == FRESCA:
+            return guardado
+        if estado == CADUCADA:
+            if self.cache.iniciar_revalidacion(clave):
+                tarea = asyncio.create_task(self._revalidar(clave, pedir))
+                self._revalidaciones.add(tarea)
+                tarea.add_done_callback(self._revalidaciones.discard)
+            return guardado
+        
+        return self.cache.resolver(clave, await pedir(), guardado)
+    
+    async def _revalidar(self, clave: str, pedir: Callable[[], Awaitable[Optional[Dict]]]):
+        datos = None
+        try:
+            datos = await pedir()
+        except Exception as e:
+            logger.warning(f"⚠️ Error revalidando {clave}: {e}")
+        finally:
+            self.cache.terminar_revalidacion(clave, datos)
+    
+    async def _pedir_api_sports(self, endpoint: str, params: Dict = None, prioridad: str = MEDIA) -> Optional[Dict]:
+        """Petición a API-Sports (sin caché) con reintentos"""
+        circuito = self.circuitos_api_sports[endpoint]
+        
+        for attempt in range(self.config.max_retries):
+            if not circuito.permitir():
+                logger.info(f"🔌 API-Sports {endpoint}: circuito abierto, sin petición")
+                return None
+            
+            # Sin resultado registrado (sin cuota, 429, cancelada por la
+            # cobertura u otra excepción) se libera la prueba semiabierta
+            registrado = False
+            try:
+                # /status no cuenta para la cuota; las ALTA pueden esperar un token
+                if endpoint != '/status' and not await asyncio.to_thread(self.presupuesto.consumir, prioridad):
+                    return None
+                
+                async with self._semaforo:
+                    inicio = time.monotonic()
+                    response = await self.api_sports.get(endpoint, params=params)
+                    latencia = time.monotonic() - inicio
+                self.presupuesto.sincronizar_cabeceras(response.headers)
+                
+                if response.status_code == 429:
+                    logger.warning(f"⚠️ API-Sports: límite de peticiones alcanzado (429) en {endpoint}")
+                    self.presupuesto.agotar()
+                    return None
+                
+                response.raise_for_status()
+                
+                data = response.json()
+                circuito.registrar(True, latencia)
+                registrado = True
+                
+                if data.get('errors'):
+                    errores = data['errors']
+                    if isinstance(errores, dict) and ('requests' in errores or 'rateLimit' in errores):
+                        self.presupuesto.agotar(diaria='requests' in errores)
+                    logger.error(f"API Error: {errores}")
+                    return None
+                
+                return data
+            
+            except httpx.HTTPError as e:
+                circuito.registrar(False)
+                registrado = True
+                logger.warning(f"Intento {attempt + 1}/{self.config.max_retries} falló: {e}")
+                if attempt < self.config.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                else:
+                    logger.error(f"Error en petición a {endpoint}: {e}")
+                    return None
+            
+            finally:
+                if not registrado:
+                    circuito.neutro()
+        
+        return None
+    
+    async def _pedir_thesportsdb(self, endpoint: str) -> Optional[Dict]:
+        """Petición a TheSportsDB (sin caché)"""
+        circuito = self.circuitos_thesportsdb[endpoint.split('?')[0]]
+        if not circuito.permitir():
+            logger.info(f"🔌 TheSportsDB {endpoint}: circuito abierto, sin petición")
+            return None
+        
+        registrado = False
+        try:
+            async with self._semaforo:
+                inicio = time.monotonic()
+                response = await self.thesportsdb.get(endpoint)
+                latencia = time.monotonic() - inicio
+            response.raise_for_status()
+            data = response.json()
+            circuito.registrar(True, latencia)
+            registrado = True
+            return data
+        except httpx.HTTPError as e:
+            circuito.registrar(False)
+            registrado = True
+            logger.error(f"Error en TheSportsDB: {e}")
+            return None
+        finally:
+            # Cancelada por la cobertura u otra excepción: libera la prueba semiabierta
+            if not registrado:
+                circuito.neutro()
+    
+    async def get_proximos_partidos(
+        self,
+        dias: int = 7,
+        prioridad: str = MEDIA,
+        cobertura: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Próximos partidos normalizados (formato de UnifiedAPIClient)
+        
+        Args:
+            dias: Días hacia adelante (solo para API-Sports)
+            prioridad: Prioridad en el presupuesto de API-Sports
+            cobertura: Segundos que se espera a API-Sports antes de lanzar
+                también TheSportsDB (None: config.async_cobertura; sin
+                cobertura, TheSportsDB solo se pide si API-Sports falla)
+        """
+        cobertura = self.config.async_cobertura if cobertura is None else cobertura
+        principal = asyncio.create_task(self._proximos_api_sports(dias, prioridad))
+        
+        if not self.config.use_fallback:
+            return await principal
+        
+        if cobertura is None:
+            partidos = await principal
+            return partidos or await self._proximos_thesportsdb()
+        
+        terminadas, _ = await asyncio.wait({principal}, timeout=cobertura)
+        if principal in terminadas and principal.result():
+            return principal.result()
+        
+        logger.info(f"🔄 Cobertura: lanzando TheSportsDB ({cobertura}s sin respuesta útil de API-Sports)")
+        pendientes = {principal, asyncio.create_task(self._proximos_thesportsdb())}
+        while pendientes:
+            terminadas, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in terminadas:
+                if tarea.result():
+                    for resto in pendientes:
+                        resto.cancel()
+                    return tarea.result()
+        
+        logger.error("❌ No se pudieron obtener partidos de ninguna fuente")
+        return []
+    
+    async def _proximos_api_sports(self, dias: int, prioridad: str) -> List[Dict]:
+        fecha_desde = datetime.now().strftime('%Y-%m-%d')
+        fecha_hasta = (datetime.now() + timedelta(days=dias)).strftime('%Y-%m-%d')
+        params = {
+            'league': self.config.api_sports_league_id,
+            'season': datetime.now().year,
+            'from': fecha_desde,
+            'to': fecha_hasta
+        }
+        
+        try:
+            data = await self._make_request_api_sports('/fixtures', params, prioridad)
+        except Exception as e:
+            logger.error(f"❌ Error en API-Sports: {e}")
+            return []
+        
+        if data and data.get('response'):
+            logger.info(f"✓ API-Sports: {len(data['response'])} partidos obtenidos")
+            return UnifiedAPIClient._normalizar_partidos_api_sports(data['response'])
+        return []
+    
+    async def _proximos_thesportsdb(self, limit: int = 15) -> List[Dict]:
+        try:
+            data = await self._make_request_thesportsdb(f"eventsnextleague.php?id={self.config.thesportsdb_league_id}")
+        except Exception as e:
+            logger.error(f"❌ Error en TheSportsDB: {e}")
+            return []
+        
+        if data and data.get('events'):
+            partidos = data['events'][:limit]
+            logger.info(f"✓ TheSportsDB: {len(partidos)} partidos obtenidos")
+            return UnifiedAPIClient._normalizar_partidos_thesportsdb(partidos)
+        return []
+    
+    async def get_estadisticas_partido(self, fixture_id: int, prioridad: str = ALTA) -> Optional[Dict]:
+        data = await self._make_request_api_sports('/fixtures/statistics', {'fixture': fixture_id}, prioridad)
+        return data['response'] if data and 'response' in data else None
+    
+    async def get_estadisticas_equipo(self, team_id: int, season: int = None, prioridad: str = BAJA) -> Optional[Dict]:
+        params = {
+            'team': team_id,
+            'league': self.config.api_sports_league_id,
+            'season': season or datetime.now().year
+        }
+        data = await self._make_request_api_sports('/teams/statistics', params, prioridad)
+        return data['response'] if data and 'response' in data else None
+    
+    async def get_clasificacion(self, season: int = None, prioridad: str = BAJA) -> List[Dict]:
+        params = {
+            'league': self.config.api_sports_league_id,
+            'season': season or datetime.now().year
+        }
+        data = await self._make_request_api_sports('/standings', params, prioridad)
+        return data['response'] if data and 'response' in data else []
+    
+    async def get_estadisticas_equipos(
+        self,
+        partidos: Iterable[Dict],
+        season: int = None,
+        prioridad: str = BAJA
+    ) -> Dict[int, Dict]:
+        """
+        Estadísticas de todos los equipos de una lista de partidos, en paralelo
+        
+        Solo los partidos de API-Sports traen IDs válidos para /teams/statistics.
+        
+        Returns:
+            Dict {team_id de API-Sports: estadísticas}
+        """
+        equipos = list(dict.fromkeys(
+            team_id
+            for partido in partidos if partido.get('fuente') == 'api-sports'
+            for team_id in (partido.get('local_id'), partido.get('visitante_id'))
+            if team_id is not None
+        ))
+        
+        resultados = await asyncio.gather(
+            *(self.get_estadisticas_equipo(team_id, season, prioridad) for team_id in equipos),
+            return_exceptions=True
+        )
+        
+        estadisticas = {}
+        for team_id, resultado in zip(equipos, resultados):
+            if isinstance(resultado, Exception):
+                logger.warning(f"Error en estadísticas del equipo {team_id}: {resultado}")
+            elif resultado:
+                estadisticas[team_id] = resultado
+        
+        logger.info(f"✓ Estadísticas de {len(estadisticas)}/{len(equipos)} equipos")
+        return estadisticas
+    
+    async def get_jornada(self, dias: int = 7, season: int = None, cobertura: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Partidos, clasificación y estadísticas de equipo de una jornada
+        
+        Tras los partidos, la clasificación y las estadísticas de todos
+        los equipos se piden a la vez.
+        """
+        partidos = await self.get_proximos_partidos(dias, cobertura=cobertura)
+        clasificacion, estadisticas = await asyncio.gather(
+            self.get_clasificacion(season),
+            self.get_estadisticas_equipos(partidos, season)
+        )
+        
+        return {
+            'partidos': partidos,
+            'clasificacion': clasificacion,
+            'estadisticas_equipos': estadisticas
+        }
+
+
+def ejecutar_sincrono(metodo: str, *args, config=API_CONFIG, **kwargs):
+    """
+    Ejecuta un método de AsyncAPIClient desde código síncrono
+    
+    Crea el cliente, lo cierra al terminar y corre todo en asyncio.run
+    (no se puede llamar desde un event loop en marcha).
+    """
+    async def _ejecutar():
+        async with AsyncAPIClient(config) as cliente:
+            return await getattr(cliente, metodo)(*args, **kwargs)
+    
+    return asyncio.run(_ejecutar())
@@ -0,0 +1,248 @@
+"""
+Caché persistente de respuestas de las APIs
+Responsabilidad: Guardar en SQLite las respuestas de API-Sports y
+TheSportsDB con un TTL por tipo de endpoint, servir respuestas caducadas
+mientras se revalidan en segundo plano y contar aciertos y fallos
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from src.config import API_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# Estado de una respuesta guardada
+FRESCA = 'fresca'
+CADUCADA = 'caducada'  # Se sirve y se revalida
+ANTIGUA = 'antigua'  # Solo se sirve si la petición falla
+AUSENTE = 'ausente'
+
+# Tipo de endpoint según la ruta (API-Sports) o el script (TheSportsDB).
+# Se busca por prefijo en orden: las rutas en juego van antes de '/fixtures'
+_CLASES_ENDPOINT = [
+    ('/fixtures/statistics', 'en_vivo'),
+    ('/fixtures/events', 'en_vivo'),
+    ('/fixtures', 'partidos'),
+    ('/odds/live', 'en_vivo'),
+    ('/odds', 'cuotas'),
+    ('/standings', 'clasificacion'),
+    ('/teams/statistics', 'equipos'),
+    ('/teams', 'equipos'),
+    ('/status', 'sin_cache'),
+    ('eventsnextleague', 'partidos'),
+    ('eventspastleague', 'partidos'),
+    ('lookupevent', 'partidos'),
+    ('lookuptable', 'clasificacion'),
+    ('lookupteam', 'equipos'),
+    ('searchteams', 'equipos'),
+]
+
+
+# Parámetros que convierten cualquier petición en una consulta en juego
+_PARAMETROS_EN_VIVO = ('live',)
+
+
+def clase_endpoint(endpoint: str, params: Optional[Dict] = None) -> str:
+    """
+    '/fixtures' -> 'partidos', '/fixtures' + {'live': 'all'} -> 'en_vivo',
+    'lookupteam.php?id=1' -> 'equipos'
+    """
+    if any(parametro in (params or {}) for parametro in _PARAMETROS_EN_VIVO):
+        return 'en_vivo'
+    
+    ruta = endpoint.lstrip('/')
+    for prefijo, clase in _CLASES_ENDPOINT:
+        if ruta.startswith(prefijo.lstrip('/')):
+            return clase
+    return 'otros'
+
+
+def clave_cache(base_url: str, endpoint: str, params: Optional[Dict] = None) -> str:
+    """Clave estable de una petición (URL base + endpoint + parámetros ordenados)"""
+    return f"{base_url}|{endpoint}|{json.dumps(params or {}, sort_keys=True, default=str)}"
+
+
+class CacheRespuestas:
+    """
+    Caché SQLite de respuestas JSON con stale-while-revalidate
+    
+    - Respuesta con edad <= TTL: se sirve desde disco (acierto)
+    - Edad <= TTL × config.cache_factor_stale: se sirve la respuesta
+      caducada y se revalida en un hilo en segundo plano
+    - Sin respuesta o demasiado antigua: petición síncrona (fallo). Si la
+      petición falla y hay una respuesta caducada, se sirve esa.
+    
+    Las respuestas nulas (errores) no se guardan. Los TTL por tipo de
+    endpoint están en config.cache_ttl; TTL 0 desactiva la caché (ni se
+    guarda ni se sirve caducada), como en los datos en juego.
+    """
+    
+    def __init__(self, config=API_CONFIG, ruta: Optional[Path] = None):
+        self.config = config
+        self.ruta = Path(ruta or config.cache_path)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas ("
+            "clave TEXT PRIMARY KEY, datos TEXT NOT NULL, guardado REAL NOT NULL)"
+        )
+        self._conexion.commit()
+        
+        self._revalidando = set()
+        self.contadores = {'aciertos': 0, 'caducados': 0, 'fallos': 0, 'revalidaciones': 0, 'errores': 0}
+    
+    def ttl(self, endpoint: str, params: Optional[Dict] = None) -> float:
+        return self.config.cache_ttl.get(clase_endpoint(endpoint, params), self.config.cache_ttl.get('otros', 0))
+    
+    def obtener_o_pedir(self, clave: str, ttl: float, pedir: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Respuesta de la caché o de pedir() según su edad
+        
+        Args:
+            clave: Clave de la petición (clave_cache)
+            ttl: Segundos que una respuesta se considera fresca
+            pedir: Función que hace la petición real (None si falla)
+        """
+        if ttl <= 0 or not self.config.cache_habilitada:
+            return pedir()
+        
+        estado, guardado = self.consultar(clave, ttl)
+        if estado == FRESCA:
+            return guardado
+        if estado == CADUCADA:
+            self._revalidar(clave, pedir)
+            return guardado
+        
+        return self.resolver(clave, pedir(), guardado)
+    
+    def consultar(self, clave: str, ttl: float) -> Tuple[str, Optional[Any]]:
+        """
+        Estado de una respuesta guardada (y cuenta el acierto o fallo)
+        
+        Returns:
+            (FRESCA | CADUCADA | ANTIGUA | AUSENTE, datos guardados o None)
+        """
+        guardado = self._leer(clave)
+        if guardado is None:
+            self._contar('fallos')
+            return AUSENTE, None
+        
+        datos, edad = guardado
+        if edad <= ttl:
+            self._contar('aciertos')
+            return FRESCA, datos
+        if edad <= ttl * self.config.cache_factor_stale:
+            self._contar('caducados')
+            return CADUCADA, datos
+        
+        self._contar('fallos')
+        return ANTIGUA, datos
+    
+    def resolver(self, clave: str, datos: Optional[Any], guardado: Optional[Any]) -> Optional[Any]:
+        """Guarda una respuesta nueva o, si la petición falló, devuelve la guardada"""
+        if datos is not None:
+            self.guardar(clave, datos)
+            return datos
+        
+        if guardado is not None:
+            self._contar('errores')
+            logger.warning(f"⚠️ Petición fallida, sirviendo respuesta en caché: {clave}")
+        return guardado
+    
+    def iniciar_revalidacion(self, clave: str) -> bool:
+        """False si ya hay una revalidación de esa clave en curso"""
+        with self._lock:
+            if clave in self._revalidando:
+                return False
+            self._revalidando.add(clave)
+            return True
+    
+    def terminar_revalidacion(self, clave: str, datos: Optional[Any]):
+        if datos is not None:
+            self.guardar(clave, datos)
+            self._contar('revalidaciones')
+        with self._lock:
+            self._revalidando.discard(clave)
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores y tasa de aciertos (frescos + caducados)"""
+        with self._lock:
+            contadores = dict(self.contadores)
+        servidas = contadores['aciertos'] + contadores['caducados']
+        total = servidas + contadores['fallos']
+        return {**contadores, 'tasa_aciertos': servidas / total if total else 0.0}
+    
+    def limpiar(self):
+        """Elimina todas las respuestas guardadas"""
+        with self._lock:
+            self._conexion.execute("DELETE FROM respuestas")
+            self._conexion.commit()
+    
+    def _revalidar(self, clave: str, pedir: Callable[[], Optional[Any]]):
+        """Refresca la respuesta en un hilo en segundo plano (una revalidación por clave)"""
+        if not self.iniciar_revalidacion(clave):
+            return
+        
+        def tarea():
+            datos = None
+            try:
+                datos = pedir()
+            except Exception as e:
+                logger.warning(f"⚠️ Error revalidando {clave}: {e}")
+            finally:
+                self.terminar_revalidacion(clave, datos)
+        
+        threading.Thread(target=tarea, name='cache-revalidar', daemon=True).start()
+    
+    def _leer(self, clave: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT datos, guardado FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+        if fila is None:
+            return None
+        return json.loads(fila[0]), time.time() - fila[1]
+    
+    def guardar(self, clave: str, datos: Any):
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO respuestas (clave, datos, guardado) VALUES (?, ?, ?)",
+                (clave, json.dumps(datos), time.time())
+            )
+            self._conexion.commit()
+    
+    def _contar(self, contador: str):
+        with self._lock:
+            self.contadores[contador] += 1
+
+
+_CACHES: Dict[Tuple, CacheRespuestas] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def cache_compartida(config=API_CONFIG) -> CacheRespuestas:
+    """
+    Caché única por fichero y política (TTL, stale) dentro del proceso
+    
+    Los clientes que se crean en cada petición web comparten así la
+    conexión y los contadores.
+    """
+    clave = (
+        Path(config.cache_path),
+        config.cache_habilitada,
+        config.cache_factor_stale,
+        tuple(sorted(config.cache_ttl.items())),
+    )
+    with _CACHES_LOCK:
+        if clave not in _CACHES:
+            _CACHES[clave] = CacheRespuestas(config)
+        return _CACHES[clave]
@@ -0,0 +1,178 @@
+"""
+Cortacircuitos por endpoint
+Responsabilidad: Dejar de llamar a un endpoint que falla o va lento y
+volver a probarlo solo tras un enfriamiento (cerrado/abierto/semiabierto)
+"""
+
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
+
+from src.config import API_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# Estados del circuito
+CERRADO = 'cerrado'  # Peticiones normales
+ABIERTO = 'abierto'  # Sin peticiones hasta que pase el enfriamiento
+SEMIABIERTO = 'semiabierto'  # Una petición de prueba decide si se cierra o se reabre
+
+
+class Cortacircuitos:
+    """
+    Cortacircuitos de un endpoint
+    
+    - Cerrado: se abre tras config.circuito_umbral_fallos fallos seguidos.
+      Cuenta como fallo una excepción de red/5xx y también una respuesta
+      más lenta que config.circuito_umbral_latencia.
+    - Abierto: rechaza las peticiones durante el enfriamiento
+      (config.circuito_enfriamiento, se duplica en cada reapertura hasta
+      config.circuito_enfriamiento_max)
+    - Semiabierto: deja pasar una sola petición de prueba; si va bien el
+      circuito se cierra y el enfriamiento vuelve al inicial
+    
+    Toda petición permitida termina en registrar() o neutro(), también si
+    se cancela o lanza otra excepción (try/finally en los clientes); si
+    no, la prueba quedaría retenida y el circuito rechazaría para siempre.
+    """
+    
+    def __init__(self, nombre: str, config=API_CONFIG, reloj=time.monotonic):
+        self.nombre = nombre
+        self.config = config
+        self.reloj = reloj
+        
+        self._lock = threading.Lock()
+        self.estado = CERRADO
+        self.fallos_seguidos = 0
+        self.enfriamiento = config.circuito_enfriamiento
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self.aperturas = 0
+        self.rechazadas = 0
+        self.latencia_media = None
+    
+    def permitir(self) -> bool:
+        """True si se puede hacer la petición ahora"""
+        with self._lock:
+            if self.estado == ABIERTO and self.reloj() - self._abierto_desde >= self.enfriamiento:
+                self.estado = SEMIABIERTO
+                self._prueba_en_curso = False
+                logger.info(f"🔌 Circuito {self.nombre}: semiabierto, probando")
+            
+            if self.estado == CERRADO:
+                return True
+            if self.estado == SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            
+            self.rechazadas += 1
+            return False
+    
+    def registrar(self, exito: bool, latencia: Optional[float] = None):
+        """
+        Resultado de una petición permitida
+        
+        Args:
+            exito: False si la petición falló (red, timeout, 5xx)
+            latencia: Segundos que tardó; por encima del umbral es un fallo
+        """
+        if exito and latencia is not None and latencia > self.config.circuito_umbral_latencia:
+            logger.warning(f"🐢 Circuito {self.nombre}: respuesta lenta ({latencia:.1f}s)")
+            exito = False
+        
+        with self._lock:
+            if latencia is not None:
+                self.latencia_media = latencia if self.latencia_media is None else 0.8 * self.latencia_media + 0.2 * latencia
+            
+            if exito:
+                if self.estado != CERRADO:
+                    logger.info(f"✓ Circuito {self.nombre}: cerrado")
+                self.estado = CERRADO
+                self.fallos_seguidos = 0
+                self.enfriamiento = self.config.circuito_enfriamiento
+            elif self.estado == SEMIABIERTO:
+                self.enfriamiento = min(self.enfriamiento * 2, self.config.circuito_enfriamiento_max)
+                self._abrir()
+            else:
+                self.fallos_seguidos += 1
+                if self.estado == CERRADO and self.fallos_seguidos >= self.config.circuito_umbral_fallos:
+                    self._abrir()
+            
+            self._prueba_en_curso = False
+    
+    def neutro(self):
+        """Petición permitida que no dice nada de la salud del endpoint (429, sin cuota, cancelada)"""
+        with self._lock:
+            self._prueba_en_curso = False
+    
+    def reiniciar(self):
+        with self._lock:
+            self.estado = CERRADO
+            self.fallos_seguidos = 0
+            self.enfriamiento = self.config.circuito_enfriamiento
+            self._prueba_en_curso = False
+    
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            info = {
+                'estado': self.estado,
+                'fallos_seguidos': self.fallos_seguidos,
+                'aperturas': self.aperturas,
+                'rechazadas': self.rechazadas,
+                'latencia_media': round(self.latencia_media, 3) if self.latencia_media is not None else None,
+            }
+            if self.estado == ABIERTO:
+                info['reintento_en'] = round(max(self.enfriamiento - (self.reloj() - self._abierto_desde), 0), 1)
+            return info
+    
+    def _abrir(self):
+        self.estado = ABIERTO
+        self._abierto_desde = self.reloj()
+        self.aperturas += 1
+        logger.warning(f"⚠️ Circuito {self.nombre}: abierto durante {self.enfriamiento:.0f}s")
+
+
+class Circuitos:
+    """Un Cortacircuitos por endpoint, creado al primer uso"""
+    
+    def __init__(self, config=API_CONFIG):
+        self.config = config
+        self._lock = threading.Lock()
+        self._circuitos: Dict[str, Cortacircuitos] = {}
+    
+    def __getitem__(self, endpoint: str) -> Cortacircuitos:
+        with self._lock:
+            if endpoint not in self._circuitos:
+                self._circuitos[endpoint] = Cortacircuitos(endpoint, self.config)
+            return self._circuitos[endpoint]
+    
+    def alguno_disponible(self) -> bool:
+        """False solo si todos los circuitos conocidos están abiertos"""
+        with self._lock:
+            circuitos = list(self._circuitos.values())
+        return not circuitos or any(c.estado != ABIERTO for c in circuitos)
+    
+    def reiniciar(self):
+        with self._lock:
+            circuitos = list(self._circuitos.values())
+        for circuito in circuitos:
+            circuito.reiniciar()
+    
+    def info(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            circuitos = dict(self._circuitos)
+        return {endpoint: circuito.info() for endpoint, circuito in sorted(circuitos.items())}
+
+
+_CIRCUITOS: Dict[str, Circuitos] = {}
+_CIRCUITOS_LOCK = threading.Lock()
+
+
+def circuitos_compartidos(base_url: str, config=API_CONFIG) -> Circuitos:
+    """Circuitos únicos por URL base dentro del proceso"""
+    with _CIRCUITOS_LOCK:
+        if base_url not in _CIRCUITOS:
+            _CIRCUITOS[base_url] = Circuitos(config)
+        return _CIRCUITOS[base_url]
@@ -4,36 +4,133 @@ Responsabilidad: Transformar datos crudos en formato consistente
 """
 
 import pandas as pd
+import numpy as np
+from typing import Any, Dict, Iterable
 import logging
 
+from src.data.esquemas import normalizar_esquema, parsear_fechas
+from src.data.equipos import REGISTRO_EQUIPOS
+
 logger = logging.getLogger(__name__)
 
 
+# Columnas de football-data.co.uk -> nombres estándar
+RENOMBRADO = {
+    'HomeTeam': 'Local',
+    'AwayTeam': 'Visitante',
+    'FTHG': 'Goles_Local',
+    'FTAG': 'Goles_Visitante',
+    'FTR': 'Resultado',
+    'B365H': 'Cuota_Local',
+    'B365D': 'Cuota_Empate',
+    'B365A': 'Cuota_Visitante',
+    'HTHG': 'Goles_Local_HT',
+    'HTAG': 'Goles_Visitante_HT',
+    'HTR': 'Resultado_HT',
+    'HS': 'Tiros_Local',
+    'AS': 'Tiros_Visitante',
+    'HST': 'Tiros_Puerta_Local',
+    'AST': 'Tiros_Puerta_Visitante',
+}
+
+# Modo compacto: tipos por columna (las demás columnas se descartan)
+TIPOS_COMPACTOS = {
+    'Date': None,
+    'Time': 'category',
+    'Div': 'category',
+    'Liga_Code': 'category',
+    'Temporada': 'category',
+    'Local': 'category',
+    'Visitante': 'category',
+    'Local_ID': np.int32,
+    'Visitante_ID': np.int32,
+    'Resultado': 'category',
+    'Resultado_HT': 'category',
+    'Goles_Local': np.int8,
+    'Goles_Visitante': np.int8,
+    'Goles_Local_HT': np.int8,
+    'Goles_Visitante_HT': np.int8,
+    'Tiros_Local': np.int8,
+    'Tiros_Visitante': np.int8,
+    'Tiros_Puerta_Local': np.int8,
+    'Tiros_Puerta_Visitante': np.int8,
+    'Total_Goles': np.int8,
+    'Margen': np.int8,
+    'Cuota_Local': np.float32,
+    'Cuota_Empate': np.float32,
+    'Cuota_Visitante': np.float32,
+    'Año': np.int16,
+    'Mes': np.int8,
+    'Dia_Semana': np.int8,
+    'Jornada': np.int16,
+    'BTTS': None,
+}
+
+
+def añadir_columnas(df: pd.DataFrame, columnas: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Añade varias columnas a la vez (las que ya existen se sustituyen en su sitio)
+    
+    Las columnas nuevas se unen con un solo pd.concat(axis=1): insertarlas
+    una a una en una tabla ancha la fragmenta (PerformanceWarning de pandas).
+    Devuelve un DataFrame nuevo; `df` no se modifica.
+    """
+    df = df.copy(deep=False)
+    nuevas = {}
+    for nombre, valores in columnas.items():
+        if nombre in df.columns:
+            df[nombre] = valores
+        else:
+            nuevas[nombre] = valores
+    
+    if not nuevas:
+        return df
+    # Una Serie por columna: el concat no copia los arrays en un bloque 2D
+    return pd.concat(
+        [df] + [pd.Series(valores, index=df.index, name=nombre) for nombre, valores in nuevas.items()],
+        axis=1
+    )
+
+
 class DataCleaner:
     """Limpia y estandariza datos de football-data.co.uk"""
     
     @staticmethod
-    def limpiar(df: pd.DataFrame) -> pd.DataFrame:
+    def limpiar(df: pd.DataFrame, compacto: bool = False, columnas_extra: Iterable[str] = ()) -> pd.DataFrame:
         """
         Pipeline completo de limpieza
         
         Args:
             df: DataFrame crudo
+            compacto: Si True, aplica DataCleaner.compactar al resultado
+            columnas_extra: Columnas a conservar en modo compacto además
+                de las de TIPOS_COMPACTOS
         
         Returns:
             DataFrame limpio y estandarizado
         """
-        df = df.copy()
+        # 0. Llevar el formato de origen a las columnas canónicas
+        df = normalizar_esquema(df)
         
-        # 1. Convertir fechas
-        df['Date'] = pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce')
+        # 1. Convertir fechas (dd/mm/yyyy y dd/mm/yy mezcladas)
+        fechas = parsear_fechas(df['Date']).to_numpy()
         
         # 2. Filtrar partidos incompletos
         columnas_requeridas = ['FTHG', 'FTAG', 'FTR']
-        df = df.dropna(subset=columnas_requeridas)
+        posiciones = np.flatnonzero(df[columnas_requeridas].notna().all(axis=1).to_numpy())
         
         # 3. Ordenar cronológicamente (CRÍTICO para backtest)
-        df = df.sort_values('Date').reset_index(drop=True)
+        # Orden estable: partidos del mismo día conservan el orden del CSV,
+        # así las actualizaciones incrementales mantienen el mismo prefijo
+        posiciones = posiciones[np.argsort(fechas[posiciones], kind='stable')]
+        
+        # Filtro y orden en una sola copia (solo de las columnas que se conservan)
+        if compacto:
+            conservar = set(TIPOS_COMPACTOS) | set(columnas_extra)
+            df = df[[c for c in df.columns if RENOMBRADO.get(c, c) in conservar or c in conservar]]
+        df = df.take(posiciones)
+        df.index = pd.RangeIndex(len(df))
+        df['Date'] = fechas[posiciones]
         
         # 4. Renombrar columnas a español estándar
         df = DataCleaner._renombrar_columnas(df)
@@ -46,33 +143,78 @@ class DataCleaner:
         
         logger.info(f"✓ Datos limpiados: {len(df)} partidos válidos")
         
+        # 7. Tipos compactos y columnas útiles (opcional)
+        if compacto:
+            df = DataCleaner.compactar(df, columnas_extra)
+        
         return df
     
     @staticmethod
-    def _renombrar_columnas(df: pd.DataFrame) -> pd.DataFrame:
-        """Renombra columnas a nombres estándar"""
-        renombrado = {
-            'HomeTeam': 'Local',
-            'AwayTeam': 'Visitante',
-            'FTHG': 'Goles_Local',
-            'FTAG': 'Goles_Visitante',
-            'FTR': 'Resultado',
-            'B365H': 'Cuota_Local',
-            'B365D': 'Cuota_Empate',
-            'B365A': 'Cuota_Visitante',
-            'HTHG': 'Goles_Local_HT',
-            'HTAG': 'Goles_Visitante_HT',
-            'HTR': 'Resultado_HT',
-            'HS': 'Tiros_Local',
-            'AS': 'Tiros_Visitante',
-            'HST': 'Tiros_Puerta_Local',
-            'AST': 'Tiros_Puerta_Visitante',
-        }
+    def compactar(df: pd.DataFrame, columnas_extra: Iterable[str] = ()) -> pd.DataFrame:
+        """
+        Representación compacta de la tabla de partidos
+        
+        - Equipos, ligas, temporadas y resultados como category
+        - Goles y conteos como int8/int16 (float32 si tienen nulos)
+        - Cuotas como float32
+        - Se descartan las columnas fuera de TIPOS_COMPACTOS y columnas_extra
+          (casas de apuestas sin usar, árbitro, estadísticas crudas...)
         
-        # Solo renombrar columnas que existen
-        renombrado = {k: v for k, v in renombrado.items() if k in df.columns}
+        Las features que se calculen después (FeatureEngineer) no cambian:
+        las sumas acumuladas de numpy promocionan int8 al entero por defecto.
+        Las cuotas en float32 tienen ~7 cifras significativas.
+        """
+        extra = [c for c in columnas_extra if c in df.columns and c not in TIPOS_COMPACTOS]
+        columnas = [c for c in df.columns if c in TIPOS_COMPACTOS] + extra
+        
+        compacto = {}
+        for columna in columnas:
+            serie = df[columna]
+            tipo = TIPOS_COMPACTOS.get(columna)
+            
+            if tipo is None:
+                compacto[columna] = serie
+            elif tipo == 'category':
+                compacto[columna] = serie.astype('category')
+            elif np.issubdtype(tipo, np.integer) and serie.isna().any():
+                compacto[columna] = pd.to_numeric(serie, errors='coerce').astype(np.float32)
+            else:
+                compacto[columna] = pd.to_numeric(serie, errors='coerce').astype(tipo)
+        
+        resultado = pd.DataFrame(compacto, index=df.index)
         
-        return df.rename(columns=renombrado)
+        informe = DataCleaner.informe_memoria(df, resultado)
+        logger.info(
+            f"✓ Modo compacto: {informe['antes_mb']:.1f} MB → {informe['despues_mb']:.1f} MB "
+            f"(-{informe['reduccion']:.0%}, {informe['columnas_antes']} → {informe['columnas_despues']} columnas)"
+        )
+        
+        return resultado
+    
+    @staticmethod
+    def informe_memoria(antes: pd.DataFrame, despues: pd.DataFrame) -> Dict[str, float]:
+        """
+        Huella en memoria de dos versiones de la tabla (incluye strings)
+        
+        Returns:
+            Dict con antes_mb, despues_mb, reduccion (fracción) y número de columnas
+        """
+        antes_mb = antes.memory_usage(deep=True).sum() / 1024 ** 2
+        despues_mb = despues.memory_usage(deep=True).sum() / 1024 ** 2
+        
+        return {
+            'antes_mb': antes_mb,
+            'despues_mb': despues_mb,
+            'reduccion': 1 - despues_mb / antes_mb if antes_mb else 0.0,
+            'columnas_antes': antes.shape[1],
+            'columnas_despues': despues.shape[1],
+        }
+    
+    @staticmethod
+    def _renombrar_columnas(df: pd.DataFrame) -> pd.DataFrame:
+        """Renombra columnas a nombres estándar (sin copiar los datos)"""
+        df.columns = [RENOMBRADO.get(c, c) for c in df.columns]
+        return df
     
     @staticmethod
     def _validar_tipos(df: pd.DataFrame) -> pd.DataFrame:
@@ -93,27 +235,34 @@ class DataCleaner:
     
     @staticmethod
     def _añadir_metadata(df: pd.DataFrame) -> pd.DataFrame:
-        """Añade columnas de metadata útil"""
-        # Año de la temporada
-        df['Año'] = df['Date'].dt.year
-        
-        # Mes (útil para análisis estacional)
-        df['Mes'] = df['Date'].dt.month
-        
-        # Día de la semana (útil para detectar patrones)
-        df['Dia_Semana'] = df['Date'].dt.dayofweek
-        
-        # Jornada (numeración secuencial por temporada)
-        df['Jornada'] = df.groupby('Temporada').cumcount() + 1
-        
-        # BTTS (Both Teams To Score)
-        df['BTTS'] = (df['Goles_Local'] > 0) & (df['Goles_Visitante'] > 0)
+        """Añade columnas de metadata útil (todas en un solo paso)"""
+        fechas = df['Date'].dt
+        goles_local = df['Goles_Local']
+        goles_visitante = df['Goles_Visitante']
         
-        # Total de goles
-        df['Total_Goles'] = df['Goles_Local'] + df['Goles_Visitante']
-        
-        # Margen de victoria
-        df['Margen'] = abs(df['Goles_Local'] - df['Goles_Visitante'])
-        
-        return df
-
+        return añadir_columnas(df, {
+            # IDs canónicos de los equipos (ver src/data/equipos.py)
+            'Local_ID': REGISTRO_EQUIPOS.ids(df['Local']),
+            'Visitante_ID': REGISTRO_EQUIPOS.ids(df['Visitante']),
+            
+            # Año de la temporada
+            'Año': fechas.year,
+            
+            # Mes (útil para análisis estacional)
+            'Mes': fechas.month,
+            
+            # Día de la semana (útil para detectar patrones)
+            'Dia_Semana': fechas.dayofweek,
+            
+            # Jornada (numeración secuencial por temporada)
+            'Jornada': df.groupby('Temporada').cumcount() + 1,
+            
+            # BTTS (Both Teams To Score)
+            'BTTS': (goles_local > 0) & (goles_visitante > 0),
+            
+            # Total de goles
+            'Total_Goles': goles_local + goles_visitante,
+            
+            # Margen de victoria
+            'Margen': abs(goles_local - goles_visitante),
+        })
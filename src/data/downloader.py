@@ -0,0 +1,232 @@
+"""
+Descargador concurrente de football-data.co.uk
+Responsabilidad: Descargar CSV en paralelo con una sesión HTTP compartida,
+límite de peticiones por host y peticiones condicionales (ETag/Last-Modified)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import logging
+import threading
+import time
+
+from src.config import DATA_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# Estados de una descarga
+DESCARGADO = 'descargado'
+SIN_CAMBIOS = 'sin_cambios'
+OMITIDO = 'omitido'
+ERROR = 'error'
+
+# Fichero con los validadores HTTP de cada CSV, junto a los CSV
+CABECERAS = '.cabeceras_http.json'
+
+
+def temporada_actual(fecha: Optional[date] = None) -> str:
+    """
+    Código de la temporada en curso ('2526' para 2025-26)
+    
+    La temporada cambia en julio.
+    """
+    fecha = fecha or date.today()
+    inicio = fecha.year if fecha.month >= 7 else fecha.year - 1
+    return f"{inicio % 100:02d}{(inicio + 1) % 100:02d}"
+
+
+class LimitadorHost:
+    """Intervalo mínimo entre peticiones al mismo host (seguro entre hilos)"""
+    
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._siguiente: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def esperar(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._siguiente.get(host, ahora))
+            self._siguiente[host] = turno + self.intervalo
+        
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+
+class Descargador:
+    """
+    Descarga CSV de forma concurrente
+    
+    - Un pool de hilos acotado comparte una requests.Session (keep-alive)
+    - Las peticiones a un mismo host se espacian config.descarga_intervalo_host
+    - Los ETag/Last-Modified se guardan en un JSON junto a los CSV; un
+      fichero sin cambios cuesta una respuesta 304
+    - Los ficheros existentes solo se vuelven a pedir si son de la
+      temporada en curso (o con refrescar=True)
+    
+    Las URL base salen de config.base_url y config.base_url_ligas_extra
+    (variables FOOTBALL_DATA_BASE_URL y FOOTBALL_DATA_EXTRA_URL), de modo
+    que se puede apuntar a un servidor HTTP local.
+    """
+    
+    def __init__(self, config=DATA_CONFIG, session: Optional[requests.Session] = None):
+        self.config = config
+        self.base_url = config.base_url.rstrip('/') + '/'
+        self.base_url_ligas_extra = config.base_url_ligas_extra.rstrip('/') + '/'
+        self.limitador = LimitadorHost(config.descarga_intervalo_host)
+        
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.descarga_max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        
+        self._lock = threading.Lock()
+        self._cabeceras: Dict[Path, Dict[str, Dict[str, str]]] = {}
+    
+    def url(self, liga_code: str, temporada: str) -> str:
+        return f"{self.base_url}{temporada}/{liga_code}.csv"
+    
+    def url_liga_extra(self, liga_code: str) -> str:
+        return f"{self.base_url_ligas_extra}{liga_code}.csv"
+    
+    def descargar_temporadas(
+        self,
+        pares: List[Tuple[str, str]],
+        directorio: Path,
+        refrescar: bool = False
+    ) -> Dict[Path, str]:
+        """
+        Descarga (liga, temporada) en paralelo como {liga}_{temporada}.csv
+        
+        Args:
+            pares: Lista de (liga_code, temporada)
+            directorio: Directorio de destino
+            refrescar: Si True, revalida también las temporadas cerradas
+        
+        Returns:
+            Dict {ruta: estado}
+        """
+        en_curso = temporada_actual()
+        tareas = [
+            (self.url(liga, temporada), Path(directorio) / f"{liga}_{temporada}.csv", refrescar or temporada == en_curso)
+            for liga, temporada in pares
+        ]
+        return self._descargar_tareas(tareas, directorio)
+    
+    def descargar_ligas_extra(self, ligas: List[str], directorio: Path) -> Dict[Path, str]:
+        """
+        Descarga las ligas del formato /new/ como {liga}_todas.csv
+        
+        Cada fichero incluye la temporada en curso, así que siempre se
+        revalida (petición condicional).
+        """
+        tareas = [
+            (self.url_liga_extra(liga), Path(directorio) / f"{liga}_todas.csv", True)
+            for liga in ligas
+        ]
+        return self._descargar_tareas(tareas, directorio)
+    
+    def _descargar_tareas(self, tareas: List[Tuple[str, Path, bool]], directorio: Path) -> Dict[Path, str]:
+        """Ejecuta (url, ruta, refrescar) en el pool y guarda los validadores"""
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+        
+        with ThreadPoolExecutor(max_workers=self.config.descarga_max_workers) as pool:
+            estados = list(pool.map(lambda tarea: self.descargar(*tarea, guardar_cabeceras=False), tareas))
+        
+        self._guardar_cabeceras(directorio)
+        
+        resumen = {estado: estados.count(estado) for estado in (DESCARGADO, SIN_CAMBIOS, OMITIDO, ERROR)}
+        logger.info(
+            f"✓ Descargas: {resumen[DESCARGADO]} nuevas, {resumen[SIN_CAMBIOS]} sin cambios (304), "
+            f"{resumen[OMITIDO]} omitidas, {resumen[ERROR]} errores"
+        )
+        
+        return {filepath: estado for (_, filepath, _), estado in zip(tareas, estados)}
+    
+    def descargar(self, url: str, filepath: Path, refrescar: bool = False, guardar_cabeceras: bool = True) -> str:
+        """
+        Descarga un fichero si no existe o, con refrescar, si ha cambiado
+        
+        Returns:
+            Estado: 'descargado', 'sin_cambios', 'omitido' o 'error'
+        """
+        filepath = Path(filepath)
+        if filepath.exists() and not refrescar:
+            return OMITIDO
+        
+        validadores = self._validadores(filepath) if filepath.exists() else {}
+        headers = {}
+        if 'etag' in validadores:
+            headers['If-None-Match'] = validadores['etag']
+        if 'last_modified' in validadores:
+            headers['If-Modified-Since'] = validadores['last_modified']
+        
+        self.limitador.esperar(url)
+        
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.config.descarga_timeout)
+            
+            if response.status_code == 304:
+                estado = SIN_CAMBIOS
+            else:
+                response.raise_for_status()
+                
+                tmp_path = filepath.with_suffix('.tmp')
+                tmp_path.write_bytes(response.content)
+                tmp_path.replace(filepath)
+                
+                self._registrar_validadores(filepath, response.headers)
+                estado = DESCARGADO
+        
+        except Exception as e:
+            logger.error(f"✗ Error descargando {url}: {e}")
+            return ERROR
+        
+        if guardar_cabeceras:
+            self._guardar_cabeceras(filepath.parent)
+        
+        logger.debug(f"  {filepath.name}: {estado}")
+        return estado
+    
+    def _tabla_cabeceras(self, directorio: Path) -> Dict[str, Dict[str, str]]:
+        """Validadores del directorio (se cargan una vez)"""
+        with self._lock:
+            if directorio not in self._cabeceras:
+                ruta = directorio / CABECERAS
+                try:
+                    self._cabeceras[directorio] = json.loads(ruta.read_text()) if ruta.exists() else {}
+                except (OSError, ValueError):
+                    self._cabeceras[directorio] = {}
+            return self._cabeceras[directorio]
+    
+    def _validadores(self, filepath: Path) -> Dict[str, str]:
+        tabla = self._tabla_cabeceras(filepath.parent)
+        with self._lock:
+            return dict(tabla.get(filepath.name, {}))
+    
+    def _registrar_validadores(self, filepath: Path, headers):
+        validadores = {}
+        if headers.get('ETag'):
+            validadores['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validadores['last_modified'] = headers['Last-Modified']
+        
+        tabla = self._tabla_cabeceras(filepath.parent)
+        with self._lock:
+            tabla[filepath.name] = validadores
+    
+    def _guardar_cabeceras(self, directorio: Path):
+        tabla = self._tabla_cabeceras(directorio)
+        with self._lock:
+            (directorio / CABECERAS).write_text(json.dumps(tabla, indent=2, sort_keys=True))
@@ -0,0 +1,177 @@
+"""
+Registro canónico de equipos
+Responsabilidad: Asignar un ID entero estable a cada equipo y resolver los
+nombres de todas las fuentes (football-data, API-Sports, TheSportsDB)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import re
+import unicodedata
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+# Equipos con ID fijo: {id: (nombre canónico, alias)}
+# Los alias solo hacen falta cuando la clave normalizada (minúsculas, sin
+# acentos ni siglas de club como FC/CF/CD) difiere entre fuentes.
+EQUIPOS: Dict[int, Tuple[str, Tuple[str, ...]]] = {
+    # La Liga
+    1: ('Real Madrid', ()),
+    2: ('Barcelona', ()),
+    3: ('Atletico Madrid', ('Ath Madrid', 'Atlético de Madrid', 'Club Atletico de Madrid')),
+    4: ('Sevilla', ()),
+    5: ('Valencia', ()),
+    6: ('Villarreal', ()),
+    7: ('Real Sociedad', ('Sociedad',)),
+    8: ('Athletic Bilbao', ('Ath Bilbao', 'Athletic Club', 'Athletic')),
+    9: ('Real Betis', ('Betis', 'Real Betis Balompie')),
+    10: ('Celta Vigo', ('Celta', 'RC Celta', 'Celta de Vigo')),
+    11: ('Granada', ()),
+    12: ('Getafe', ()),
+    13: ('Osasuna', ()),
+    14: ('Espanyol', ('Espanol', 'RCD Espanyol de Barcelona')),
+    15: ('Alaves', ('Deportivo Alaves',)),
+    16: ('Rayo Vallecano', ('Vallecano',)),
+    17: ('Mallorca', ('RCD Mallorca', 'Real Mallorca')),
+    18: ('Girona', ()),
+    19: ('Las Palmas', ('UD Las Palmas',)),
+    20: ('Valladolid', ('Real Valladolid',)),
+    21: ('Leganes', ()),
+    22: ('Levante', ()),
+    23: ('Eibar', ()),
+    24: ('Huesca', ()),
+    25: ('Cadiz', ()),
+    26: ('Elche', ()),
+    27: ('Almeria', ()),
+    28: ('Deportivo La Coruna', ('La Coruna', 'Deportivo', 'Deportivo de La Coruna')),
+    29: ('Malaga', ()),
+    30: ('Sporting Gijon', ('Sp Gijon', 'Real Sporting de Gijon', 'Sporting de Gijon')),
+    31: ('Racing Santander', ('Santander', 'Real Racing Club')),
+    32: ('Real Oviedo', ('Oviedo',)),
+    33: ('Real Zaragoza', ('Zaragoza',)),
+    
+    # Premier League
+    101: ('Manchester City', ('Man City',)),
+    102: ('Manchester United', ('Man United', 'Man Utd')),
+    103: ('Tottenham', ('Tottenham Hotspur', 'Spurs')),
+    104: ('Nottingham Forest', ("Nott'm Forest",)),
+    105: ('Wolves', ('Wolverhampton', 'Wolverhampton Wanderers')),
+    106: ('Newcastle', ('Newcastle United',)),
+    107: ('West Ham', ('West Ham United',)),
+    108: ('Brighton', ('Brighton & Hove Albion', 'Brighton and Hove Albion')),
+    109: ('Leicester', ('Leicester City',)),
+    110: ('Sheffield United', ('Sheffield Utd',)),
+    
+    # Otras ligas europeas
+    201: ('Bayern Munich', ('Bayern Munchen', 'Bayern München', 'FC Bayern Munchen')),
+    202: ('Borussia Dortmund', ('Dortmund',)),
+    203: ('Bayer Leverkusen', ('Leverkusen',)),
+    204: ("Borussia M'gladbach", ("M'gladbach", 'Borussia Monchengladbach', 'Monchengladbach')),
+    205: ('Eintracht Frankfurt', ('Ein Frankfurt',)),
+    206: ('Koln', ('FC Koln', '1. FC Koln', 'Cologne')),
+    301: ('Inter', ('Inter Milan', 'Internazionale')),
+    302: ('Milan', ('AC Milan',)),
+    303: ('Paris Saint Germain', ('Paris SG', 'PSG', 'Paris Saint-Germain')),
+    304: ('Sporting CP', ('Sp Lisbon', 'Sporting Lisbon')),
+    305: ('Braga', ('Sp Braga', 'SC Braga')),
+    306: ('PSV', ('PSV Eindhoven',)),
+}
+
+# Siglas de club que se ignoran al comparar nombres
+_SIGLAS = {'fc', 'cf', 'cd', 'ud', 'sd', 'rcd', 'ca', 'sad', 'afc', 'sc', 'ac', 'cp', 'club', 'de'}
+
+# IDs automáticos (equipos sin ID fijo): derivados del nombre, estables entre ejecuciones
+_BASE_AUTOMATICA = 1_000_000
+_RANGO_AUTOMATICO = 1_000_000_000
+
+SIN_EQUIPO = -1
+
+
+def clave_equipo(nombre: str) -> str:
+    """
+    Clave de comparación de un nombre de equipo
+    
+    'Atlético de Madrid' -> 'atletico madrid', 'Granada CF' -> 'granada'
+    """
+    texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode()
+    palabras = re.sub(r"[^a-z0-9']+", ' ', texto.lower()).split()
+    significativas = [p for p in palabras if p not in _SIGLAS]
+    return ' '.join(significativas or palabras)
+
+
+class RegistroEquipos:
+    """
+    IDs enteros de equipos con tabla de alias
+    
+    El diccionario clave -> ID se construye una vez; cada nombre ya visto
+    se resuelve con una consulta O(1) a una caché nombre -> ID. Los
+    equipos que no están en EQUIPOS reciben un ID automático derivado de
+    su clave (crc32), igual en todas las fuentes y ejecuciones.
+    """
+    
+    def __init__(self, equipos: Dict[int, Tuple[str, Tuple[str, ...]]] = EQUIPOS):
+        self._por_clave: Dict[str, int] = {}
+        self._nombres: Dict[int, str] = {}
+        self._cache: Dict[str, int] = {}
+        
+        for id_equipo, (nombre, alias) in equipos.items():
+            self.registrar(id_equipo, nombre, alias)
+    
+    def registrar(self, id_equipo: int, nombre: str, alias: Iterable[str] = ()):
+        """Añade un equipo (o alias de uno existente) al registro"""
+        self._nombres.setdefault(id_equipo, nombre)
+        for variante in (nombre, *alias):
+            clave = clave_equipo(variante)
+            previo = self._por_clave.get(clave)
+            if previo is not None and previo != id_equipo:
+                raise ValueError(f"Alias '{variante}' ya asignado al equipo {previo}")
+            self._por_clave[clave] = id_equipo
+        self._cache.clear()
+    
+    def id(self, nombre: Optional[str]) -> int:
+        """ID del equipo (SIN_EQUIPO si el nombre es nulo o vacío)"""
+        if nombre is None or nombre != nombre or nombre == '':
+            return SIN_EQUIPO
+        
+        id_equipo = self._cache.get(nombre)
+        if id_equipo is None:
+            clave = clave_equipo(nombre)
+            id_equipo = self._por_clave.get(clave)
+            if id_equipo is None:
+                id_equipo = _BASE_AUTOMATICA + zlib.crc32(clave.encode()) % _RANGO_AUTOMATICO
+                self._nombres.setdefault(id_equipo, nombre)
+            self._cache[nombre] = id_equipo
+        
+        return id_equipo
+    
+    def ids(self, nombres) -> np.ndarray:
+        """
+        IDs de una columna de nombres (vectorizado)
+        
+        Solo se resuelven los nombres distintos; el resto es un take.
+        """
+        codigos, unicos = pd.factorize(pd.Series(nombres, copy=False), use_na_sentinel=True)
+        tabla = np.fromiter((self.id(nombre) for nombre in unicos), dtype=np.int64, count=len(unicos))
+        return np.append(tabla, SIN_EQUIPO)[codigos]
+    
+    def ids_de(self, nombres: Iterable[str]) -> List[int]:
+        """IDs de una lista de nombres (p.ej. para condiciones de reglas)"""
+        return list(dict.fromkeys(self.id(nombre) for nombre in nombres))
+    
+    def nombre(self, id_equipo: int) -> Optional[str]:
+        """Nombre canónico (o el primero visto, para IDs automáticos)"""
+        return self._nombres.get(id_equipo)
+    
+    def añadir_ids(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Añade Local_ID y Visitante_ID a un DataFrame con Local/Visitante"""
+        df['Local_ID'] = self.ids(df['Local'])
+        df['Visitante_ID'] = self.ids(df['Visitante'])
+        return df
+
+
+# Registro compartido, construido al importar el módulo
+REGISTRO_EQUIPOS = RegistroEquipos()
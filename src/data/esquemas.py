@@ -0,0 +1,182 @@
+"""
+Adaptadores de esquema
+Responsabilidad: Llevar cada formato de CSV de football-data.co.uk a las
+columnas canónicas (HomeTeam, AwayTeam, FTHG, FTAG, FTR, B365H...) que
+esperan DataCleaner y el dataset global
+"""
+
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AdaptadorEsquema:
+    """
+    Traducción de un formato de CSV a las columnas canónicas
+    
+    Attributes:
+        nombre: Identificador del formato
+        columnas_clave: Columnas que identifican el formato
+        renombrado: {columna_origen: columna_canónica}
+        coalescer: {columna_canónica: (origen1, origen2, ...)}; por fila
+            se toma el primer valor no nulo (p.ej. casas de apuestas)
+        temporada: Columna con la temporada en el propio CSV (formatos
+            con todas las temporadas en un único fichero)
+    """
+    nombre: str
+    columnas_clave: FrozenSet[str]
+    renombrado: Dict[str, str] = field(default_factory=dict)
+    coalescer: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    temporada: Optional[str] = None
+    
+    def reconoce(self, columnas) -> bool:
+        return self.columnas_clave.issubset(columnas)
+    
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Devuelve df con las columnas canónicas (sin tocar las demás)"""
+        df = _renombrar(df, self.renombrado)
+        
+        nuevas = {}
+        for destino, origenes in self.coalescer.items():
+            presentes = [c for c in origenes if c in df.columns]
+            if destino in df.columns or not presentes:
+                continue
+            valores = pd.to_numeric(df[presentes[0]], errors='coerce')
+            for origen in presentes[1:]:
+                valores = valores.fillna(pd.to_numeric(df[origen], errors='coerce'))
+            nuevas[destino] = valores
+        
+        if self.temporada in df.columns:
+            temporadas = normalizar_temporadas(df[self.temporada])
+            if 'Temporada' in df.columns:
+                temporadas = df['Temporada'].astype('string').fillna(temporadas)
+            nuevas['Temporada'] = temporadas
+        
+        if nuevas:
+            df = df.assign(**nuevas)
+        
+        return df
+
+
+# Formato clásico (/mmz4281/{temporada}/{liga}.csv): ya es el canónico
+ESQUEMA_CLASICO = AdaptadorEsquema(
+    nombre='clasico',
+    columnas_clave=frozenset({'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG'})
+)
+
+# Ligas extra (/new/{liga}.csv: ARG, BRA, MX1, USA...): un fichero con
+# todas las temporadas, sin descanso y solo con cuotas de cierre
+ESQUEMA_LIGAS_EXTRA = AdaptadorEsquema(
+    nombre='ligas_extra',
+    columnas_clave=frozenset({'Home', 'Away', 'HG', 'AG'}),
+    renombrado={
+        'Home': 'HomeTeam',
+        'Away': 'AwayTeam',
+        'HG': 'FTHG',
+        'AG': 'FTAG',
+        'Res': 'FTR',
+    },
+    coalescer={
+        'B365H': ('B365CH', 'PSCH', 'AvgCH', 'MaxCH'),
+        'B365D': ('B365CD', 'PSCD', 'AvgCD', 'MaxCD'),
+        'B365A': ('B365CA', 'PSCA', 'AvgCA', 'MaxCA'),
+    },
+    temporada='Season'
+)
+
+_ADAPTADORES: List[AdaptadorEsquema] = [ESQUEMA_CLASICO, ESQUEMA_LIGAS_EXTRA]
+
+
+def registrar_esquema(adaptador: AdaptadorEsquema):
+    """Añade un formato; se prueba antes que los ya registrados"""
+    _ADAPTADORES.insert(0, adaptador)
+
+
+def detectar_esquema(columnas) -> AdaptadorEsquema:
+    """Adaptador del formato de un CSV a partir de sus columnas"""
+    columnas = set(columnas)
+    for adaptador in _ADAPTADORES:
+        if adaptador.reconoce(columnas):
+            return adaptador
+    
+    raise ValueError(
+        f"Formato de CSV no reconocido (columnas: {sorted(columnas)[:10]}...). "
+        f"Formatos registrados: {[a.nombre for a in _ADAPTADORES]}"
+    )
+
+
+def normalizar_esquema(df: pd.DataFrame, liga_code: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lleva un DataFrame crudo a las columnas canónicas
+    
+    Quita el BOM de la primera cabecera y las columnas vacías por comas
+    sobrantes, aplica el adaptador del formato detectado y, si falta Div,
+    la rellena con liga_code.
+    """
+    vacias = df.columns.astype(str).str.startswith('Unnamed')
+    if vacias.any():
+        df = df.loc[:, ~vacias]
+    df = _renombrar(df, {
+        c: c.removeprefix('ï»¿').removeprefix('\ufeff')
+        for c in df.columns if c.startswith(('ï»¿', '\ufeff'))
+    })
+    
+    adaptador = detectar_esquema(df.columns)
+    if adaptador is not ESQUEMA_CLASICO:
+        logger.debug(f"  Formato '{adaptador.nombre}' ({len(df)} filas)")
+    df = adaptador.aplicar(df)
+    
+    if 'Div' not in df.columns and liga_code is not None:
+        df = df.assign(Div=liga_code)
+    
+    return df
+
+
+def _renombrar(df: pd.DataFrame, renombrado: Dict[str, str]) -> pd.DataFrame:
+    """
+    Renombra columnas; si el destino ya existe (CSV de varios formatos
+    concatenados) rellena sus nulos con la columna de origen
+    """
+    renombrado = {k: v for k, v in renombrado.items() if k in df.columns}
+    if not renombrado:
+        return df
+    
+    fusionar = {k: v for k, v in renombrado.items() if v in df.columns}
+    if fusionar:
+        df = df.assign(**{v: df[v].fillna(df[k]) for k, v in fusionar.items()})
+        df = df.drop(columns=list(fusionar))
+    
+    return df.rename(columns={k: v for k, v in renombrado.items() if k not in fusionar})
+
+
+def parsear_fechas(fechas: pd.Series) -> pd.Series:
+    """
+    Convierte fechas dd/mm/yyyy y dd/mm/yy (mezcladas) a datetime
+    
+    Dos pasadas vectorizadas: la segunda solo sobre las filas que la
+    primera no pudo leer. Lo que no encaja en ninguna queda como NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        return fechas
+    
+    resultado = pd.to_datetime(fechas, format='%d/%m/%Y', errors='coerce')
+    
+    pendientes = resultado.isna() & fechas.notna()
+    if pendientes.any():
+        resultado[pendientes] = pd.to_datetime(fechas[pendientes], format='%d/%m/%y', errors='coerce')
+    
+    return resultado
+
+
+def normalizar_temporadas(temporadas: pd.Series) -> pd.Series:
+    """
+    Temporada al formato de LaLigaLoader
+    
+    '2018/2019' -> '2018-19'; los años naturales ('2019') se conservan
+    """
+    temporadas = temporadas.astype('string').str.strip()
+    return temporadas.str.replace(r'^(\d{4})/\d{2}(\d{2})$', r'\1-\2', regex=True)
@@ -0,0 +1,150 @@
+"""
+Caché de features direccionada por contenido
+Responsabilidad: Reutilizar features ya calculadas solo si coinciden la
+configuración (FeatureConfig) y los datos de entrada
+"""
+
+import pandas as pd
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+
+from src.config import DATA_CONFIG, FEATURE_CONFIG
+from src.data.feature_engineering import FeatureEngineer
+
+logger = logging.getLogger(__name__)
+
+
+# Incrementar al cambiar la lógica de FeatureEngineer para invalidar la caché
+VERSION_FEATURES = 1
+
+
+class FeatureCache:
+    """
+    Caché de datasets con features en disco
+    
+    Cada variante se guarda como {clave}.parquet, donde la clave es un hash de
+    los campos de FeatureConfig y de la huella del DataFrame limpio. Se
+    mantienen varias variantes a la vez y se eliminan las menos usadas
+    recientemente (LRU por fecha de modificación) al superar el presupuesto.
+    """
+    
+    def __init__(self, config=DATA_CONFIG):
+        self.directorio = Path(config.feature_cache_dir)
+        self.presupuesto_bytes = int(config.feature_cache_max_mb * 1024 * 1024)
+    
+    def obtener_o_calcular(self, df: pd.DataFrame, feature_config=FEATURE_CONFIG) -> pd.DataFrame:
+        """
+        Devuelve las features de `df` con `feature_config`, calculándolas si no están en caché
+        
+        Args:
+            df: DataFrame limpio (DataCleaner)
+            feature_config: Configuración de features
+        
+        Returns:
+            DataFrame con features
+        """
+        clave = self.clave(df, feature_config)
+        
+        df_features = self.obtener(clave)
+        if df_features is not None:
+            logger.info(f"✓ Features cargadas desde caché ({clave})")
+            return df_features
+        
+        logger.info(f"  Sin caché para {clave}, generando features...")
+        df_features = FeatureEngineer(feature_config).generar_todas_features(df)
+        self.guardar(clave, df_features)
+        
+        return df_features
+    
+    def clave(self, df: pd.DataFrame, feature_config=FEATURE_CONFIG) -> str:
+        """Clave de caché: hash de FeatureConfig + huella de los datos"""
+        h = hashlib.sha256()
+        h.update(f"v{VERSION_FEATURES}".encode())
+        h.update(json.dumps(asdict(feature_config), sort_keys=True).encode())
+        h.update(self.huella(df).encode())
+        return h.hexdigest()[:20]
+    
+    @staticmethod
+    def huella(df: pd.DataFrame) -> str:
+        """Huella del contenido del DataFrame (columnas, tipos y valores)"""
+        h = hashlib.sha256()
+        h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+    
+    def obtener(self, clave: str) -> Optional[pd.DataFrame]:
+        """Carga una variante y la marca como usada recientemente"""
+        filepath = self._ruta(clave)
+        
+        if not filepath.exists():
+            return None
+        
+        try:
+            df = pd.read_parquet(filepath)
+        except Exception as e:
+            logger.warning(f"Entrada de caché corrupta {filepath.name}: {e}")
+            filepath.unlink(missing_ok=True)
+            return None
+        
+        os.utime(filepath)
+        return df
+    
+    def guardar(self, clave: str, df: pd.DataFrame) -> Path:
+        """Guarda una variante y aplica el presupuesto de disco"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        filepath = self._ruta(clave)
+        
+        tmp_path = filepath.with_suffix('.tmp')
+        df.to_parquet(tmp_path, engine='pyarrow', index=False)
+        tmp_path.replace(filepath)
+        
+        logger.info(f"💾 Features en caché: {filepath.name} ({len(df)} partidos)")
+        
+        self._desalojar(conservar=filepath)
+        return filepath
+    
+    def listar(self) -> List[Dict]:
+        """Variantes en caché, de la más reciente a la más antigua"""
+        if not self.directorio.exists():
+            return []
+        
+        entradas = []
+        for filepath in self.directorio.glob('*.parquet'):
+            stat = filepath.stat()
+            entradas.append({
+                'clave': filepath.stem,
+                'bytes': stat.st_size,
+                'ultimo_uso': stat.st_mtime
+            })
+        
+        return sorted(entradas, key=lambda e: e['ultimo_uso'], reverse=True)
+    
+    def limpiar(self):
+        """Elimina todas las variantes"""
+        for entrada in self.listar():
+            self._ruta(entrada['clave']).unlink(missing_ok=True)
+    
+    def _desalojar(self, conservar: Path = None):
+        """Elimina las variantes menos usadas hasta cumplir el presupuesto"""
+        entradas = self.listar()
+        total = sum(e['bytes'] for e in entradas)
+        
+        for entrada in reversed(entradas):
+            if total <= self.presupuesto_bytes:
+                break
+            
+            filepath = self._ruta(entrada['clave'])
+            if filepath == conservar:
+                continue
+            
+            filepath.unlink(missing_ok=True)
+            total -= entrada['bytes']
+            logger.info(f"🗑 Caché: eliminada variante {entrada['clave']} (LRU)")
+    
+    def _ruta(self, clave: str) -> Path:
+        return self.directorio / f"{clave}.parquet"
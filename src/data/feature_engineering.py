@@ -6,10 +6,11 @@ IMPORTANTE: Respeta orden cronológico para evitar look-ahead bias
 
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Tuple
 import logging
 
 from src.config import FEATURE_CONFIG
+from src.data.cleaner import añadir_columnas
 
 logger = logging.getLogger(__name__)
 
@@ -24,149 +25,203 @@ class FeatureEngineer:
         """
         Pipeline completo de generación de features
         IMPORTANTE: Respeta orden cronológico para evitar look-ahead bias
-        """
-        df = df.copy()
         
+        Devuelve un DataFrame nuevo que comparte las columnas de `df` (copia
+        superficial) y añade todas las features de una vez (añadir_columnas);
+        `df` no se modifica.
+        """
         logger.info("🔧 Generando features...")
         
+        # Tabla larga (equipo, partido) compartida por todas las features
+        tabla = TablaEquipos(df)
+        features = {}
+        
         if self.config.calculate_form:
-            df = self._calcular_forma(df)
+            features.update(self._calcular_forma(df, tabla))
         
         if self.config.calculate_streaks:
-            df = self._calcular_rachas(df)
+            features.update(self._calcular_rachas(df, tabla))
         
         if self.config.calculate_goal_avg:
-            df = self._calcular_promedios_goles(df)
+            features.update(self._calcular_promedios_goles(df, tabla))
         
         if self.config.calculate_btts:
-            df = self._calcular_btts_historico(df)
+            features.update(self._calcular_btts_historico(df, tabla))
+        
+        df = añadir_columnas(df, features)
         
         logger.info(f"✓ Features generadas: {df.shape[1]} columnas totales")
         
         return df
     
-    def _calcular_forma(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calcular_forma(self, df: pd.DataFrame, tabla: "TablaEquipos" = None) -> Dict[str, np.ndarray]:
         """
         Forma del equipo = Puntos últimos N partidos
         Victoria = 3pts, Empate = 1pt, Derrota = 0pts
         
+        Con menos de N partidos previos se escala la media: sum / n * N
+        
         CRÍTICO: Calcula forma basada SOLO en partidos anteriores
         """
         window = self.config.forma_window
+        tabla = tabla if tabla is not None else TablaEquipos(df)
+        
+        puntos_local, puntos_visitante = calcular_puntos(df['Resultado'].to_numpy())
+        
+        suma, previos = tabla.ventana_previa(
+            tabla.a_larga(puntos_local, puntos_visitante), window
+        )
         
-        # Inicializar columnas
-        df['Local_Forma_L5'] = 0.0
-        df['Visitante_Forma_L5'] = 0.0
-        
-        equipos = set(df['Local'].unique()) | set(df['Visitante'].unique())
-        
-        for equipo in equipos:
-            # Historial de puntos del equipo
-            puntos_equipo = []
-            
-            for idx in df.index:
-                # Calcular forma basada en últimos N partidos
-                if len(puntos_equipo) >= window:
-                    forma = sum(puntos_equipo[-window:])
-                elif len(puntos_equipo) > 0:
-                    forma = sum(puntos_equipo) / len(puntos_equipo) * window
-                else:
-                    forma = 0
-                
-                # Asignar forma al partido actual
-                if df.loc[idx, 'Local'] == equipo:
-                    df.loc[idx, 'Local_Forma_L5'] = forma
-                elif df.loc[idx, 'Visitante'] == equipo:
-                    df.loc[idx, 'Visitante_Forma_L5'] = forma
-                
-                # Actualizar historial DESPUÉS de usar la forma
-                if df.loc[idx, 'Local'] == equipo:
-                    if df.loc[idx, 'Resultado'] == 'H':
-                        puntos_equipo.append(3)
-                    elif df.loc[idx, 'Resultado'] == 'D':
-                        puntos_equipo.append(1)
-                    else:
-                        puntos_equipo.append(0)
-                
-                elif df.loc[idx, 'Visitante'] == equipo:
-                    if df.loc[idx, 'Resultado'] == 'A':
-                        puntos_equipo.append(3)
-                    elif df.loc[idx, 'Resultado'] == 'D':
-                        puntos_equipo.append(1)
-                    else:
-                        puntos_equipo.append(0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            escalada = suma / previos * window
+        forma = np.where(previos >= window, suma, np.where(previos > 0, escalada, 0.0))
+        
+        forma_local, forma_visitante = tabla.a_partidos(forma)
         
         logger.info(f"  ✓ Forma calculada (ventana={window})")
-        return df
+        return {'Local_Forma_L5': forma_local, 'Visitante_Forma_L5': forma_visitante}
     
-    def _calcular_rachas(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calcular_rachas(self, df: pd.DataFrame, tabla: "TablaEquipos" = None) -> Dict[str, np.ndarray]:
         """
-        Racha de victorias/derrotas consecutivas
+        Victorias y derrotas en los últimos N partidos (solo partidos anteriores)
         
-        Implementación simplificada:
-        (Versión completa requiere iterar por equipo y partido)
+        Victorias y derrotas se acumulan en una única pasada sobre la tabla larga
         """
         window = self.config.racha_window
+        tabla = tabla if tabla is not None else TablaEquipos(df)
         
-        df['Local_Victorias_L3'] = 0
-        df['Local_Derrotas_L3'] = 0
-        df['Visitante_Victorias_L3'] = 0
-        df['Visitante_Derrotas_L3'] = 0
+        resultado = df['Resultado'].to_numpy()
+        victoria_local = resultado == 'H'
+        victoria_visitante = resultado == 'A'
         
-        # Implementación simplificada
-        # (Versión completa requiere iterar por equipo y partido)
+        # Columnas: [victorias, derrotas] desde el punto de vista de cada equipo
+        historial = tabla.a_larga(
+            np.column_stack([victoria_local, victoria_visitante]).astype(np.int64),
+            np.column_stack([victoria_visitante, victoria_local]).astype(np.int64)
+        )
+        conteos, _ = tabla.ventana_previa(historial, window)
+        
+        victorias_local, victorias_visitante = tabla.a_partidos(conteos[:, 0])
+        derrotas_local, derrotas_visitante = tabla.a_partidos(conteos[:, 1])
         
         logger.info(f"  ✓ Rachas calculadas (ventana={window})")
-        return df
+        return {
+            'Local_Victorias_L3': victorias_local,
+            'Local_Derrotas_L3': derrotas_local,
+            'Visitante_Victorias_L3': victorias_visitante,
+            'Visitante_Derrotas_L3': derrotas_visitante,
+        }
     
-    def _calcular_promedios_goles(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calcular_promedios_goles(self, df: pd.DataFrame, tabla: "TablaEquipos" = None) -> Dict[str, np.ndarray]:
         """
-        Promedio de goles marcados/recibidos últimos N partidos
+        Promedio de goles marcados últimos N partidos (solo partidos anteriores)
         """
         window = self.config.goles_window
+        tabla = tabla if tabla is not None else TablaEquipos(df)
         
-        df['Local_Goles_Prom_L5'] = 0.0
-        df['Visitante_Goles_Prom_L5'] = 0.0
-        
-        equipos = set(df['Local'].unique()) | set(df['Visitante'].unique())
-        
-        for equipo in equipos:
-            goles_marcados = []
-            
-            for idx in df.index:
-                # Calcular promedio basado en últimos N partidos
-                if len(goles_marcados) >= window:
-                    promedio = np.mean(goles_marcados[-window:])
-                elif len(goles_marcados) > 0:
-                    promedio = np.mean(goles_marcados)
-                else:
-                    promedio = 0.0
-                
-                # Asignar promedio al partido actual
-                if df.loc[idx, 'Local'] == equipo:
-                    df.loc[idx, 'Local_Goles_Prom_L5'] = promedio
-                elif df.loc[idx, 'Visitante'] == equipo:
-                    df.loc[idx, 'Visitante_Goles_Prom_L5'] = promedio
-                
-                # Actualizar historial DESPUÉS de usar el promedio
-                if df.loc[idx, 'Local'] == equipo:
-                    goles_marcados.append(df.loc[idx, 'Goles_Local'])
-                elif df.loc[idx, 'Visitante'] == equipo:
-                    goles_marcados.append(df.loc[idx, 'Goles_Visitante'])
+        suma, previos = tabla.ventana_previa(
+            tabla.a_larga(df['Goles_Local'].to_numpy(), df['Goles_Visitante'].to_numpy()),
+            window
+        )
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            promedio = np.where(previos > 0, suma / previos, 0.0)
+        
+        promedio_local, promedio_visitante = tabla.a_partidos(promedio)
         
         logger.info(f"  ✓ Promedios goles (ventana={window})")
-        return df
+        return {'Local_Goles_Prom_L5': promedio_local, 'Visitante_Goles_Prom_L5': promedio_visitante}
     
-    def _calcular_btts_historico(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calcular_btts_historico(self, df: pd.DataFrame, tabla: "TablaEquipos" = None) -> Dict[str, np.ndarray]:
         """
-        Frecuencia de BTTS en últimos N partidos
+        Frecuencia de BTTS en últimos N partidos (solo partidos anteriores)
         """
-        df['Local_BTTS_L4'] = 0
-        df['Visitante_BTTS_L4'] = 0
+        window = self.config.btts_window
+        tabla = tabla if tabla is not None else TablaEquipos(df)
         
-        # Implementación simplificada
-        # (Versión completa requiere iterar por equipo y partido)
+        if 'BTTS' in df.columns:
+            btts = df['BTTS'].to_numpy(dtype=bool)
+        else:
+            btts = (df['Goles_Local'].to_numpy() > 0) & (df['Goles_Visitante'].to_numpy() > 0)
+        btts = btts.astype(np.int64)
         
-        logger.info("  ✓ BTTS histórico calculado")
-        return df
+        conteos, _ = tabla.ventana_previa(tabla.a_larga(btts, btts), window)
+        btts_local, btts_visitante = tabla.a_partidos(conteos)
+        
+        logger.info(f"  ✓ BTTS histórico calculado (ventana={window})")
+        return {'Local_BTTS_L4': btts_local, 'Visitante_BTTS_L4': btts_visitante}
+
+def calcular_puntos(resultado: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Puntos obtenidos por local y visitante según el resultado ('H', 'D', 'A')
+    
+    Returns:
+        (puntos_local, puntos_visitante)
+    """
+    puntos_local = np.select([resultado == 'H', resultado == 'D'], [3, 1], 0)
+    puntos_visitante = np.select([resultado == 'A', resultado == 'D'], [3, 1], 0)
+    return puntos_local, puntos_visitante
 
+
+class TablaEquipos:
+    """
+    Vista larga (equipo, partido) del DataFrame de partidos
+    
+    Cada partido aporta dos filas: una para el local y otra para el visitante.
+    Las filas se ordenan por equipo y, dentro de cada equipo, por el orden
+    cronológico del DataFrame, de modo que las ventanas móviles por equipo se
+    resuelven con sumas acumuladas sobre arrays contiguos (sin bucles Python).
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self.n_partidos = len(df)
+        
+        # Con IDs canónicos (DataCleaner) se agrupa por enteros
+        if 'Local_ID' in df.columns and 'Visitante_ID' in df.columns:
+            equipos = np.concatenate([df['Local_ID'].to_numpy(), df['Visitante_ID'].to_numpy()])
+        else:
+            equipos = np.concatenate([
+                df['Local'].to_numpy(dtype=object),
+                df['Visitante'].to_numpy(dtype=object)
+            ])
+        codigos, self.equipos = pd.factorize(equipos)
+        posiciones = np.tile(np.arange(self.n_partidos), 2)
+        
+        # Orden estable: equipo y luego posición cronológica
+        self.orden = np.lexsort((posiciones, codigos))
+        grupos = codigos[self.orden]
+        
+        inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+        longitudes = np.diff(np.r_[inicios, len(grupos)])
+        
+        # Número de partidos previos del equipo en cada fila
+        self.previos = np.arange(len(grupos)) - np.repeat(inicios, longitudes)
+    
+    def a_larga(self, valores_local: np.ndarray, valores_visitante: np.ndarray) -> np.ndarray:
+        """Combina valores por partido (local, visitante) en el orden de la tabla larga"""
+        return np.concatenate([valores_local, valores_visitante])[self.orden]
+    
+    def a_partidos(self, valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Devuelve valores de la tabla larga a columnas (local, visitante) por partido"""
+        salida = np.empty_like(valores)
+        salida[self.orden] = valores
+        return salida[:self.n_partidos], salida[self.n_partidos:]
+    
+    def ventana_previa(self, valores: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Suma de los últimos `window` valores ANTERIORES de cada equipo
+        
+        Args:
+            valores: Valores en orden de la tabla larga (1D, o 2D con una
+                columna por serie para acumular varias en la misma pasada)
+            window: Tamaño de la ventana
+        
+        Returns:
+            (suma, número de partidos usados) por fila de la tabla larga
+        """
+        acumulado = np.cumsum(valores, axis=0)
+        acumulado = np.concatenate([np.zeros_like(acumulado[:1]), acumulado])
+        filas = np.arange(len(valores))
+        usados = np.minimum(self.previos, window)
+        suma = acumulado[filas] - acumulado[filas - usados]
+        return suma, usados
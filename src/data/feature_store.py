@@ -0,0 +1,471 @@
+"""
+Almacén incremental de features
+Responsabilidad: Mantener el estado móvil de cada equipo junto al parquet de
+features para calcular solo los partidos nuevos en cada actualización
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+
+from src.config import DATA_CONFIG, FEATURE_CONFIG
+from src.data.cleaner import añadir_columnas
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.data.feature_engineering import FeatureEngineer, TablaEquipos, calcular_puntos
+
+logger = logging.getLogger(__name__)
+
+
+# Columnas que determinan las features: si cambian en el histórico, se recalcula todo
+COLUMNAS_CLAVE = [
+    'Date', 'Local', 'Visitante', 'Local_ID', 'Visitante_ID',
+    'Resultado', 'Goles_Local', 'Goles_Visitante'
+]
+
+
+def con_ids(df: pd.DataFrame, registro=REGISTRO_EQUIPOS) -> pd.DataFrame:
+    """df con Local_ID/Visitante_ID (copia superficial si hay que añadirlos)"""
+    if 'Local_ID' in df.columns and 'Visitante_ID' in df.columns:
+        return df
+    return añadir_columnas(df, {
+        'Local_ID': registro.ids(df['Local']),
+        'Visitante_ID': registro.ids(df['Visitante']),
+    })
+
+
+class EstadoEquipos:
+    """
+    Últimos N resultados de cada equipo, por ID canónico
+    
+    Series por equipo: puntos, goles marcados, victorias, derrotas y BTTS.
+    N es la mayor de las ventanas configuradas, suficiente para reproducir
+    todas las features del siguiente partido del equipo. Como FeatureEngineer
+    agrupa por Local_ID/Visitante_ID, los alias de un mismo club comparten
+    un único historial.
+    """
+    
+    SERIES = ('puntos', 'goles', 'victorias', 'derrotas', 'btts')
+    
+    # Marca del formato guardado (los estados antiguos iban por nombre)
+    CLAVE_EQUIPOS = 'id'
+    
+    def __init__(self, config=FEATURE_CONFIG, equipos: Dict[int, Dict[str, List[int]]] = None):
+        self.config = config
+        self.equipos = equipos if equipos is not None else {}
+        self.longitud = max(
+            config.forma_window,
+            config.racha_window,
+            config.goles_window,
+            config.btts_window
+        )
+    
+    @classmethod
+    def desde_historial(cls, df: pd.DataFrame, config=FEATURE_CONFIG) -> "EstadoEquipos":
+        """
+        Construye el estado a partir del histórico completo (ordenado cronológicamente)
+        """
+        estado = cls(config)
+        
+        if df.empty:
+            return estado
+        
+        df = con_ids(df)
+        tabla = TablaEquipos(df)
+        resultado = df['Resultado'].to_numpy()
+        puntos_local, puntos_visitante = calcular_puntos(resultado)
+        victoria_local = (resultado == 'H').astype(np.int64)
+        victoria_visitante = (resultado == 'A').astype(np.int64)
+        btts = (
+            (df['Goles_Local'].to_numpy() > 0) & (df['Goles_Visitante'].to_numpy() > 0)
+        ).astype(np.int64)
+        
+        larga = pd.DataFrame({
+            'equipo': tabla.a_larga(
+                df['Local_ID'].to_numpy(dtype=np.int64), df['Visitante_ID'].to_numpy(dtype=np.int64)
+            ),
+            'puntos': tabla.a_larga(puntos_local, puntos_visitante),
+            'goles': tabla.a_larga(df['Goles_Local'].to_numpy(), df['Goles_Visitante'].to_numpy()),
+            'victorias': tabla.a_larga(victoria_local, victoria_visitante),
+            'derrotas': tabla.a_larga(victoria_visitante, victoria_local),
+            'btts': tabla.a_larga(btts, btts),
+        })
+        
+        ultimos = larga.groupby('equipo', sort=False).tail(estado.longitud)
+        
+        for equipo, grupo in ultimos.groupby('equipo', sort=False):
+            estado.equipos[int(equipo)] = {
+                serie: [int(v) for v in grupo[serie].to_numpy()] for serie in cls.SERIES
+            }
+        
+        return estado
+    
+    @classmethod
+    def desde_dict(cls, datos: Dict, config=FEATURE_CONFIG) -> Optional["EstadoEquipos"]:
+        """Estado guardado con to_dict() (None si es de otra FeatureConfig o formato)"""
+        if datos.get('config') != asdict(config):
+            logger.info("⚠️ FeatureConfig distinta a la del estado guardado")
+            return None
+        
+        if datos.get('clave_equipos') != cls.CLAVE_EQUIPOS:
+            logger.info("⚠️ Estado guardado por nombre de equipo, se reconstruye por ID")
+            return None
+        
+        # JSON guarda las claves como texto
+        return cls(config, {int(id_equipo): series for id_equipo, series in datos['equipos'].items()})
+    
+    def features_equipo(self, id_equipo: int) -> Dict[str, float]:
+        """
+        Features del próximo partido del equipo según su historial
+        
+        Reproduce exactamente las fórmulas de FeatureEngineer
+        """
+        historial = self.equipos.get(id_equipo)
+        if historial is None:
+            historial = {serie: [] for serie in self.SERIES}
+        
+        window = self.config.forma_window
+        puntos = historial['puntos'][-window:]
+        if len(puntos) >= window:
+            forma = float(sum(puntos))
+        elif len(puntos) > 0:
+            forma = sum(puntos) / len(puntos) * window
+        else:
+            forma = 0.0
+        
+        goles = historial['goles'][-self.config.goles_window:]
+        goles_prom = sum(goles) / len(goles) if goles else 0.0
+        
+        return {
+            'Forma_L5': forma,
+            'Victorias_L3': sum(historial['victorias'][-self.config.racha_window:]),
+            'Derrotas_L3': sum(historial['derrotas'][-self.config.racha_window:]),
+            'Goles_Prom_L5': goles_prom,
+            'BTTS_L4': sum(historial['btts'][-self.config.btts_window:]),
+        }
+    
+    def registrar_partido(
+        self,
+        local: int,
+        visitante: int,
+        resultado: str,
+        goles_local: int,
+        goles_visitante: int
+    ):
+        """Añade el resultado de un partido al historial de ambos equipos"""
+        puntos_local = 3 if resultado == 'H' else 1 if resultado == 'D' else 0
+        puntos_visitante = 3 if resultado == 'A' else 1 if resultado == 'D' else 0
+        btts = int(goles_local > 0 and goles_visitante > 0)
+        
+        self._añadir(local, puntos_local, goles_local, int(resultado == 'H'), int(resultado == 'A'), btts)
+        self._añadir(visitante, puntos_visitante, goles_visitante, int(resultado == 'A'), int(resultado == 'H'), btts)
+    
+    def _añadir(self, equipo: int, puntos: int, goles: int, victoria: int, derrota: int, btts: int):
+        historial = self.equipos.setdefault(equipo, {serie: [] for serie in self.SERIES})
+        
+        for serie, valor in zip(self.SERIES, (puntos, goles, victoria, derrota, btts)):
+            valores = historial[serie]
+            valores.append(int(valor))
+            if len(valores) > self.longitud:
+                del valores[0]
+    
+    def to_dict(self) -> Dict:
+        return {
+            'config': asdict(self.config),
+            'clave_equipos': self.CLAVE_EQUIPOS,
+            'equipos': self.equipos,
+        }
+
+
+class TablaEstadoEquipos:
+    """
+    Features actuales de cada equipo indexadas por ID canónico
+    
+    Se construye una vez a partir de EstadoEquipos: una fila por equipo con
+    las features de su próximo partido (forma, rachas, goles, BTTS). La
+    consulta de un equipo es O(1) y la de una lista de partidos es un take
+    vectorizado. Los equipos sin historial (ascendidos, otras ligas)
+    devuelven NaN en lugar de ceros, para que las reglas no disparen.
+    """
+    
+    FEATURES = ('Forma_L5', 'Victorias_L3', 'Derrotas_L3', 'Goles_Prom_L5', 'BTTS_L4')
+    
+    def __init__(self, estado: EstadoEquipos):
+        ids = list(estado.equipos)
+        
+        # Última fila: equipo desconocido (todo NaN)
+        self.valores = np.full((len(ids) + 1, len(self.FEATURES)), np.nan)
+        for fila, id_equipo in enumerate(ids):
+            features = estado.features_equipo(id_equipo)
+            self.valores[fila] = [features[clave] for clave in self.FEATURES]
+        
+        self._filas: Dict[int, int] = {int(id_equipo): fila for fila, id_equipo in enumerate(ids)}
+        self._indice = pd.Index(list(self._filas), dtype=np.int64)
+        self._posiciones = np.arange(len(ids), dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self._filas)
+    
+    def __contains__(self, id_equipo: int) -> bool:
+        return id_equipo in self._filas
+    
+    def equipo(self, id_equipo: int) -> Dict[str, float]:
+        """Features actuales de un equipo (NaN si no tiene historial)"""
+        fila = self._filas.get(id_equipo, len(self.valores) - 1)
+        return dict(zip(self.FEATURES, self.valores[fila].tolist()))
+    
+    def features_partidos(self, local_ids, visitante_ids) -> pd.DataFrame:
+        """
+        Columnas Local_* / Visitante_* para una lista de partidos
+        
+        Args:
+            local_ids: IDs canónicos de los locales (array o Serie)
+            visitante_ids: IDs canónicos de los visitantes
+        
+        Returns:
+            DataFrame con una fila por partido, en el orden recibido
+        """
+        columnas = {}
+        for prefijo, ids in (('Local', local_ids), ('Visitante', visitante_ids)):
+            filas = self._filas_de(ids)
+            for j, clave in enumerate(self.FEATURES):
+                columnas[f'{prefijo}_{clave}'] = self.valores[filas, j]
+        return pd.DataFrame(columnas)
+    
+    def _filas_de(self, ids) -> np.ndarray:
+        posiciones = self._indice.get_indexer(np.asarray(ids, dtype=np.int64))
+        return np.where(
+            posiciones >= 0,
+            self._posiciones[np.maximum(posiciones, 0)] if len(self._posiciones) else 0,
+            len(self.valores) - 1
+        )
+
+
+class FeatureStore:
+    """
+    Features persistidas + estado por equipo
+    
+    Archivos (en processed_dir):
+        {nombre}.parquet        Dataset con features
+        {nombre}_estado.json    Estado móvil por equipo y huella del histórico
+    """
+    
+    # Columnas por flag de FeatureConfig, en el mismo orden que FeatureEngineer
+    COLUMNAS = [
+        ('calculate_form', ['Local_Forma_L5', 'Visitante_Forma_L5']),
+        ('calculate_streaks', [
+            'Local_Victorias_L3', 'Local_Derrotas_L3',
+            'Visitante_Victorias_L3', 'Visitante_Derrotas_L3'
+        ]),
+        ('calculate_goal_avg', ['Local_Goles_Prom_L5', 'Visitante_Goles_Prom_L5']),
+        ('calculate_btts', ['Local_BTTS_L4', 'Visitante_BTTS_L4']),
+    ]
+    
+    def __init__(self, config=DATA_CONFIG, feature_config=FEATURE_CONFIG, nombre: str = "laliga_features"):
+        self.config = config
+        self.feature_config = feature_config
+        self.features_path = config.processed_dir / f"{nombre}.parquet"
+        self.estado_path = config.processed_dir / f"{nombre}_estado.json"
+    
+    def actualizar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Devuelve el dataset con features, calculando solo los partidos nuevos
+        
+        Args:
+            df: DataFrame limpio y ordenado cronológicamente (DataCleaner);
+                sin Local_ID/Visitante_ID se añaden con REGISTRO_EQUIPOS
+        
+        Returns:
+            DataFrame con features (idéntico a un recálculo completo)
+        """
+        df = con_ids(df)
+        previo = self._cargar()
+        
+        if previo is None:
+            return self._recalcular(df)
+        
+        df_features, estado, n_previos, huella = previo
+        
+        if len(df) < n_previos or self._huella(df.iloc[:n_previos]) != huella:
+            logger.info("⚠️ El histórico cambió, recalculando todas las features")
+            return self._recalcular(df)
+        
+        nuevos = df.iloc[n_previos:]
+        logger.info(f"🔧 Features incrementales: {len(nuevos)} partidos nuevos")
+        
+        columnas = self.columnas_features()
+        nuevas = self._features_incrementales(nuevos, estado)
+        features = pd.concat(
+            [df_features[columnas], nuevas[columnas]],
+            ignore_index=True
+        )
+        
+        resultado = añadir_columnas(
+            df.reset_index(drop=True),
+            {columna: features[columna].to_numpy() for columna in columnas}
+        )
+        
+        self._guardar(resultado, estado)
+        return resultado
+    
+    def verificar(self, df: pd.DataFrame) -> bool:
+        """
+        Comprueba que las features almacenadas coinciden con un recálculo completo
+        
+        Args:
+            df: DataFrame limpio usado en la última actualización
+        
+        Returns:
+            True si son idénticas
+        """
+        previo = self._cargar()
+        if previo is None:
+            logger.warning("No hay features almacenadas que verificar")
+            return False
+        
+        df_features = previo[0]
+        df = con_ids(df)
+        completo = FeatureEngineer(self.feature_config).generar_todas_features(df)
+        columnas = self.columnas_features()
+        
+        if len(df_features) != len(completo):
+            logger.error(f"✗ Nº de partidos distinto: {len(df_features)} vs {len(completo)}")
+            return False
+        
+        identicas = True
+        for columna in columnas:
+            almacenada = df_features[columna].to_numpy()
+            recalculada = completo[columna].to_numpy()
+            if almacenada.dtype != recalculada.dtype or not np.array_equal(almacenada, recalculada):
+                logger.error(f"✗ Feature distinta tras recálculo completo: {columna}")
+                identicas = False
+        
+        if identicas:
+            logger.info(f"✓ Features incrementales idénticas al recálculo completo ({len(columnas)} columnas)")
+        
+        return identicas
+    
+    def cargar_estado(self) -> Optional[EstadoEquipos]:
+        """
+        Estado por equipo de la última actualización, sin leer el parquet
+        
+        Returns:
+            EstadoEquipos o None si no existe o es de otra FeatureConfig
+        """
+        if not self.estado_path.exists():
+            return None
+        
+        with open(self.estado_path, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        
+        return EstadoEquipos.desde_dict(datos, self.feature_config)
+    
+    def tabla_estado(self) -> TablaEstadoEquipos:
+        """Tabla de features actuales por ID de equipo (vacía si no hay estado)"""
+        estado = self.cargar_estado()
+        if estado is None:
+            logger.warning(f"⚠️ Sin estado de equipos en {self.estado_path}, ejecuta scripts/update_data.py")
+            estado = EstadoEquipos(self.feature_config)
+        
+        tabla = TablaEstadoEquipos(estado)
+        logger.info(f"📋 Estado actual de {len(tabla)} equipos cargado")
+        return tabla
+    
+    def columnas_features(self) -> List[str]:
+        """Columnas de features en el mismo orden que FeatureEngineer"""
+        columnas = []
+        for flag, nombres in self.COLUMNAS:
+            if getattr(self.feature_config, flag):
+                columnas.extend(nombres)
+        return columnas
+    
+    def _features_incrementales(self, nuevos: pd.DataFrame, estado: EstadoEquipos) -> pd.DataFrame:
+        """Calcula features de los partidos nuevos y actualiza el estado (O(partidos nuevos))"""
+        filas = []
+        
+        for local, visitante, resultado, goles_local, goles_visitante in zip(
+            nuevos['Local_ID'].tolist(), nuevos['Visitante_ID'].tolist(), nuevos['Resultado'],
+            nuevos['Goles_Local'], nuevos['Goles_Visitante']
+        ):
+            features_local = estado.features_equipo(local)
+            features_visitante = estado.features_equipo(visitante)
+            
+            fila = {}
+            for clave, valor in features_local.items():
+                fila[f'Local_{clave}'] = valor
+            for clave, valor in features_visitante.items():
+                fila[f'Visitante_{clave}'] = valor
+            filas.append(fila)
+            
+            # Actualizar estado DESPUÉS de calcular las features
+            estado.registrar_partido(local, visitante, resultado, goles_local, goles_visitante)
+        
+        columnas = self.columnas_features()
+        nuevas = pd.DataFrame(filas, columns=columnas)
+        
+        # Mismos tipos que el cálculo vectorizado
+        for columna in columnas:
+            if 'Forma' in columna or 'Prom' in columna:
+                nuevas[columna] = nuevas[columna].astype(np.float64)
+            else:
+                nuevas[columna] = nuevas[columna].astype(np.int64)
+        
+        return nuevas
+    
+    def _recalcular(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Recálculo completo de features y reconstrucción del estado"""
+        df_features = FeatureEngineer(self.feature_config).generar_todas_features(df)
+        estado = EstadoEquipos.desde_historial(df, self.feature_config)
+        self._guardar(df_features, estado)
+        return df_features
+    
+    def _cargar(self) -> Optional[Tuple[pd.DataFrame, EstadoEquipos, int, str]]:
+        """Carga features y estado si existen y son compatibles con la configuración"""
+        if not self.features_path.exists() or not self.estado_path.exists():
+            return None
+        
+        with open(self.estado_path, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        
+        estado = EstadoEquipos.desde_dict(datos, self.feature_config)
+        if estado is None:
+            return None
+        
+        df_features = pd.read_parquet(self.features_path)
+        if len(df_features) != datos['n_partidos']:
+            logger.warning("⚠️ Estado y features desincronizados")
+            return None
+        
+        return df_features, estado, datos['n_partidos'], datos['huella']
+    
+    def _guardar(self, df_features: pd.DataFrame, estado: EstadoEquipos):
+        """Guarda features y estado (el estado se escribe después del parquet)"""
+        self.config.processed_dir.mkdir(parents=True, exist_ok=True)
+        
+        df_features.to_parquet(self.features_path, engine='pyarrow', index=False)
+        
+        datos = estado.to_dict()
+        datos['n_partidos'] = len(df_features)
+        datos['huella'] = self._huella(df_features)
+        
+        tmp_path = self.estado_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        tmp_path.replace(self.estado_path)
+        
+        logger.info(f"💾 Features y estado guardados: {self.features_path.name} ({len(df_features)} partidos)")
+    
+    @staticmethod
+    def _huella(df: pd.DataFrame) -> str:
+        """Huella de las columnas que determinan las features"""
+        claves = df[COLUMNAS_CLAVE].reset_index(drop=True).copy()
+        claves['Date'] = claves['Date'].astype('datetime64[ns]')
+        claves['Goles_Local'] = claves['Goles_Local'].astype(np.int64)
+        claves['Goles_Visitante'] = claves['Goles_Visitante'].astype(np.int64)
+        claves['Local_ID'] = claves['Local_ID'].astype(np.int64)
+        claves['Visitante_ID'] = claves['Visitante_ID'].astype(np.int64)
+        hashes = pd.util.hash_pandas_object(claves, index=False).to_numpy()
+        return hashlib.sha256(hashes.tobytes()).hexdigest()
@@ -0,0 +1,235 @@
+"""
+Dataset global particionado
+Responsabilidad: Convertir los CSV de data/global en un dataset Parquet
+particionado (Liga_Code/Temporada) con esquema unificado y cargarlo
+leyendo solo las columnas y particiones necesarias
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+import shutil
+
+from src.config import DATA_CONFIG
+from src.data.esquemas import normalizar_esquema
+
+logger = logging.getLogger(__name__)
+
+
+# Columnas de texto de Football-Data; el resto se guarda como float64
+COLUMNAS_TEXTO = {
+    'Div', 'Date', 'Time', 'HomeTeam', 'AwayTeam', 'FTR', 'HTR', 'Referee',
+    # Formato de ligas extra (/new/)
+    'Country', 'League', 'Season', 'Temporada'
+}
+
+COLUMNAS_PARTICION = ['Liga_Code', 'Temporada']
+
+PARTICIONADO = ds.partitioning(
+    pa.schema([('Liga_Code', pa.string()), ('Temporada', pa.string())]),
+    flavor='hive'
+)
+
+ESQUEMA_COMUN = '_common_metadata'
+
+# Sufijo de los CSV con todas las temporadas de una liga ('ARG_todas.csv')
+TEMPORADAS_TODAS = 'todas'
+
+
+def temporada_desde_codigo(codigo: str) -> str:
+    """'1819' -> '2018-19' (mismo formato que LaLigaLoader)"""
+    if len(codigo) == 4 and codigo.isdigit():
+        return f"20{codigo[:2]}-{codigo[2:]}"
+    return codigo
+
+
+class DatasetGlobal:
+    """
+    Dataset Parquet particionado con todas las ligas descargadas
+    
+    Estructura en disco:
+        {directorio}/Liga_Code=SP1/Temporada=2018-19/part-0.parquet
+        {directorio}/_common_metadata   (esquema unificado)
+    
+    Las columnas de texto conocidas se guardan como string y todas las
+    demás como float64, de modo que ficheros con distintas columnas
+    comparten un único esquema (las ausentes se leen como nulos). Todos
+    los formatos de origen se llevan antes a las columnas canónicas; los
+    CSV de ligas extra ({liga}_todas.csv) se reparten por temporada.
+    """
+    
+    def __init__(self, config=DATA_CONFIG):
+        self.csv_dir = Path(config.global_csv_dir)
+        self.directorio = Path(config.global_dataset_dir)
+    
+    def ingerir(self, forzar: bool = False) -> int:
+        """
+        Convierte a Parquet los CSV nuevos o modificados
+        
+        Args:
+            forzar: Si True, reescribe todas las particiones
+        
+        Returns:
+            Número de particiones escritas
+        """
+        csv_files = sorted(self.csv_dir.glob('*.csv'))
+        if not csv_files:
+            logger.warning(f"⚠️ No hay CSV en {self.csv_dir}")
+            return 0
+        
+        escritas = 0
+        for csv_file in csv_files:
+            liga_code, temporada = self._particion_csv(csv_file)
+            
+            if not forzar and self._al_dia(csv_file, liga_code, temporada):
+                continue
+            
+            try:
+                df = self._normalizar(pd.read_csv(csv_file, encoding='latin-1', on_bad_lines='skip'), liga_code)
+            except Exception as e:
+                logger.warning(f"  ⚠️ Error leyendo {csv_file.name}: {e}")
+                continue
+            
+            # Formatos con todas las temporadas en un fichero: una partición por temporada
+            if 'Temporada' in df.columns:
+                particiones = df.groupby('Temporada', sort=True)
+            else:
+                particiones = [(temporada, df)]
+            
+            for temporada_particion, df_particion in particiones:
+                tabla = pa.Table.from_pandas(
+                    df_particion.drop(columns='Temporada', errors='ignore'),
+                    preserve_index=False
+                )
+                
+                destino = self._ruta_particion(liga_code, temporada_particion)
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = destino.with_suffix('.tmp')
+                pq.write_table(tabla, tmp_path)
+                tmp_path.replace(destino)
+                escritas += 1
+        
+        self._escribir_esquema()
+        logger.info(f"✓ Dataset global: {escritas} particiones escritas de {len(csv_files)} CSV")
+        
+        return escritas
+    
+    def cargar(
+        self,
+        columnas: Optional[Sequence[str]] = None,
+        ligas: Optional[Sequence[str]] = None,
+        temporadas: Optional[Sequence[str]] = None,
+        filtro: Optional[ds.Expression] = None
+    ) -> pd.DataFrame:
+        """
+        Carga el dataset leyendo solo las columnas y particiones pedidas
+        
+        Args:
+            columnas: Columnas a leer (None = todas). Liga_Code y
+                Temporada se añaden siempre.
+            ligas: Códigos de liga (['SP1', 'E0'])
+            temporadas: Temporadas ('2018-19' o '1819')
+            filtro: Expresión pyarrow adicional (ds.field('HTHG') == 1)
+        
+        Returns:
+            DataFrame con los partidos seleccionados
+        """
+        dataset = self.dataset()
+        
+        expresion = filtro
+        if ligas is not None:
+            expresion = self._y(expresion, ds.field('Liga_Code').isin(list(ligas)))
+        if temporadas is not None:
+            temporadas = [temporada_desde_codigo(t) for t in temporadas]
+            expresion = self._y(expresion, ds.field('Temporada').isin(temporadas))
+        
+        if columnas is not None:
+            faltan = [c for c in columnas if c not in dataset.schema.names]
+            if faltan:
+                raise KeyError(f"Columnas no presentes en el dataset global: {faltan}")
+            columnas = list(dict.fromkeys([*columnas, *COLUMNAS_PARTICION]))
+        
+        tabla = dataset.to_table(columns=columnas, filter=expresion)
+        return tabla.to_pandas()
+    
+    def dataset(self) -> ds.Dataset:
+        """Dataset pyarrow con el esquema unificado"""
+        esquema_path = self.directorio / ESQUEMA_COMUN
+        if not esquema_path.exists():
+            raise FileNotFoundError(
+                f"No existe el dataset global en {self.directorio} (ejecuta DatasetGlobal().ingerir())"
+            )
+        
+        return ds.dataset(
+            self.directorio,
+            schema=pq.read_schema(esquema_path),
+            format='parquet',
+            partitioning=PARTICIONADO,
+            exclude_invalid_files=False,
+            ignore_prefixes=['_', '.']
+        )
+    
+    def particiones(self) -> List[Dict[str, str]]:
+        """Particiones (liga, temporada) presentes en disco"""
+        return [
+            {'Liga_Code': ruta.parent.name.split('=', 1)[1], 'Temporada': ruta.name.split('=', 1)[1]}
+            for ruta in sorted(self.directorio.glob('Liga_Code=*/Temporada=*'))
+        ]
+    
+    def limpiar(self):
+        """Elimina el dataset (se regenera con ingerir)"""
+        if self.directorio.exists():
+            shutil.rmtree(self.directorio)
+    
+    @staticmethod
+    def _normalizar(df: pd.DataFrame, liga_code: Optional[str] = None) -> pd.DataFrame:
+        """Columnas canónicas (esquemas.py) y esquema unificado: texto como string, resto float64"""
+        df = normalizar_esquema(df, liga_code)
+        
+        columnas = {}
+        for columna in df.columns:
+            if columna in COLUMNAS_TEXTO:
+                columnas[columna] = df[columna].astype('string')
+            else:
+                columnas[columna] = pd.to_numeric(df[columna], errors='coerce').astype('float64')
+        
+        return pd.DataFrame(columnas, index=df.index)
+    
+    def _escribir_esquema(self):
+        """Guarda la unión de los esquemas de todas las particiones (más las claves)"""
+        esquemas = [pq.read_schema(ruta) for ruta in sorted(self.directorio.glob('Liga_Code=*/Temporada=*/*.parquet'))]
+        if not esquemas:
+            return
+        
+        esquema = pa.unify_schemas([e.remove_metadata() for e in esquemas] + [PARTICIONADO.schema])
+        pq.write_metadata(esquema, self.directorio / ESQUEMA_COMUN)
+    
+    @staticmethod
+    def _particion_csv(csv_file: Path) -> tuple:
+        """'SP1_1819.csv' -> ('SP1', '2018-19')"""
+        partes = csv_file.stem.split('_')
+        liga_code = partes[0]
+        temporada = temporada_desde_codigo(partes[1]) if len(partes) > 1 else 'unknown'
+        return liga_code, temporada
+    
+    def _al_dia(self, csv_file: Path, liga_code: str, temporada: str) -> bool:
+        """True si las particiones del CSV son posteriores a él"""
+        if temporada == TEMPORADAS_TODAS:
+            destinos = list((self.directorio / f"Liga_Code={liga_code}").glob('Temporada=*/part-0.parquet'))
+        else:
+            destinos = [self._ruta_particion(liga_code, temporada)]
+        
+        if not destinos or not all(d.exists() for d in destinos):
+            return False
+        return min(d.stat().st_mtime for d in destinos) >= csv_file.stat().st_mtime
+    
+    def _ruta_particion(self, liga_code: str, temporada: str) -> Path:
+        return self.directorio / f"Liga_Code={liga_code}" / f"Temporada={temporada}" / 'part-0.parquet'
+    
+    @staticmethod
+    def _y(expresion: Optional[ds.Expression], otra: ds.Expression) -> ds.Expression:
+        return otra if expresion is None else expresion & otra
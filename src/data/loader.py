@@ -4,12 +4,12 @@ Responsabilidad: Obtener datos crudos y guardarlos
 """
 
 import pandas as pd
-import requests
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 
 from src.config import DATA_CONFIG
+from src.data.downloader import Descargador, temporada_actual, ERROR, OMITIDO, SIN_CAMBIOS
 
 logger = logging.getLogger(__name__)
 
@@ -20,38 +20,42 @@ class LaLigaLoader:
     def __init__(self, config=DATA_CONFIG):
         self.config = config
         self.config.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.descargador = Descargador(config)
     
     def descargar_temporada(self, temporada: str) -> Optional[Path]:
         """
         Descarga CSV de una temporada
         
+        Las temporadas ya descargadas no se vuelven a pedir, salvo la
+        temporada en curso, que se revalida con una petición condicional.
+        
         Args:
             temporada: Código de temporada (ej: '2324' para 2023-24)
         
         Returns:
             Path al archivo descargado o None si falla
         """
-        url = f"{self.config.base_url}{temporada}/{self.config.liga_code}.csv"
+        url = self.descargador.url(self.config.liga_code, temporada)
         filepath = self.config.raw_dir / f"{self.config.liga_code}_{temporada}.csv"
         
-        if filepath.exists():
-            logger.info(f"✓ Temporada {temporada} ya existe")
-            return filepath
+        estado = self.descargador.descargar(url, filepath, refrescar=temporada == temporada_actual())
         
-        try:
-            logger.info(f"⬇ Descargando temporada {temporada}...")
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
+        if estado == ERROR:
+            return filepath if filepath.exists() else None
+        
+        if estado == OMITIDO:
+            logger.info(f"✓ Temporada {temporada} ya existe")
+        elif estado == SIN_CAMBIOS:
+            logger.info(f"✓ Temporada {temporada} sin cambios")
+        else:
             logger.info(f"✓ Descargada: {filepath.name}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"✗ Error descargando {temporada}: {e}")
-            return None
+        
+        return filepath
+    
+    def descargar_todas_temporadas(self) -> Dict[Path, str]:
+        """Descarga en paralelo todas las temporadas configuradas"""
+        pares = [(self.config.liga_code, temporada) for temporada in self.config.temporadas]
+        return self.descargador.descargar_temporadas(pares, self.config.raw_dir)
     
     def cargar_temporada(self, temporada: str) -> Optional[pd.DataFrame]:
         """Carga una temporada ya descargada"""
@@ -78,11 +82,10 @@ class LaLigaLoader:
         """
         dfs = []
         
+        # Descargar las que falten (y revalidar la temporada en curso)
+        self.descargar_todas_temporadas()
+        
         for temporada in self.config.temporadas:
-            # Intentar descargar si no existe
-            self.descargar_temporada(temporada)
-            
-            # Cargar
             df = self.cargar_temporada(temporada)
             if df is not None:
                 dfs.append(df)
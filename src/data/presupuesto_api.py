@@ -0,0 +1,184 @@
+"""
+Presupuesto de peticiones a API-Sports
+Responsabilidad: Llevar la cuenta local de la cuota diaria y por minuto,
+sincronizarla con las cabeceras de respuesta y /status, y decidir qué
+peticiones se hacen según su prioridad
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
+import logging
+import threading
+import time
+
+from src.config import API_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# Prioridades de petición
+ALTA = 'alta'  # Seguimiento en directo (descanso, resultados)
+MEDIA = 'media'  # Próximos partidos
+BAJA = 'baja'  # Precarga de estadísticas de equipo y clasificación
+
+# Cabeceras de cuota de API-Sports (requests.Session las trata sin distinguir mayúsculas)
+CABECERA_LIMITE_DIA = 'x-ratelimit-requests-limit'
+CABECERA_RESTANTES_DIA = 'x-ratelimit-requests-remaining'
+CABECERA_LIMITE_MINUTO = 'X-RateLimit-Limit'
+CABECERA_RESTANTES_MINUTO = 'X-RateLimit-Remaining'
+
+
+def _entero(valor) -> Optional[int]:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+class PresupuestoAPI:
+    """
+    Token bucket con cuota diaria y por minuto
+    
+    - Cubo por minuto: capacidad limite_minuto, se rellena de forma
+      continua (limite_minuto / 60 tokens por segundo)
+    - Cuota diaria: se reinicia a las 00:00 UTC, como la de API-Sports
+    - Cada prioridad deja intacta una reserva (config.presupuesto_reservas,
+      fracción de cada límite): una petición BAJA se rechaza mientras
+      todavía quedan peticiones para las ALTA
+    - Las ALTA esperan a que se rellene el cubo por minuto (como mucho
+      60 / limite_minuto segundos); el resto se rechaza al momento
+    
+    Los contadores locales se corrigen con las cabeceras de cada respuesta
+    y con /status, así que sobreviven a otros procesos que usen la misma clave.
+    """
+    
+    def __init__(self, config=API_CONFIG, reloj=time.monotonic):
+        self.config = config
+        self.reloj = reloj
+        self.limite_dia = config.api_sports_limite_dia
+        self.limite_minuto = config.api_sports_limite_minuto
+        self.reservas = config.presupuesto_reservas
+        
+        self._lock = threading.Lock()
+        self._tokens = float(self.limite_minuto)
+        self._actualizado = reloj()
+        self._dia = self._hoy()
+        self._usadas_dia = 0
+        self.rechazadas = {ALTA: 0, MEDIA: 0, BAJA: 0}
+    
+    def disponible(self, prioridad: str = MEDIA) -> bool:
+        """True si una petición de esa prioridad se haría ahora sin esperar"""
+        with self._lock:
+            self._actualizar()
+            return self._cabe_dia(prioridad) and self._cabe_minuto(prioridad)
+    
+    def consumir(self, prioridad: str = MEDIA) -> bool:
+        """
+        Reserva una petición
+        
+        Returns:
+            True si se puede hacer; False si la cuota (menos la reserva de
+            las prioridades superiores) está agotada
+        """
+        while True:
+            with self._lock:
+                self._actualizar()
+                if not self._cabe_dia(prioridad):
+                    return self._rechazar(prioridad, 'cuota diaria')
+                
+                if self._cabe_minuto(prioridad):
+                    self._tokens -= 1
+                    self._usadas_dia += 1
+                    return True
+                
+                if prioridad != ALTA:
+                    return self._rechazar(prioridad, 'límite por minuto')
+                
+                espera = (1 - self._tokens) * 60 / self.limite_minuto
+            
+            time.sleep(espera)
+    
+    def sincronizar_cabeceras(self, headers: Mapping[str, str]):
+        """Ajusta los contadores con las cabeceras x-ratelimit-* de una respuesta"""
+        limite_dia = _entero(headers.get(CABECERA_LIMITE_DIA))
+        restantes_dia = _entero(headers.get(CABECERA_RESTANTES_DIA))
+        limite_minuto = _entero(headers.get(CABECERA_LIMITE_MINUTO))
+        restantes_minuto = _entero(headers.get(CABECERA_RESTANTES_MINUTO))
+        
+        with self._lock:
+            self._actualizar()
+            if limite_dia:
+                self.limite_dia = limite_dia
+            if restantes_dia is not None:
+                self._usadas_dia = self.limite_dia - restantes_dia
+            if limite_minuto:
+                self.limite_minuto = limite_minuto
+            if restantes_minuto is not None:
+                self._tokens = min(self._tokens, float(restantes_minuto))
+    
+    def sincronizar_estado(self, usadas: int, limite_dia: int):
+        """Ajusta la cuota diaria con requests.current/limit_day de /status"""
+        with self._lock:
+            self._actualizar()
+            if limite_dia:
+                self.limite_dia = int(limite_dia)
+            self._usadas_dia = int(usadas)
+    
+    def agotar(self, diaria: bool = False):
+        """Vacía el cubo por minuto (429) o la cuota del día"""
+        with self._lock:
+            self._tokens = 0.0
+            if diaria:
+                self._usadas_dia = self.limite_dia
+    
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            self._actualizar()
+            return {
+                'limite_diario': self.limite_dia,
+                'restantes_dia': max(self.limite_dia - self._usadas_dia, 0),
+                'limite_minuto': self.limite_minuto,
+                'restantes_minuto': int(self._tokens),
+                'rechazadas': dict(self.rechazadas),
+            }
+    
+    def _actualizar(self):
+        """Rellena el cubo por minuto y reinicia la cuota al cambiar de día"""
+        ahora = self.reloj()
+        self._tokens = min(
+            float(self.limite_minuto),
+            self._tokens + (ahora - self._actualizado) * self.limite_minuto / 60
+        )
+        self._actualizado = ahora
+        
+        hoy = self._hoy()
+        if hoy != self._dia:
+            self._dia = hoy
+            self._usadas_dia = 0
+    
+    def _cabe_dia(self, prioridad: str) -> bool:
+        return self.limite_dia - self._usadas_dia > self.reservas.get(prioridad, 0) * self.limite_dia
+    
+    def _cabe_minuto(self, prioridad: str) -> bool:
+        return self._tokens >= 1 + self.reservas.get(prioridad, 0) * self.limite_minuto
+    
+    def _rechazar(self, prioridad: str, motivo: str) -> bool:
+        self.rechazadas[prioridad] = self.rechazadas.get(prioridad, 0) + 1
+        logger.info(f"⏸️ API-Sports: petición {prioridad} sin presupuesto ({motivo})")
+        return False
+    
+    @staticmethod
+    def _hoy():
+        return datetime.now(timezone.utc).date()
+
+
+_PRESUPUESTOS: Dict[str, PresupuestoAPI] = {}
+_PRESUPUESTOS_LOCK = threading.Lock()
+
+
+def presupuesto_compartido(config=API_CONFIG) -> PresupuestoAPI:
+    """Presupuesto único por clave de API dentro del proceso"""
+    with _PRESUPUESTOS_LOCK:
+        if config.api_sports_key not in _PRESUPUESTOS:
+            _PRESUPUESTOS[config.api_sports_key] = PresupuestoAPI(config)
+        return _PRESUPUESTOS[config.api_sports_key]
@@ -7,8 +7,11 @@ import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
+import time
 
 from src.config import API_CONFIG
+from src.data.cache_api import cache_compartida, clave_cache
+from src.data.circuito_api import circuitos_compartidos
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +24,12 @@ class TheSportsDBClient:
         self.base_url = config.thesportsdb_base_url
         self.league_id = config.thesportsdb_league_id
         self.session = requests.Session()
+        self.cache = cache_compartida(config)
+        self.circuitos = circuitos_compartidos(self.base_url, config)
     
     def _make_request(self, endpoint: str) -> Optional[Dict]:
         """
-        Realiza petición a TheSportsDB
+        Realiza petición a TheSportsDB (a través de la caché en disco)
         
         Args:
             endpoint: Endpoint completo con parámetros
@@ -32,15 +37,38 @@ class TheSportsDBClient:
         Returns:
             Respuesta JSON o None
         """
+        return self.cache.obtener_o_pedir(
+            clave_cache(self.base_url, endpoint),
+            self.cache.ttl(endpoint),
+            lambda: self._pedir(endpoint)
+        )
+    
+    def _pedir(self, endpoint: str) -> Optional[Dict]:
+        """Petición a TheSportsDB (sin caché)"""
         url = f"{self.base_url}/{endpoint}"
+        circuito = self.circuitos[endpoint.split('?')[0]]
+        if not circuito.permitir():
+            logger.info(f"🔌 TheSportsDB {endpoint}: circuito abierto, sin petición")
+            return None
         
+        inicio = time.monotonic()
+        registrado = False
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            circuito.registrar(True, time.monotonic() - inicio)
+            registrado = True
+            return data
         except requests.exceptions.RequestException as e:
+            circuito.registrar(False)
+            registrado = True
             logger.error(f"Error en TheSportsDB: {e}")
             return None
+        finally:
+            # Otra excepción: libera la prueba semiabierta
+            if not registrado:
+                circuito.neutro()
     
     def get_proximos_partidos(self, limit: int = 15) -> List[Dict]:
         """
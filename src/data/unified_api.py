@@ -8,6 +8,8 @@ import logging
 
 from src.data.api_sports import APISportsClient
 from src.data.thesportsdb import TheSportsDBClient
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.data.presupuesto_api import MEDIA
 from src.config import API_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -26,18 +28,23 @@ class UnifiedAPIClient:
         self.config = config
         self.api_sports = APISportsClient(config)
         self.thesportsdb = TheSportsDBClient(config)
-        
-        # Estado de las APIs
-        self.api_sports_activa = True
-        self.intentos_fallidos_api_sports = 0
-        self.max_intentos_fallidos = 3
     
-    def get_proximos_partidos(self, dias: int = 7) -> List[Dict]:
+    @property
+    def api_sports_activa(self) -> bool:
+        """False si todos los circuitos de API-Sports están abiertos"""
+        return self.api_sports.circuitos.alguno_disponible()
+    
+    def get_proximos_partidos(self, dias: int = 7, prioridad: str = MEDIA) -> List[Dict]:
         """
         Obtiene próximos partidos con fallback automático
         
+        Si el presupuesto de API-Sports no alcanza para la prioridad pedida
+        o el circuito de /fixtures está abierto, se usa la caché o
+        TheSportsDB. El circuito se vuelve a probar solo tras el enfriamiento.
+        
         Args:
             dias: Días hacia adelante (solo para API-Sports)
+            prioridad: Prioridad de la petición en el presupuesto de API-Sports
         
         Returns:
             Lista de próximos partidos
@@ -45,26 +52,20 @@ class UnifiedAPIClient:
         logger.info("🔍 Buscando próximos partidos...")
         
         # Intentar con API-Sports primero
-        if self.api_sports_activa:
-            try:
-                partidos = self.api_sports.get_proximos_partidos(dias)
-                
-                if partidos:
-                    logger.info(f"✓ API-Sports: {len(partidos)} partidos obtenidos")
-                    self.intentos_fallidos_api_sports = 0
-                    return self._normalizar_partidos_api_sports(partidos)
-                else:
-                    logger.warning("⚠️ API-Sports no devolvió partidos")
-                    self.intentos_fallidos_api_sports += 1
-                    
-            except Exception as e:
-                logger.error(f"❌ Error en API-Sports: {e}")
-                self.intentos_fallidos_api_sports += 1
+        try:
+            sin_presupuesto = not self.api_sports.presupuesto.disponible(prioridad)
+            partidos = self.api_sports.get_proximos_partidos(dias, prioridad)
+            
+            if partidos:
+                logger.info(f"✓ API-Sports: {len(partidos)} partidos obtenidos")
+                return self._normalizar_partidos_api_sports(partidos)
+            elif sin_presupuesto:
+                logger.info(f"⏸️ API-Sports sin presupuesto para prioridad {prioridad}")
+            else:
+                logger.warning("⚠️ API-Sports no devolvió partidos")
         
-        # Desactivar API-Sports si falla repetidamente
-        if self.intentos_fallidos_api_sports >= self.max_intentos_fallidos:
-            logger.warning("⚠️ API-Sports desactivada temporalmente (muchos fallos)")
-            self.api_sports_activa = False
+        except Exception as e:
+            logger.error(f"❌ Error en API-Sports: {e}")
         
         # Fallback a TheSportsDB
         if self.config.use_fallback:
@@ -75,17 +76,58 @@ class UnifiedAPIClient:
                 if partidos:
                     logger.info(f"✓ TheSportsDB: {len(partidos)} partidos obtenidos")
                     return self._normalizar_partidos_thesportsdb(partidos)
-                    
+            
             except Exception as e:
                 logger.error(f"❌ Error en TheSportsDB: {e}")
         
         logger.error("❌ No se pudieron obtener partidos de ninguna fuente")
         return []
     
-    def _normalizar_partidos_api_sports(self, partidos: List[Dict]) -> List[Dict]:
+    def añadir_cuotas(self, partidos: List[Dict], prioridad: str = MEDIA) -> int:
+        """
+        Añade cuota_local/cuota_empate/cuota_visitante a los partidos de API-Sports
+        
+        Una petición de cuotas por día (APISportsClient.get_cuotas_dia).
+        Los partidos de TheSportsDB no tienen ID de API-Sports y se quedan
+        sin cuotas, igual que los que no tienen mercado 1X2 publicado.
+        
+        Args:
+            partidos: Partidos normalizados (se modifican en el sitio)
+            prioridad: Prioridad de las peticiones en el presupuesto
+        
+        Returns:
+            Número de partidos con cuotas
+        """
+        por_dia: Dict[str, List[Dict]] = {}
+        for partido in partidos:
+            if partido.get('fuente') == 'api-sports' and partido.get('id') is not None and partido.get('fecha'):
+                por_dia.setdefault(str(partido['fecha'])[:10], []).append(partido)
+        
+        con_cuotas = 0
+        for dia, partidos_dia in sorted(por_dia.items()):
+            try:
+                cuotas = self.api_sports.get_cuotas_dia(dia, prioridad) or {}
+            except Exception as e:
+                logger.error(f"❌ Error obteniendo cuotas del {dia}: {e}")
+                continue
+            
+            for partido in partidos_dia:
+                if partido['id'] in cuotas:
+                    partido.update(cuotas[partido['id']])
+                    con_cuotas += 1
+        
+        logger.info(f"💶 Cuotas 1X2: {con_cuotas}/{len(partidos)} partidos")
+        return con_cuotas
+    
+    @staticmethod
+    def _normalizar_partidos_api_sports(partidos: List[Dict]) -> List[Dict]:
         """
         Normaliza partidos de API-Sports a formato estándar
         
+        local_id/visitante_id son los IDs de la fuente;
+        local_equipo_id/visitante_equipo_id, los del registro canónico
+        (los mismos que Local_ID/Visitante_ID en los datos históricos)
+        
         Returns:
             Lista de partidos en formato estándar
         """
@@ -96,27 +138,33 @@ class UnifiedAPIClient:
                 fixture = partido.get('fixture', {})
                 teams = partido.get('teams', {})
                 
+                local = teams.get('home', {}).get('name')
+                visitante = teams.get('away', {}).get('name')
+                
                 normalizado = {
                     'id': fixture.get('id'),
                     'fecha': fixture.get('date'),
-                    'local': teams.get('home', {}).get('name'),
-                    'visitante': teams.get('away', {}).get('name'),
+                    'local': local,
+                    'visitante': visitante,
                     'local_id': teams.get('home', {}).get('id'),
                     'visitante_id': teams.get('away', {}).get('id'),
+                    'local_equipo_id': REGISTRO_EQUIPOS.id(local),
+                    'visitante_equipo_id': REGISTRO_EQUIPOS.id(visitante),
                     'estadio': fixture.get('venue', {}).get('name'),
                     'estado': fixture.get('status', {}).get('long'),
                     'fuente': 'api-sports'
                 }
                 
                 normalizados.append(normalizado)
-                
+            
             except Exception as e:
                 logger.warning(f"Error normalizando partido API-Sports: {e}")
                 continue
         
         return normalizados
     
-    def _normalizar_partidos_thesportsdb(self, partidos: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _normalizar_partidos_thesportsdb(partidos: List[Dict]) -> List[Dict]:
         """
         Normaliza partidos de TheSportsDB a formato estándar
         
@@ -127,30 +175,59 @@ class UnifiedAPIClient:
         
         for partido in partidos:
             try:
+                local = partido.get('strHomeTeam')
+                visitante = partido.get('strAwayTeam')
+                
                 normalizado = {
                     'id': partido.get('idEvent'),
                     'fecha': f"{partido.get('dateEvent')} {partido.get('strTime', '00:00')}",
-                    'local': partido.get('strHomeTeam'),
-                    'visitante': partido.get('strAwayTeam'),
+                    'local': local,
+                    'visitante': visitante,
                     'local_id': partido.get('idHomeTeam'),
                     'visitante_id': partido.get('idAwayTeam'),
+                    'local_equipo_id': REGISTRO_EQUIPOS.id(local),
+                    'visitante_equipo_id': REGISTRO_EQUIPOS.id(visitante),
                     'estadio': partido.get('strVenue'),
                     'estado': partido.get('strStatus'),
                     'fuente': 'thesportsdb'
                 }
                 
                 normalizados.append(normalizado)
-                
+            
             except Exception as e:
                 logger.warning(f"Error normalizando partido TheSportsDB: {e}")
                 continue
         
         return normalizados
     
+    def get_jornada(self, dias: int = 7, cobertura: Optional[float] = None) -> Dict:
+        """
+        Partidos, clasificación y estadísticas de equipo con peticiones concurrentes
+        
+        Fachada síncrona de AsyncAPIClient.get_jornada.
+        
+        Args:
+            dias: Días hacia adelante
+            cobertura: Segundos antes de lanzar también TheSportsDB
+        
+        Returns:
+            Dict con 'partidos', 'clasificacion' y 'estadisticas_equipos'
+        """
+        from src.data.async_api import ejecutar_sincrono
+        return ejecutar_sincrono('get_jornada', dias, cobertura=cobertura, config=self.config)
+    
+    def get_estadisticas_equipos(self, partidos: List[Dict], season: int = None) -> Dict[int, Dict]:
+        """
+        Estadísticas de los equipos de una lista de partidos, en paralelo
+        
+        Fachada síncrona de AsyncAPIClient.get_estadisticas_equipos.
+        """
+        from src.data.async_api import ejecutar_sincrono
+        return ejecutar_sincrono('get_estadisticas_equipos', partidos, season, config=self.config)
+    
     def reactivar_api_sports(self):
-        """Reactiva API-Sports después de un período de enfriamiento"""
-        self.api_sports_activa = True
-        self.intentos_fallidos_api_sports = 0
+        """Cierra a mano todos los circuitos de API-Sports (sin esperar al enfriamiento)"""
+        self.api_sports.circuitos.reiniciar()
         logger.info("✓ API-Sports reactivada")
     
     def get_estado_apis(self) -> Dict:
@@ -163,11 +240,14 @@ class UnifiedAPIClient:
         return {
             'api_sports': {
                 'activa': self.api_sports_activa,
-                'intentos_fallidos': self.intentos_fallidos_api_sports
+                'circuitos': self.api_sports.circuitos.info(),
+                'presupuesto': self.api_sports.presupuesto.estado()
             },
             'thesportsdb': {
-                'activa': True,  # Siempre disponible
-                'tipo': 'respaldo gratuito'
-            }
+                'activa': self.thesportsdb.circuitos.alguno_disponible(),
+                'tipo': 'respaldo gratuito',
+                'circuitos': self.thesportsdb.circuitos.info()
+            },
+            'cache': self.api_sports.cache.estadisticas()
         }
 
@@ -4,6 +4,7 @@ Responsabilidad: Calcular stakes óptimos
 """
 
 from typing import Optional
+import numpy as np
 import logging
 
 from src.config import BACKTEST_CONFIG
@@ -70,6 +71,41 @@ def calcular_stake_kelly(
     return max(0.0, stake)
 
 
+def calcular_fraccion_kelly(
+    probabilidades: np.ndarray,
+    cuotas: np.ndarray,
+    kelly_fraction: float = 0.25,
+    max_stake_pct: float = 0.05
+) -> np.ndarray:
+    """
+    Versión vectorizada de calcular_stake_kelly con bankroll = 1
+    
+    Devuelve la fracción del bankroll a apostar en cada apuesta (0 si la
+    probabilidad o la cuota son inválidas o no hay edge).
+    
+    Args:
+        probabilidades: Probabilidades estimadas de ganar (0-1)
+        cuotas: Cuotas decimales
+        kelly_fraction: Fracción de Kelly a usar
+        max_stake_pct: Máximo % del bankroll por apuesta
+    
+    Returns:
+        Array con la fracción de bankroll por apuesta
+    """
+    probabilidades, cuotas = np.broadcast_arrays(
+        np.asarray(probabilidades, dtype=float),
+        np.asarray(cuotas, dtype=float)
+    )
+    
+    validas = (probabilidades > 0) & (probabilidades < 1) & (cuotas > 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        edge = probabilidades * cuotas - 1
+        kelly_full = edge / (cuotas - 1)
+    
+    stake_pct = np.minimum(kelly_full * kelly_fraction, max_stake_pct)
+    return np.where(validas & (edge > 0), np.maximum(stake_pct, 0.0), 0.0)
+
+
 def calcular_probabilidad_implicita(cuota: float) -> float:
     """
     Calcula probabilidad implícita de una cuota
@@ -140,3 +176,33 @@ def recomendar_stake(
         'valor': confianza > prob_implicita  # True si hay value
     }
 
+
+
+class KellyCalculator:
+    """
+    Stake en % del bankroll para los monitores de alertas
+    
+    Kelly fraccionado acotado entre stake_min y stake_max (fracciones del
+    bankroll), con el mismo criterio que LiveMonitor.
+    """
+    
+    def __init__(self, kelly_fraction: float = 0.25, stake_min: float = 0.005, stake_max: float = 0.03):
+        self.kelly_fraction = kelly_fraction
+        self.stake_min = stake_min
+        self.stake_max = stake_max
+    
+    def calcular_stake(self, win_rate: float, cuota: float) -> float:
+        """
+        Args:
+            win_rate: Probabilidad de acierto de la regla (0-1)
+            cuota: Cuota decimal
+        
+        Returns:
+            Stake en porcentaje del bankroll (p.ej. 1.25 = 1.25%)
+        """
+        if cuota <= 1.0:
+            return round(self.stake_min * 100, 2)
+        
+        kelly = (win_rate * cuota - 1) / (cuota - 1)
+        stake = max(self.stake_min, min(kelly * self.kelly_fraction, self.stake_max))
+        return round(stake * 100, 2)
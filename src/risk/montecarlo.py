@@ -0,0 +1,200 @@
+"""
+Simulación Monte Carlo de bankroll
+Responsabilidad: Estimar la distribución de bankroll final, drawdown y
+riesgo de ruina de la secuencia de apuestas de un backtest
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+import logging
+
+from src.backtest.metrics import calcular_max_drawdown_matriz
+from src.risk.kelly import calcular_fraccion_kelly
+from src.config import BACKTEST_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+ESTRATEGIAS = ('plano', 'kelly', 'kelly_fraccionado')
+
+
+class SimuladorMonteCarlo:
+    """
+    Simula caminos de bankroll sobre las apuestas disparadas en un backtest
+    
+    Cada apuesta se resuelve con una Bernoulli de la probabilidad del
+    modelo (p.ej. confianza_esperada de la regla). Los caminos se generan
+    en bloques de (caminos × apuestas) acotados por
+    config.mc_max_elementos_bloque, de modo que la memoria no depende del
+    número de simulaciones.
+    
+    Estrategias de stake:
+        plano: stake fijo en unidades
+        kelly: Kelly completo (calcular_stake_kelly con fracción 1, sin tope)
+        kelly_fraccionado: config.kelly_fraction con tope config.max_stake
+    """
+    
+    def __init__(self, config=BACKTEST_CONFIG, semilla: Optional[int] = None):
+        self.config = config
+        self.rng = np.random.default_rng(semilla)
+    
+    def simular(
+        self,
+        cuotas: np.ndarray,
+        probabilidades,
+        estrategia: str = 'kelly_fraccionado',
+        n_simulaciones: int = None,
+        bankroll_inicial: float = None,
+        stake_plano: float = 1.0,
+        kelly_fraction: float = None
+    ) -> Dict[str, Any]:
+        """
+        Simula n_simulaciones caminos de bankroll
+        
+        Args:
+            cuotas: Cuotas de las apuestas, en orden cronológico
+            probabilidades: Probabilidad de acierto (escalar o una por apuesta)
+            estrategia: 'plano', 'kelly' o 'kelly_fraccionado'
+            n_simulaciones: Número de caminos (por defecto config.mc_simulaciones)
+            bankroll_inicial: Bankroll inicial (por defecto config.bankroll_inicial)
+            stake_plano: Stake de la estrategia plana
+            kelly_fraction: Fracción para kelly_fraccionado (por defecto config.kelly_fraction)
+        
+        Returns:
+            Dict con percentiles de bankroll final y max drawdown, riesgo
+            de ruina, probabilidad de pérdida y los arrays por camino
+        """
+        
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida: {estrategia} (opciones: {ESTRATEGIAS})")
+        
+        n_simulaciones = n_simulaciones or self.config.mc_simulaciones
+        bankroll_inicial = bankroll_inicial or self.config.bankroll_inicial
+        
+        cuotas = np.asarray(cuotas, dtype=float)
+        probabilidades = np.broadcast_to(np.asarray(probabilidades, dtype=float), cuotas.shape)
+        
+        # Apuestas sin cuota válida no se pueden simular
+        validas = np.isfinite(cuotas) & (cuotas > 1.0)
+        if not validas.all():
+            logger.warning(f"⚠️ {int((~validas).sum())} apuestas sin cuota válida descartadas")
+            cuotas, probabilidades = cuotas[validas], probabilidades[validas]
+        
+        if estrategia == 'plano':
+            fracciones = None
+        elif estrategia == 'kelly':
+            fracciones = calcular_fraccion_kelly(probabilidades, cuotas, kelly_fraction=1.0, max_stake_pct=1.0)
+        else:
+            fracciones = calcular_fraccion_kelly(
+                probabilidades,
+                cuotas,
+                kelly_fraction=kelly_fraction or self.config.kelly_fraction,
+                max_stake_pct=self.config.max_stake
+            )
+        
+        n_apuestas = len(cuotas)
+        finales = np.empty(n_simulaciones)
+        drawdowns = np.empty(n_simulaciones)
+        ruinas = np.empty(n_simulaciones, dtype=bool)
+        
+        bloque = max(1, self.config.mc_max_elementos_bloque // max(n_apuestas, 1))
+        for inicio in range(0, n_simulaciones, bloque):
+            fin = min(inicio + bloque, n_simulaciones)
+            finales[inicio:fin], drawdowns[inicio:fin], ruinas[inicio:fin] = self._simular_bloque(
+                fin - inicio, cuotas, probabilidades, fracciones, bankroll_inicial, stake_plano
+            )
+        
+        return {
+            'estrategia': estrategia,
+            'n_simulaciones': n_simulaciones,
+            'n_apuestas': n_apuestas,
+            'bankroll_inicial': bankroll_inicial,
+            'bankroll_final': {
+                'media': float(finales.mean()),
+                **self._percentiles(finales, (5, 25, 50, 75, 95))
+            },
+            'max_drawdown': {
+                'media': float(drawdowns.mean()),
+                **self._percentiles(drawdowns, (50, 95, 99))
+            },
+            'riesgo_ruina': float(ruinas.mean()),
+            'prob_perdida': float((finales < bankroll_inicial).mean()),
+            'finales': finales,
+            'drawdowns': drawdowns
+        }
+    
+    def comparar_estrategias(self, cuotas: np.ndarray, probabilidades, **kwargs) -> pd.DataFrame:
+        """
+        Simula las tres estrategias de stake sobre las mismas apuestas
+        
+        Returns:
+            DataFrame con una fila por estrategia
+        """
+        filas = []
+        for estrategia in ESTRATEGIAS:
+            resultado = self.simular(cuotas, probabilidades, estrategia=estrategia, **kwargs)
+            filas.append({
+                'estrategia': estrategia,
+                'bankroll_medio': resultado['bankroll_final']['media'],
+                'bankroll_p5': resultado['bankroll_final']['p5'],
+                'bankroll_p50': resultado['bankroll_final']['p50'],
+                'bankroll_p95': resultado['bankroll_final']['p95'],
+                'max_dd_p50': resultado['max_drawdown']['p50'],
+                'max_dd_p95': resultado['max_drawdown']['p95'],
+                'riesgo_ruina': resultado['riesgo_ruina'],
+                'prob_perdida': resultado['prob_perdida']
+            })
+        return pd.DataFrame(filas)
+    
+    @staticmethod
+    def cuotas_desde_resultado(resultado: Dict[str, Any]) -> np.ndarray:
+        """Cuotas de las apuestas disparadas en un resultado de BacktestEngine"""
+        return np.array([partido['cuota'] for partido in resultado['partidos']], dtype=float)
+    
+    def _simular_bloque(
+        self,
+        n_caminos: int,
+        cuotas: np.ndarray,
+        probabilidades: np.ndarray,
+        fracciones: Optional[np.ndarray],
+        bankroll_inicial: float,
+        stake_plano: float
+    ):
+        """Bankroll final, max drawdown y ruina de un bloque de caminos"""
+        if len(cuotas) == 0:
+            return bankroll_inicial, 0.0, False
+        
+        aciertos = self.rng.random((n_caminos, len(cuotas)), dtype=np.float32) < probabilidades.astype(np.float32)
+        retornos = np.where(aciertos, cuotas - 1, -1.0)
+        
+        if fracciones is None:
+            curvas = bankroll_inicial + stake_plano * np.cumsum(retornos, axis=1)
+        else:
+            retornos *= fracciones
+            retornos += 1.0
+            curvas = bankroll_inicial * np.cumprod(retornos, axis=1)
+        del retornos
+        
+        # Ruina: bajar del umbral (o no cubrir el stake plano); el camino se detiene ahí
+        limite = self.config.mc_umbral_ruina * bankroll_inicial
+        if fracciones is None:
+            limite = max(limite, stake_plano)
+        en_ruina = curvas < limite
+        ruina = en_ruina.any(axis=1)
+        
+        if ruina.any():
+            primera = en_ruina.argmax(axis=1)
+            filas = np.flatnonzero(ruina)
+            posiciones = np.arange(curvas.shape[1])
+            congelar = posiciones[None, :] > primera[filas, None]
+            curvas[filas] = np.where(congelar, curvas[filas, primera[filas]][:, None], curvas[filas])
+        
+        inicio = np.full((n_caminos, 1), bankroll_inicial)
+        drawdowns = calcular_max_drawdown_matriz(np.hstack([inicio, curvas]))
+        
+        return curvas[:, -1], drawdowns, ruina
+    
+    @staticmethod
+    def _percentiles(valores: np.ndarray, percentiles: tuple) -> Dict[str, float]:
+        return {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(valores, percentiles))}
@@ -3,10 +3,13 @@ Clase base para todas las reglas
 Define la interfaz estándar que todas las reglas deben seguir
 """
 
-from typing import Callable, Any
+from typing import Callable, Any, Optional, Union
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 
+from src.rules.dsl import Condicion
+
 
 @dataclass
 class Regla:
@@ -16,18 +19,40 @@ class Regla:
     Attributes:
         nombre: Identificador único de la regla
         descripcion: Explicación de qué evalúa la regla
-        condicion: Función que recibe un partido (Series) y devuelve bool
+        condicion: Expresión declarativa (ver src/rules/dsl.py), p.ej.
+            "Cuota_Local < 1.70 & Local_Forma_L5 >= 10", o una función que
+            recibe un partido (Series o dict) y devuelve bool
         tipo_apuesta: 'Local', 'Visitante', 'Empate', 'BTTS', 'Over', 'Under'
         confianza_esperada: Tasa de acierto esperada según backtest manual
         activa: Si la regla está activa para evaluación
+        condicion_vectorizada: Opcional. Misma condición expresada sobre columnas:
+            recibe el DataFrame completo y devuelve una máscara booleana.
+            Con una expresión declarativa se genera automáticamente; sin ella,
+            el backtest evalúa `condicion` fila a fila.
     """
     
     nombre: str
     descripcion: str
-    condicion: Callable[[pd.Series], bool]
+    condicion: Union[str, Callable[[pd.Series], bool]]
     tipo_apuesta: str
     confianza_esperada: float
     activa: bool = True
+    condicion_vectorizada: Optional[Callable[[pd.DataFrame], Any]] = None
+    
+    def __post_init__(self):
+        # Las expresiones se compilan una sola vez (evaluador escalar + vectorizado)
+        if isinstance(self.condicion, str):
+            self.condicion = Condicion(self.condicion)
+        
+        if self.condicion_vectorizada is None and isinstance(self.condicion, Condicion):
+            self.condicion_vectorizada = self.condicion.mascara
+    
+    @property
+    def expresion(self) -> Optional[str]:
+        """Expresión declarativa de la condición (None si es una función)"""
+        if isinstance(self.condicion, Condicion):
+            return self.condicion.expresion
+        return None
     
     def evaluar(self, partido: pd.Series) -> bool:
         """
@@ -45,6 +70,38 @@ class Regla:
             # Si falta algún dato necesario, la regla no dispara
             return False
     
+    def evaluar_mascara(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Evalúa la regla sobre todos los partidos de un DataFrame
+        
+        Args:
+            df: DataFrame con un partido por fila
+        
+        Returns:
+            Array booleano (True donde la regla dispara)
+        """
+        if self.condicion_vectorizada is None:
+            # Reglas sin expresión por columnas: fila a fila
+            return np.fromiter(
+                (bool(self.evaluar(partido)) for _, partido in df.iterrows()),
+                dtype=bool,
+                count=len(df)
+            )
+        
+        try:
+            mascara = self.condicion_vectorizada(df)
+        except (KeyError, TypeError, AttributeError):
+            return np.zeros(len(df), dtype=bool)
+        
+        if isinstance(mascara, pd.Series):
+            mascara = mascara.fillna(False).to_numpy()
+        mascara = np.asarray(mascara, dtype=bool)
+        
+        if mascara.ndim == 0:
+            mascara = np.full(len(df), bool(mascara))
+        
+        return mascara
+    
     def __repr__(self):
         estado = "✓" if self.activa else "✗"
         return f"{estado} Regla('{self.nombre}', {self.tipo_apuesta}, confianza={self.confianza_esperada:.1%})"
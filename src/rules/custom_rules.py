@@ -4,6 +4,7 @@ Estrategias basadas en patrones de medio tiempo y segunda mitad
 """
 
 from src.rules.base import Regla
+from src.data.equipos import REGISTRO_EQUIPOS
 
 
 def crear_reglas_personalizadas():
@@ -22,10 +23,7 @@ def crear_reglas_personalizadas():
     reglas.append(Regla(
         nombre="Under25_Si_0-0_HT",
         descripcion="Under 2.5 cuando el partido va 0-0 al descanso",
-        condicion=lambda p: (
-            p.get('HT_Home', 0) == 0 and 
-            p.get('HT_Away', 0) == 0
-        ),
+        condicion="HT_Home == 0 & HT_Away == 0",
         tipo_apuesta="Under 2.5",
         confianza_esperada=0.65,
         activa=True
@@ -37,16 +35,11 @@ def crear_reglas_personalizadas():
     reglas.append(Regla(
         nombre="Favorito_Mantiene_Ventaja",
         descripcion="El favorito que gana al descanso seguirá ganando",
-        condicion=lambda p: (
-            # Favorito es local (cuota < 2.0)
-            p.get('Cuota_Local', 999) < 2.0 and
-            # Local gana al descanso
-            p.get('HT_Home', 0) > p.get('HT_Away', 0)
-        ) or (
-            # Favorito es visitante (cuota < 2.5)
-            p.get('Cuota_Visitante', 999) < 2.5 and
-            # Visitante gana al descanso
-            p.get('HT_Away', 0) > p.get('HT_Home', 0)
+        condicion=(
+            # Favorito local (cuota < 2.0) que gana al descanso
+            "(Cuota_Local < 2.0 & HT_Home > HT_Away) | "
+            # Favorito visitante (cuota < 2.5) que gana al descanso
+            "(Cuota_Visitante < 2.5 & HT_Away > HT_Home)"
         ),
         tipo_apuesta="Favorito",
         confianza_esperada=0.75,
@@ -59,11 +52,9 @@ def crear_reglas_personalizadas():
     reglas.append(Regla(
         nombre="Ganando_1-0_HT_No_Pierde",
         descripcion="Equipos ganando 1-0 al descanso raramente pierden",
-        condicion=lambda p: (
-            # Local gana 1-0 al descanso
-            (p.get('HT_Home', 0) == 1 and p.get('HT_Away', 0) == 0) or
-            # Visitante gana 0-1 al descanso
-            (p.get('HT_Home', 0) == 0 and p.get('HT_Away', 0) == 1)
+        condicion=(
+            # Local gana 1-0 o visitante gana 0-1 al descanso
+            "(HT_Home == 1 & HT_Away == 0) | (HT_Home == 0 & HT_Away == 1)"
         ),
         tipo_apuesta="Doble Chance (ganador HT)",
         confianza_esperada=0.80,
@@ -73,18 +64,14 @@ def crear_reglas_personalizadas():
     # ========================================
     # 4. GOL EN 2ª MITAD - EQUIPOS GRANDES
     # ========================================
-    equipos_grandes = [
-        'Barcelona', 'Real Madrid', 'Sevilla', 'Granada', 'Valencia',
-        'FC Barcelona', 'Real Madrid CF', 'Sevilla FC', 'Granada CF', 'Valencia CF'
-    ]
+    # IDs canónicos: cubren todas las variantes del nombre (FC Barcelona, Sevilla FC...)
+    equipos_grandes = ['Barcelona', 'Real Madrid', 'Sevilla', 'Granada', 'Valencia']
+    lista_grandes = ', '.join(str(id_equipo) for id_equipo in REGISTRO_EQUIPOS.ids_de(equipos_grandes))
     
     reglas.append(Regla(
         nombre="Gol_2H_Equipos_Grandes",
         descripcion="Barcelona, Real Madrid, Sevilla, Granada, Valencia marcan en 2H",
-        condicion=lambda p: (
-            any(equipo in p.get('Local', '') for equipo in equipos_grandes) or
-            any(equipo in p.get('Visitante', '') for equipo in equipos_grandes)
-        ),
+        condicion=f"Local_ID in ({lista_grandes}) | Visitante_ID in ({lista_grandes})",
         tipo_apuesta="Gol en 2H",
         confianza_esperada=0.70,
         activa=True
@@ -96,10 +83,7 @@ def crear_reglas_personalizadas():
     reglas.append(Regla(
         nombre="Gol_2H_Si_Gol_1H",
         descripcion="Si hay gol en 1H, habrá gol en 2H",
-        condicion=lambda p: (
-            # Hubo al menos 1 gol en primera mitad
-            (p.get('HT_Home', 0) + p.get('HT_Away', 0)) >= 1
-        ),
+        condicion="HT_Home + HT_Away >= 1",  # Al menos 1 gol en primera mitad
         tipo_apuesta="Gol en 2H",
         confianza_esperada=0.68,
         activa=True
@@ -111,9 +95,7 @@ def crear_reglas_personalizadas():
     reglas.append(Regla(
         nombre="Over25_Si_2Goles_HT",
         descripcion="Over 2.5 si hay 2 o más goles al descanso",
-        condicion=lambda p: (
-            (p.get('HT_Home', 0) + p.get('HT_Away', 0)) >= 2
-        ),
+        condicion="HT_Home + HT_Away >= 2",
         tipo_apuesta="Over 2.5",
         confianza_esperada=0.72,
         activa=True
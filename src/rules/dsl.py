@@ -0,0 +1,464 @@
+"""
+Lenguaje declarativo de condiciones para reglas
+Responsabilidad: Parsear expresiones como
+    "Cuota_Local < 1.70 & Local_Forma_L5 >= 10"
+y compilarlas una sola vez a:
+    - un evaluador vectorizado (máscara NumPy sobre un DataFrame) para backtests
+    - un evaluador escalar (un partido como dict o Series) para los monitores
+
+Sintaxis:
+    Columnas        Local_Forma_L5, Cuota_Local, HT_Home, Año ...
+    Literales       1.70, 10, 'Barcelona'
+    Parámetros      {cuota_max} (se asignan al evaluar, ver barridos)
+    Aritmética      + - * /
+    Comparaciones   < <= > >= == !=
+    Pertenencia     Local in ('Barcelona', 'Real Madrid'), not in (...)
+    Lógica          & | ~  (o and, or, not)
+
+Un dato ausente (columna inexistente o NaN) hace falsa cualquier
+comparación en la que participa: la regla no dispara. Esto incluye != y
+las negaciones (~, not in): solo son verdaderas si todos sus operandos
+tienen valor.
+"""
+
+import numpy as np
+import pandas as pd
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ErrorDSL(ValueError):
+    """Expresión de condición inválida"""
+
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<num>\d+\.\d*|\.\d+|\d+)
+      | (?P<str>'[^']*'|"[^"]*")
+      | (?P<param>\{[^\W\d]\w*\})
+      | (?P<nombre>[^\W\d]\w*)
+      | (?P<op><=|>=|==|!=|<|>|&|\||~|\+|-|\*|/|\(|\)|,)
+    )""", re.VERBOSE)
+
+_PALABRAS = {'and': '&', 'or': '|', 'not': '~', 'in': 'in'}
+
+_COMPARACIONES = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+_ARITMETICA = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+
+def _tokenizar(expresion: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    expresion = expresion.rstrip()
+    
+    while pos < len(expresion):
+        match = _TOKEN.match(expresion, pos)
+        if not match or match.end() == pos:
+            raise ErrorDSL(f"Carácter inesperado en posición {pos}: {expresion[pos:pos + 10]!r}")
+        pos = match.end()
+        
+        tipo = match.lastgroup
+        valor = match.group(tipo)
+        
+        if tipo == 'num':
+            tokens.append(('num', float(valor) if '.' in valor else int(valor)))
+        elif tipo == 'str':
+            tokens.append(('str', valor[1:-1]))
+        elif tipo == 'param':
+            tokens.append(('param', valor[1:-1]))
+        elif tipo == 'nombre' and valor.lower() in _PALABRAS:
+            tokens.append(('op', _PALABRAS[valor.lower()]))
+        elif tipo == 'nombre':
+            tokens.append(('col', valor))
+        else:
+            tokens.append(('op', valor))
+    
+    tokens.append(('fin', None))
+    return tokens
+
+
+class _Parser:
+    """Parser descendente recursivo. Precedencia: | < & < ~ < comparación < +- < */ < unario"""
+    
+    def __init__(self, expresion: str):
+        self.expresion = expresion
+        self.tokens = _tokenizar(expresion)
+        self.pos = 0
+    
+    def parsear(self) -> tuple:
+        arbol = self._or()
+        if self._actual() != ('fin', None):
+            raise ErrorDSL(f"Token inesperado {self._actual()[1]!r} en {self.expresion!r}")
+        return arbol
+    
+    def _actual(self) -> Tuple[str, Any]:
+        return self.tokens[self.pos]
+    
+    def _es_op(self, *ops: str) -> bool:
+        tipo, valor = self._actual()
+        return tipo == 'op' and valor in ops
+    
+    def _consumir_op(self, op: str):
+        if not self._es_op(op):
+            raise ErrorDSL(f"Se esperaba {op!r} en {self.expresion!r}")
+        self.pos += 1
+    
+    def _or(self) -> tuple:
+        nodo = self._and()
+        while self._es_op('|'):
+            self.pos += 1
+            nodo = ('or', nodo, self._and())
+        return nodo
+    
+    def _and(self) -> tuple:
+        nodo = self._not()
+        while self._es_op('&'):
+            self.pos += 1
+            nodo = ('and', nodo, self._not())
+        return nodo
+    
+    def _not(self) -> tuple:
+        if self._es_op('~'):
+            self.pos += 1
+            return ('not', self._not())
+        return self._comparacion()
+    
+    def _comparacion(self) -> tuple:
+        izquierda = self._suma()
+        
+        if self._es_op(*_COMPARACIONES):
+            op = self._actual()[1]
+            self.pos += 1
+            return ('cmp', op, izquierda, self._suma())
+        
+        negado = False
+        if self._es_op('~') and self.tokens[self.pos + 1] == ('op', 'in'):
+            negado = True
+            self.pos += 1
+        
+        if self._es_op('in'):
+            self.pos += 1
+            nodo = ('in', izquierda, self._lista())
+            return ('not', nodo) if negado else nodo
+        
+        return izquierda
+    
+    def _lista(self) -> tuple:
+        self._consumir_op('(')
+        valores = []
+        while not self._es_op(')'):
+            tipo, valor = self._actual()
+            if tipo not in ('num', 'str'):
+                raise ErrorDSL(f"Solo se admiten literales en listas: {self.expresion!r}")
+            valores.append(valor)
+            self.pos += 1
+            if not self._es_op(','):
+                break
+            self.pos += 1
+        self._consumir_op(')')
+        if not valores:
+            raise ErrorDSL(f"Lista vacía en {self.expresion!r}")
+        return tuple(valores)
+    
+    def _suma(self) -> tuple:
+        nodo = self._producto()
+        while self._es_op('+', '-'):
+            op = self._actual()[1]
+            self.pos += 1
+            nodo = ('arit', op, nodo, self._producto())
+        return nodo
+    
+    def _producto(self) -> tuple:
+        nodo = self._unario()
+        while self._es_op('*', '/'):
+            op = self._actual()[1]
+            self.pos += 1
+            nodo = ('arit', op, nodo, self._unario())
+        return nodo
+    
+    def _unario(self) -> tuple:
+        if self._es_op('-'):
+            self.pos += 1
+            return ('arit', '-', ('lit', 0), self._unario())
+        return self._atomo()
+    
+    def _atomo(self) -> tuple:
+        tipo, valor = self._actual()
+        
+        if tipo in ('num', 'str'):
+            self.pos += 1
+            return ('lit', valor)
+        if tipo == 'col':
+            self.pos += 1
+            return ('col', valor)
+        if tipo == 'param':
+            self.pos += 1
+            return ('param', valor)
+        if self._es_op('('):
+            self.pos += 1
+            nodo = self._or()
+            self._consumir_op(')')
+            return nodo
+        
+        raise ErrorDSL(f"Expresión incompleta o inválida: {self.expresion!r}")
+
+
+def parsear(expresion: str) -> tuple:
+    """Parsea una expresión y devuelve su árbol (tuplas anidadas)"""
+    return _Parser(expresion).parsear()
+
+
+# =============================================
+# Compilación a evaluador vectorizado
+# =============================================
+
+def _valores_columna(df: pd.DataFrame, nombre: str) -> Any:
+    """Columna como array NumPy (NaN escalar si no existe)"""
+    if nombre not in df.columns:
+        return np.nan
+    
+    serie = df[nombre]
+    if isinstance(serie.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.to_numpy(dtype=object)
+    if pd.api.types.is_extension_array_dtype(serie.dtype):
+        # Enteros/booleanos con nulos: NaN para que las comparaciones sean falsas
+        return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    return serie.to_numpy()
+
+
+def _presente(valor: Any) -> Any:
+    """True donde el valor (escalar o array) no es nulo"""
+    return np.logical_not(pd.isna(valor))
+
+
+def _columnas_presentes(df: pd.DataFrame, columnas: List[str]) -> Any:
+    """True en las filas donde todas las columnas existen y tienen valor"""
+    presentes = True
+    for nombre in columnas:
+        presentes = np.logical_and(presentes, _presente(_valores_columna(df, nombre)))
+    return presentes
+
+
+def _distinto_vector(izquierda: Any, derecha: Any) -> Any:
+    """!= que es falso si falta cualquiera de los operandos"""
+    distinto = np.asarray(operator.ne(izquierda, derecha), dtype=bool)
+    return distinto & _presente(izquierda) & _presente(derecha)
+
+
+def _pertenencia(valores_columna: Any, valores: List[Any]) -> Any:
+    if np.ndim(valores_columna) == 0:
+        return valores_columna in valores
+    return pd.Series(valores_columna).isin(valores).to_numpy()
+
+
+def _compilar_vector(nodo: tuple) -> Callable[[pd.DataFrame, Dict], Any]:
+    tipo = nodo[0]
+    
+    if tipo == 'lit':
+        valor = nodo[1]
+        return lambda df, params: valor
+    if tipo == 'param':
+        nombre = nodo[1]
+        return lambda df, params: params[nombre]
+    if tipo == 'col':
+        nombre = nodo[1]
+        return lambda df, params: _valores_columna(df, nombre)
+    if tipo == 'arit':
+        op, izq, der = _ARITMETICA[nodo[1]], _compilar_vector(nodo[2]), _compilar_vector(nodo[3])
+        return lambda df, params: op(izq(df, params), der(df, params))
+    if tipo == 'cmp':
+        izq, der = _compilar_vector(nodo[2]), _compilar_vector(nodo[3])
+        if nodo[1] == '!=':
+            return lambda df, params: _distinto_vector(izq(df, params), der(df, params))
+        op = _COMPARACIONES[nodo[1]]
+        return lambda df, params: np.asarray(op(izq(df, params), der(df, params)), dtype=bool)
+    if tipo == 'in':
+        izq, valores = _compilar_vector(nodo[1]), list(nodo[2])
+        return lambda df, params: _pertenencia(izq(df, params), valores)
+    if tipo == 'and':
+        izq, der = _compilar_vector(nodo[1]), _compilar_vector(nodo[2])
+        return lambda df, params: np.logical_and(izq(df, params), der(df, params))
+    if tipo == 'or':
+        izq, der = _compilar_vector(nodo[1]), _compilar_vector(nodo[2])
+        return lambda df, params: np.logical_or(izq(df, params), der(df, params))
+    if tipo == 'not':
+        # Sin datos la negación tampoco dispara: ~(Cuota < 2) con Cuota NaN es falso
+        interno, columnas = _compilar_vector(nodo[1]), sorted(_recorrer(nodo[1], 'col'))
+        return lambda df, params: np.logical_and(
+            np.logical_not(interno(df, params)), _columnas_presentes(df, columnas)
+        )
+    
+    raise ErrorDSL(f"Nodo desconocido: {tipo}")
+
+
+# =============================================
+# Compilación a evaluador escalar
+# =============================================
+
+def _valor_partido(partido: Any, nombre: str) -> Any:
+    valor = partido.get(nombre)
+    if valor is None or valor is pd.NA:
+        return np.nan
+    return valor
+
+
+def _distinto_escalar(izquierda: Any, derecha: Any) -> bool:
+    return bool(izquierda != derecha) and not pd.isna(izquierda) and not pd.isna(derecha)
+
+
+def _compilar_escalar(nodo: tuple) -> Callable[[Any, Dict], Any]:
+    tipo = nodo[0]
+    
+    if tipo == 'lit':
+        valor = nodo[1]
+        return lambda p, params: valor
+    if tipo == 'param':
+        nombre = nodo[1]
+        return lambda p, params: params[nombre]
+    if tipo == 'col':
+        nombre = nodo[1]
+        return lambda p, params: _valor_partido(p, nombre)
+    if tipo == 'arit':
+        op, izq, der = _ARITMETICA[nodo[1]], _compilar_escalar(nodo[2]), _compilar_escalar(nodo[3])
+        return lambda p, params: op(izq(p, params), der(p, params))
+    if tipo == 'cmp':
+        izq, der = _compilar_escalar(nodo[2]), _compilar_escalar(nodo[3])
+        if nodo[1] == '!=':
+            return lambda p, params: _distinto_escalar(izq(p, params), der(p, params))
+        op = _COMPARACIONES[nodo[1]]
+        return lambda p, params: bool(op(izq(p, params), der(p, params)))
+    if tipo == 'in':
+        izq, valores = _compilar_escalar(nodo[1]), frozenset(nodo[2])
+        return lambda p, params: izq(p, params) in valores
+    if tipo == 'and':
+        izq, der = _compilar_escalar(nodo[1]), _compilar_escalar(nodo[2])
+        return lambda p, params: izq(p, params) and der(p, params)
+    if tipo == 'or':
+        izq, der = _compilar_escalar(nodo[1]), _compilar_escalar(nodo[2])
+        return lambda p, params: izq(p, params) or der(p, params)
+    if tipo == 'not':
+        interno, columnas = _compilar_escalar(nodo[1]), sorted(_recorrer(nodo[1], 'col'))
+        return lambda p, params: not interno(p, params) and not any(
+            pd.isna(_valor_partido(p, nombre)) for nombre in columnas
+        )
+    
+    raise ErrorDSL(f"Nodo desconocido: {tipo}")
+
+
+def _recorrer(nodo: tuple, tipo: str) -> Set[str]:
+    """Nombres de columnas o parámetros usados en el árbol"""
+    if nodo[0] == tipo:
+        return {nodo[1]}
+    if nodo[0] == 'in':
+        # nodo[2] es la lista de literales, no un subárbol
+        return _recorrer(nodo[1], tipo)
+    encontrados = set()
+    for hijo in nodo[1:]:
+        if isinstance(hijo, tuple) and hijo and isinstance(hijo[0], str):
+            encontrados |= _recorrer(hijo, tipo)
+    return encontrados
+
+
+_PRECEDENCIA = {'or': 1, 'and': 2, 'not': 3, 'cmp': 4, 'in': 4, '+': 5, '-': 5, '*': 6, '/': 6}
+
+
+def a_texto(nodo: tuple, precedencia_padre: int = 0) -> str:
+    """Reconstruye la expresión a partir del árbol (inverso de parsear)"""
+    tipo = nodo[0]
+    
+    if tipo == 'lit':
+        return repr(nodo[1])
+    if tipo == 'col':
+        return nodo[1]
+    if tipo == 'param':
+        return '{' + nodo[1] + '}'
+    
+    if tipo == 'arit':
+        precedencia = _PRECEDENCIA[nodo[1]]
+        texto = f"{a_texto(nodo[2], precedencia)} {nodo[1]} {a_texto(nodo[3], precedencia + 1)}"
+    elif tipo == 'cmp':
+        precedencia = _PRECEDENCIA['cmp']
+        texto = f"{a_texto(nodo[2], precedencia + 1)} {nodo[1]} {a_texto(nodo[3], precedencia + 1)}"
+    elif tipo == 'in':
+        precedencia = _PRECEDENCIA['in']
+        valores = ', '.join(repr(v) for v in nodo[2])
+        texto = f"{a_texto(nodo[1], precedencia + 1)} in ({valores},)" if len(nodo[2]) == 1 \
+            else f"{a_texto(nodo[1], precedencia + 1)} in ({valores})"
+    elif tipo in ('and', 'or'):
+        precedencia = _PRECEDENCIA[tipo]
+        simbolo = '&' if tipo == 'and' else '|'
+        texto = f"{a_texto(nodo[1], precedencia)} {simbolo} {a_texto(nodo[2], precedencia + 1)}"
+    elif tipo == 'not':
+        precedencia = _PRECEDENCIA['not']
+        texto = f"~{a_texto(nodo[1], precedencia)}"
+    else:
+        raise ErrorDSL(f"Nodo desconocido: {tipo}")
+    
+    return f"({texto})" if precedencia < precedencia_padre else texto
+
+
+class Condicion:
+    """
+    Condición declarativa compilada
+    
+    Se usa como `condicion` de una Regla: es invocable sobre un partido
+    (dict o Series) y expone `mascara(df)` para el backtest vectorizado.
+    """
+    
+    def __init__(self, expresion: str, arbol: Optional[tuple] = None):
+        self.expresion = expresion
+        self.arbol = arbol if arbol is not None else parsear(expresion)
+        self.columnas = _recorrer(self.arbol, 'col')
+        self.parametros = _recorrer(self.arbol, 'param')
+        self._vector = _compilar_vector(self.arbol)
+        self._escalar = _compilar_escalar(self.arbol)
+    
+    def __call__(self, partido: Any, **params) -> bool:
+        """Evalúa la condición para un partido (dict o Series)"""
+        return bool(self._escalar(partido, params))
+    
+    def mascara(self, df: pd.DataFrame, **params) -> np.ndarray:
+        """Evalúa la condición sobre todas las filas de un DataFrame"""
+        resultado = np.asarray(self._vector(df, params), dtype=bool)
+        if resultado.shape != (len(df),):
+            # Expresión sin columnas presentes: valor constante para todas las filas
+            resultado = np.broadcast_to(resultado, (len(df),)).copy()
+        return resultado
+    
+    def terminos(self) -> List["Condicion"]:
+        """Términos de la conjunción de primer nivel (A & B & C -> [A, B, C])"""
+        pendientes = [self.arbol]
+        terminos = []
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo[0] == 'and':
+                pendientes.extend([nodo[2], nodo[1]])
+            else:
+                terminos.append(Condicion(a_texto(nodo), nodo))
+        return terminos
+    
+    def __reduce__(self):
+        # Las funciones compiladas no se serializan: se recompila al deserializar
+        return (Condicion, (self.expresion, self.arbol))
+    
+    def __repr__(self):
+        return f"Condicion({self.expresion!r})"
+
+
+def compilar(expresion: str) -> Condicion:
+    """Parsea y compila una expresión de condición"""
+    return Condicion(expresion)
@@ -0,0 +1,118 @@
+"""
+Evaluación de reglas por lotes
+Responsabilidad: Evaluar todas las reglas activas sobre una lista de
+partidos en una sola pasada (una máscara por regla) y devolver solo los
+pares partido × regla que disparan
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.rules.base import Regla
+
+
+def tabla_partidos(partidos: List[Dict[str, Any]], columnas: Dict[str, Tuple[str, Any]]) -> pd.DataFrame:
+    """
+    Convierte partidos (dicts) en un DataFrame con las columnas de las reglas
+    
+    Equivale a `partido.get(origen, defecto)` para cada partido, pero
+    columna a columna.
+    
+    Args:
+        partidos: Lista de dicts (una fila por partido, en el mismo orden)
+        columnas: {clave en el dict: (columna de las reglas, valor por defecto)}
+    
+    Returns:
+        DataFrame con una columna por entrada de `columnas`
+    """
+    return pd.DataFrame({
+        destino: [partido.get(origen, defecto) for partido in partidos]
+        for origen, (destino, defecto) in columnas.items()
+    }, index=pd.RangeIndex(len(partidos)))
+
+
+def filas_disparo(df: pd.DataFrame, disparos: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Fila (dict columna -> valor) del partido de cada disparo
+    
+    Solo se materializan las filas con disparos, leyendo de los arrays de
+    cada columna en lugar de df.iloc.
+    """
+    valores = {columna: df[columna].to_numpy() for columna in df.columns}
+    return [
+        {columna: array[fila] for columna, array in valores.items()}
+        for fila in disparos['fila'].to_numpy()
+    ]
+
+
+class EvaluadorReglas:
+    """
+    Evalúa un conjunto de reglas sobre todos los partidos de una vez
+    
+    Cada regla se evalúa como máscara sobre el DataFrame completo
+    (Regla.evaluar_mascara); las máscaras forman una matriz
+    partidos × reglas y los disparos son sus celdas verdaderas, en el mismo
+    orden que el bucle partido → regla de los monitores.
+    """
+    
+    def __init__(self, reglas: Iterable[Regla]):
+        self.reglas = list(reglas)
+        self._nombres = np.array([r.nombre for r in self.reglas], dtype=object)
+        self._tipos = np.array([r.tipo_apuesta for r in self.reglas], dtype=object)
+        self._confianzas = np.array([r.confianza_esperada for r in self.reglas], dtype=float)
+    
+    def matriz(self, df: pd.DataFrame) -> np.ndarray:
+        """Matriz booleana (partidos × reglas) de disparos"""
+        if not self.reglas or df.empty:
+            return np.zeros((len(df), len(self.reglas)), dtype=bool)
+        return np.column_stack([regla.evaluar_mascara(df) for regla in self.reglas])
+    
+    def disparos(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Pares partido × regla que disparan
+        
+        Args:
+            df: DataFrame con un partido por fila
+        
+        Returns:
+            DataFrame con columnas fila (posición del partido en df),
+            indice_regla, regla, tipo_apuesta y confianza
+        """
+        filas, indices = np.nonzero(self.matriz(df))
+        return pd.DataFrame({
+            'fila': filas,
+            'indice_regla': indices,
+            'regla': self._nombres[indices],
+            'tipo_apuesta': self._tipos[indices],
+            'confianza': self._confianzas[indices],
+        })
+    
+    @staticmethod
+    def cuotas(
+        df: pd.DataFrame,
+        disparos: pd.DataFrame,
+        columnas_por_tipo: Dict[str, str],
+        defecto: float = np.nan
+    ) -> np.ndarray:
+        """
+        Cuota de cada disparo según su tipo de apuesta
+        
+        Args:
+            df: DataFrame evaluado
+            disparos: Resultado de disparos(df)
+            columnas_por_tipo: {tipo_apuesta: columna de cuota en df}
+            defecto: Cuota para tipos sin columna (o columna ausente)
+        """
+        cuotas = np.full(len(disparos), defecto, dtype=float)
+        filas = disparos['fila'].to_numpy()
+        tipos = disparos['tipo_apuesta'].to_numpy()
+        
+        for tipo, columna in columnas_por_tipo.items():
+            if columna not in df.columns:
+                continue
+            seleccion = tipos == tipo
+            if seleccion.any():
+                cuotas[seleccion] = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=float)[filas[seleccion]]
+        
+        return cuotas
@@ -0,0 +1,381 @@
+"""
+Servidor local que imita API-Sports y TheSportsDB
+Responsabilidad: Servir respuestas grabadas (data/fixtures_api) para
+probar clientes, caché, presupuesto, cortacircuitos y monitores sin red,
+con latencia, 429 y caídas inyectables y un modo que graba respuestas reales
+"""
+
+import requests
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from src.config import API_CONFIG, DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+
+DIRECTORIO_FIXTURES = DATA_DIR / "fixtures_api"
+
+# Prefijo de ruta de cada fuente: http://host:puerto/{fuente}/...
+FUENTES = ('api_sports', 'thesportsdb')
+
+# URL reales para el modo grabación
+ORIGENES = {
+    'api_sports': "https://v3.football.api-sports.io",
+    'thesportsdb': "https://www.thesportsdb.com/api/v1/json/3",
+}
+
+# Cabeceras que se reenvían al origen al grabar
+CABECERAS_REENVIO = ('x-rapidapi-key', 'x-rapidapi-host', 'x-apisports-key')
+
+
+class Fixture:
+    """
+    Respuesta grabada
+    
+    Fichero JSON en data/fixtures_api/{fuente}/:
+        {"ruta": "/fixtures", "query": {"live": "all"}, "estado": 200,
+         "cuerpo": {...}}
+    o, para simular un partido que avanza, "secuencia": [{...}, {...}]
+    (cada petición sirve el siguiente cuerpo; el último se repite).
+    
+    Una fixture encaja con una petición si la ruta coincide y todos sus
+    parámetros de query están en la petición; gana la más específica.
+    """
+    
+    def __init__(self, fuente: str, datos: Dict[str, Any], ruta_fichero: Optional[Path] = None):
+        self.fuente = fuente
+        self.ruta = datos['ruta'].lstrip('/')
+        self.query = {k: str(v) for k, v in datos.get('query', {}).items()}
+        self.estado = datos.get('estado', 200)
+        self.secuencia = datos['secuencia'] if 'secuencia' in datos else [datos['cuerpo']]
+        self.ruta_fichero = ruta_fichero
+        self._siguiente = 0
+        self._lock = threading.Lock()
+    
+    def encaja(self, ruta: str, query: Dict[str, str]) -> bool:
+        return ruta == self.ruta and all(query.get(k) == v for k, v in self.query.items())
+    
+    def cuerpo(self) -> Any:
+        with self._lock:
+            cuerpo = self.secuencia[min(self._siguiente, len(self.secuencia) - 1)]
+            self._siguiente += 1
+        return cuerpo
+    
+    def reiniciar(self):
+        with self._lock:
+            self._siguiente = 0
+
+
+def nombre_fixture(ruta: str, query: Dict[str, str]) -> str:
+    """'/fixtures', {'live': 'all'} -> 'fixtures__live-all.json'"""
+    partes = [ruta.strip('/').replace('.php', '')] + [f"{k}-{v}" for k, v in sorted(query.items())]
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', '__'.join(partes)) + '.json'
+
+
+class ServidorAPI:
+    """
+    Servidor HTTP local con las rutas de API-Sports y TheSportsDB
+    
+    - API-Sports en {url}/api_sports, TheSportsDB en {url}/thesportsdb
+      (variables API_SPORTS_BASE_URL / THESPORTSDB_BASE_URL, o config_api())
+    - Cuota simulada de API-Sports: cabeceras x-ratelimit-*, error de
+      cuota diaria en el cuerpo y 429 al pasar del límite por minuto;
+      /status devuelve el consumo real del servidor
+    - Fallos inyectables (también en caliente con /_control):
+      latencia + jitter, probabilidad de 429 y de 500, y caídas (503)
+      por prefijo de ruta ('api_sports', 'api_sports/fixtures', '*')
+    - grabar=True reenvía las peticiones sin fixture al origen real y
+      guarda la respuesta como fixture
+    - /_estadisticas: peticiones servidas por ruta y por código
+    
+    Uso:
+        with ServidorAPI(puerto=0, latencia=0.05) as servidor:
+            cliente = UnifiedAPIClient(servidor.config_api())
+    """
+    
+    def __init__(
+        self,
+        directorio: Path = DIRECTORIO_FIXTURES,
+        host: str = '127.0.0.1',
+        puerto: int = 8765,
+        latencia: float = 0.0,
+        jitter: float = 0.0,
+        prob_429: float = 0.0,
+        prob_error: float = 0.0,
+        caidas: Iterable[str] = (),
+        limite_dia: int = 100,
+        limite_minuto: int = 10,
+        grabar: bool = False,
+        semilla: Optional[int] = None
+    ):
+        self.directorio = Path(directorio)
+        self.host = host
+        self.puerto = puerto
+        self.latencia = latencia
+        self.jitter = jitter
+        self.prob_429 = prob_429
+        self.prob_error = prob_error
+        self.caidas = set(caidas)
+        self.limite_dia = limite_dia
+        self.limite_minuto = limite_minuto
+        self.grabar = grabar
+        
+        self._random = random.Random(semilla)
+        self._lock = threading.Lock()
+        self._usadas_dia = 0
+        self._ultimo_minuto: List[float] = []
+        self._contadores: Dict[str, Dict[str, int]] = {}
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._hilo: Optional[threading.Thread] = None
+        
+        self.fixtures: Dict[str, List[Fixture]] = {}
+        self.recargar()
+    
+    def iniciar(self) -> 'ServidorAPI':
+        self._servidor = ThreadingHTTPServer((self.host, self.puerto), _Manejador)
+        self._servidor.daemon_threads = True
+        self._servidor.servidor_api = self
+        self.puerto = self._servidor.server_address[1]
+        
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name='servidor-api', daemon=True)
+        self._hilo.start()
+        logger.info(f"✓ Servidor de APIs local en {self.url} ({self.total_fixtures()} fixtures)")
+        return self
+    
+    def detener(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+    
+    def __enter__(self):
+        return self.iniciar()
+    
+    def __exit__(self, *exc):
+        self.detener()
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.puerto}"
+    
+    @property
+    def url_api_sports(self) -> str:
+        return f"{self.url}/api_sports"
+    
+    @property
+    def url_thesportsdb(self) -> str:
+        return f"{self.url}/thesportsdb"
+    
+    def config_api(self, config=API_CONFIG):
+        """Copia de APIConfig apuntando a este servidor"""
+        return replace(config, api_sports_base_url=self.url_api_sports, thesportsdb_base_url=self.url_thesportsdb)
+    
+    def recargar(self):
+        """Lee (o vuelve a leer) las fixtures del directorio"""
+        fixtures = {fuente: [] for fuente in FUENTES}
+        for fuente in FUENTES:
+            for ruta_fichero in sorted((self.directorio / fuente).glob('*.json')):
+                try:
+                    fixtures[fuente].append(Fixture(fuente, json.loads(ruta_fichero.read_text()), ruta_fichero))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"⚠️ Fixture ignorada {ruta_fichero.name}: {e}")
+        self.fixtures = fixtures
+    
+    def total_fixtures(self) -> int:
+        return sum(len(lista) for lista in self.fixtures.values())
+    
+    def buscar_fixture(self, fuente: str, ruta: str, query: Dict[str, str]) -> Optional[Fixture]:
+        candidatas = [f for f in self.fixtures.get(fuente, []) if f.encaja(ruta, query)]
+        return max(candidatas, key=lambda f: len(f.query)) if candidatas else None
+    
+    def reiniciar_secuencias(self):
+        for lista in self.fixtures.values():
+            for fixture in lista:
+                fixture.reiniciar()
+    
+    def configurar(self, **opciones):
+        """Cambia la inyección de fallos en caliente (latencia, prob_429, caidas...)"""
+        with self._lock:
+            for nombre, valor in opciones.items():
+                if nombre == 'caidas':
+                    valor = {c for c in (valor.split(',') if isinstance(valor, str) else valor) if c}
+                elif nombre in ('latencia', 'jitter', 'prob_429', 'prob_error'):
+                    valor = float(valor)
+                elif nombre in ('limite_dia', 'limite_minuto', 'usadas_dia'):
+                    valor = int(valor)
+                    if nombre == 'usadas_dia':
+                        nombre = '_usadas_dia'
+                else:
+                    raise ValueError(f"Opción desconocida: {nombre}")
+                setattr(self, nombre, valor)
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            por_ruta = {ruta: dict(codigos) for ruta, codigos in self._contadores.items()}
+        por_estado: Dict[str, int] = {}
+        for codigos in por_ruta.values():
+            for codigo, n in codigos.items():
+                por_estado[codigo] = por_estado.get(codigo, 0) + n
+        return {
+            'peticiones': sum(por_estado.values()),
+            'por_estado': por_estado,
+            'por_ruta': por_ruta,
+            'usadas_dia': self._usadas_dia,
+        }
+    
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self._contadores.clear()
+            self._usadas_dia = 0
+            self._ultimo_minuto.clear()
+    
+    def responder(self, ruta_completa: str, cabeceras: Dict[str, str]) -> Tuple[int, Dict[str, str], Any]:
+        """(código, cabeceras, cuerpo JSON) de una petición GET"""
+        partes = urlsplit(ruta_completa)
+        query = dict(parse_qsl(partes.query))
+        fuente, _, ruta = partes.path.lstrip('/').partition('/')
+        
+        if fuente == '_estadisticas':
+            return 200, {}, self.estadisticas()
+        if fuente == '_control':
+            try:
+                self.configurar(**query)
+            except ValueError as e:
+                return 400, {}, {'error': str(e)}
+            return 200, {}, {'latencia': self.latencia, 'prob_429': self.prob_429,
+                             'prob_error': self.prob_error, 'caidas': sorted(self.caidas)}
+        if fuente not in FUENTES:
+            return 404, {}, {'error': f"Fuente desconocida: {fuente}"}
+        
+        self._esperar()
+        
+        if self._caida(fuente, ruta):
+            return self._contar(fuente, ruta, 503, {}, {'error': 'Servicio no disponible (caída simulada)'})
+        if self._random.random() < self.prob_error:
+            return self._contar(fuente, ruta, 500, {}, {'error': 'Error interno (simulado)'})
+        
+        cabeceras_cuota = {}
+        if fuente == 'api_sports':
+            if ruta == 'status':
+                return self._contar(fuente, ruta, 200, {}, self._cuerpo_status())
+            
+            codigo, cabeceras_cuota, cuerpo = self._consumir_cuota()
+            if codigo is not None:
+                return self._contar(fuente, ruta, codigo, cabeceras_cuota, cuerpo)
+        
+        fixture = self.buscar_fixture(fuente, ruta, query)
+        if fixture is None and self.grabar:
+            fixture = self._grabar(fuente, ruta, query, cabeceras)
+        if fixture is None:
+            return self._contar(fuente, ruta, 404, cabeceras_cuota, {'error': f"Sin fixture para {fuente}/{ruta} {query}"})
+        
+        return self._contar(fuente, ruta, fixture.estado, cabeceras_cuota, fixture.cuerpo())
+    
+    def _esperar(self):
+        espera = self.latencia + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if espera > 0:
+            time.sleep(espera)
+    
+    def _caida(self, fuente: str, ruta: str) -> bool:
+        completa = f"{fuente}/{ruta}"
+        return any(c == '*' or completa.startswith(c) for c in self.caidas)
+    
+    def _consumir_cuota(self) -> Tuple[Optional[int], Dict[str, str], Any]:
+        """Cuota de API-Sports: (código si se rechaza, cabeceras, cuerpo)"""
+        with self._lock:
+            ahora = time.monotonic()
+            self._ultimo_minuto = [t for t in self._ultimo_minuto if ahora - t < 60]
+            
+            if len(self._ultimo_minuto) >= self.limite_minuto or self._random.random() < self.prob_429:
+                cabeceras = self._cabeceras_cuota()
+                return 429, cabeceras, {'message': 'Too many requests'}
+            
+            if self._usadas_dia >= self.limite_dia:
+                cabeceras = self._cabeceras_cuota()
+                cuerpo = {'errors': {'requests': 'You have reached the request limit for the day'}, 'response': []}
+                return 200, cabeceras, cuerpo
+            
+            self._usadas_dia += 1
+            self._ultimo_minuto.append(ahora)
+            return None, self._cabeceras_cuota(), None
+    
+    def _cabeceras_cuota(self) -> Dict[str, str]:
+        return {
+            'x-ratelimit-requests-limit': str(self.limite_dia),
+            'x-ratelimit-requests-remaining': str(max(self.limite_dia - self._usadas_dia, 0)),
+            'X-RateLimit-Limit': str(self.limite_minuto),
+            'X-RateLimit-Remaining': str(max(self.limite_minuto - len(self._ultimo_minuto), 0)),
+        }
+    
+    def _cuerpo_status(self) -> Dict[str, Any]:
+        return {
+            'get': 'status',
+            'errors': [],
+            'results': 1,
+            'response': {
+                'account': {'firstname': 'Local', 'lastname': 'Stand-in'},
+                'subscription': {'plan': 'Free', 'active': True},
+                'requests': {'current': self._usadas_dia, 'limit_day': self.limite_dia},
+            },
+        }
+    
+    def _contar(self, fuente: str, ruta: str, codigo: int, cabeceras: Dict[str, str], cuerpo: Any):
+        with self._lock:
+            codigos = self._contadores.setdefault(f"{fuente}/{ruta}", {})
+            codigos[str(codigo)] = codigos.get(str(codigo), 0) + 1
+        return codigo, cabeceras, cuerpo
+    
+    def _grabar(self, fuente: str, ruta: str, query: Dict[str, str], cabeceras: Dict[str, str]) -> Optional[Fixture]:
+        """Pide la respuesta al origen real y la guarda como fixture"""
+        reenviar = {k: v for k, v in cabeceras.items() if k.lower() in CABECERAS_REENVIO}
+        try:
+            response = requests.get(f"{ORIGENES[fuente]}/{ruta}", params=query, headers=reenviar,
+                                    timeout=API_CONFIG.timeout)
+            response.raise_for_status()
+            cuerpo = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"✗ Error grabando {fuente}/{ruta}: {e}")
+            return None
+        
+        datos = {'ruta': f"/{ruta}", 'query': query, 'estado': 200, 'cuerpo': cuerpo}
+        ruta_fichero = self.directorio / fuente / nombre_fixture(ruta, query)
+        ruta_fichero.parent.mkdir(parents=True, exist_ok=True)
+        ruta_fichero.write_text(json.dumps(datos, indent=2, ensure_ascii=False))
+        logger.info(f"💾 Grabada {ruta_fichero.relative_to(self.directorio)}")
+        
+        fixture = Fixture(fuente, datos, ruta_fichero)
+        self.fixtures[fuente].append(fixture)
+        return fixture
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    """Adapta las peticiones HTTP a ServidorAPI.responder"""
+    
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        servidor: ServidorAPI = self.server.servidor_api
+        codigo, cabeceras, cuerpo = servidor.responder(self.path, dict(self.headers))
+        
+        contenido = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(contenido)))
+        for nombre, valor in cabeceras.items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(contenido)
+    
+    def log_message(self, formato, *args):
+        logger.debug(f"{self.address_string()} {formato % args}")
@@ -0,0 +1,57 @@
+"""
+Datos sintéticos compartidos por los tests
+"""
+
+import numpy as np
+import pandas as pd
+
+EQUIPOS = ['Real Madrid', 'Barcelona', 'Sevilla', 'Getafe', 'Celta', 'Girona', 'Betis']
+
+
+def partidos_fixture(n: int = 120, semilla: int = 7) -> pd.DataFrame:
+    """Partidos aleatorios en orden cronológico (equipos con distinto número de partidos)"""
+    rng = np.random.default_rng(semilla)
+    filas = []
+    for i in range(n):
+        local, visitante = rng.choice(EQUIPOS, 2, replace=False)
+        goles_local, goles_visitante = (int(g) for g in rng.integers(0, 4, 2))
+        filas.append({
+            'Date': pd.Timestamp('2023-08-01') + pd.Timedelta(days=i),
+            'Local': local,
+            'Visitante': visitante,
+            'Goles_Local': goles_local,
+            'Goles_Visitante': goles_visitante,
+            'Resultado': 'H' if goles_local > goles_visitante else 'A' if goles_visitante > goles_local else 'D',
+        })
+    return pd.DataFrame(filas)
+
+
+def partidos_crudos(n: int = 20000, columnas_extra: int = 120, semilla: int = 5) -> pd.DataFrame:
+    """
+    Partidos en formato football-data.co.uk (como varios CSV concatenados)
+    
+    Incluye `columnas_extra` columnas de casas de apuestas sin usar, cada
+    una en su propio bloque, como la tabla global real (tabla ancha y
+    fragmentada).
+    """
+    rng = np.random.default_rng(semilla)
+    partidos = partidos_fixture(n, semilla)
+    
+    basicas = pd.DataFrame({
+        'Div': 'SP1',
+        'Date': partidos['Date'].dt.strftime('%d/%m/%Y'),
+        'HomeTeam': partidos['Local'],
+        'AwayTeam': partidos['Visitante'],
+        'FTHG': partidos['Goles_Local'],
+        'FTAG': partidos['Goles_Visitante'],
+        'FTR': partidos['Resultado'],
+        'B365H': np.round(1.2 + rng.random(n) * 3, 2),
+        'B365D': np.round(2.8 + rng.random(n), 2),
+        'B365A': np.round(1.5 + rng.random(n) * 5, 2),
+        'Temporada': np.where(partidos['Date'] < pd.Timestamp('2024-07-01'), '2023-24', '2024-25'),
+    })
+    extra = [
+        pd.DataFrame({f'Casa{i}': np.round(1 + rng.random(n) * 4, 2)})
+        for i in range(columnas_extra)
+    ]
+    return pd.concat([basicas] + extra, axis=1)
@@ -0,0 +1,81 @@
+"""
+Caché de respuestas: tipo de endpoint y datos en juego sin caché
+"""
+
+import pytest
+from dataclasses import replace
+
+from src.config import API_CONFIG
+from src.data.cache_api import CacheRespuestas, clase_endpoint, clave_cache
+
+
+@pytest.mark.parametrize('endpoint, params, clase', [
+    ('/fixtures', {'league': 140, 'season': 2024}, 'partidos'),
+    ('/fixtures', None, 'partidos'),
+    ('/fixtures', {'live': 'all'}, 'en_vivo'),
+    ('/fixtures', {'live': '140-39'}, 'en_vivo'),
+    ('/fixtures/statistics', {'fixture': 1}, 'en_vivo'),
+    ('/fixtures/events', {'fixture': 1}, 'en_vivo'),
+    ('/teams/statistics', {'team': 1}, 'equipos'),
+    ('/standings', {'league': 140}, 'clasificacion'),
+    ('/status', None, 'sin_cache'),
+    ('/odds', {'fixture': 1}, 'cuotas'),
+    ('/odds', {'league': 140, 'date': '2026-10-18'}, 'cuotas'),
+    ('/odds/live', {'fixture': 1}, 'en_vivo'),
+    ('/predictions', {'fixture': 1}, 'otros'),
+    ('eventspastleague.php?id=4335', None, 'partidos'),
+    ('lookupteam.php?id=1', None, 'equipos'),
+])
+def test_clase_endpoint(endpoint, params, clase):
+    assert clase_endpoint(endpoint, params) == clase
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheRespuestas(replace(API_CONFIG, cache_habilitada=True), ruta=tmp_path / 'cache.sqlite')
+
+
+def test_en_vivo_sin_cache_ni_caducadas(cache):
+    """Los datos en juego se piden siempre, aunque haya una respuesta guardada"""
+    for endpoint, params in (('/fixtures', {'live': 'all'}), ('/fixtures/statistics', {'fixture': 1})):
+        assert cache.ttl(endpoint, params) == 0
+        
+        clave = clave_cache(API_CONFIG.api_sports_base_url, endpoint, params)
+        cache.guardar(clave, {'response': ['antigua']})
+        respuestas = iter([{'response': ['nueva']}, None])
+        
+        assert cache.obtener_o_pedir(clave, cache.ttl(endpoint, params), lambda: next(respuestas)) == {'response': ['nueva']}
+        assert cache.obtener_o_pedir(clave, cache.ttl(endpoint, params), lambda: next(respuestas)) is None
+
+
+def test_calendario_sigue_en_cache(cache):
+    params = {'league': 140, 'season': 2024}
+    clave = clave_cache(API_CONFIG.api_sports_base_url, '/fixtures', params)
+    llamadas = []
+    
+    def pedir():
+        llamadas.append(1)
+        return {'response': []}
+    
+    for _ in range(3):
+        cache.obtener_o_pedir(clave, cache.ttl('/fixtures', params), pedir)
+    
+    assert cache.ttl('/fixtures', params) == API_CONFIG.cache_ttl['partidos']
+    assert len(llamadas) == 1
+
+
+def test_cuotas_en_cache(cache):
+    """get_cuotas repetido dentro del TTL no vuelve a gastar cuota"""
+    params = {'fixture': 1208345}
+    clave = clave_cache(API_CONFIG.api_sports_base_url, '/odds', params)
+    llamadas = []
+    
+    def pedir():
+        llamadas.append(1)
+        return {'response': []}
+    
+    for _ in range(3):
+        cache.obtener_o_pedir(clave, cache.ttl('/odds', params), pedir)
+    
+    assert 0 < cache.ttl('/odds', params) <= 5 * 60
+    assert len(llamadas) == 1
@@ -0,0 +1,116 @@
+"""
+Cortacircuitos: la prueba semiabierta se libera aunque la petición no termine
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from dataclasses import replace
+
+from src.config import API_CONFIG
+from src.data.async_api import AsyncAPIClient
+from src.data.circuito_api import CERRADO, SEMIABIERTO
+
+EVENTO = {
+    'idEvent': '1', 'dateEvent': '2026-10-18', 'strTime': '18:30:00',
+    'strHomeTeam': 'Sevilla', 'strAwayTeam': 'Real Madrid',
+}
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Circuitos y presupuesto propios del test (se comparten por URL y clave)"""
+    return replace(
+        API_CONFIG,
+        api_sports_key=f'test-{tmp_path.name}',
+        api_sports_base_url=f'https://api-sports.test/{tmp_path.name}',
+        thesportsdb_base_url=f'https://thesportsdb.test/{tmp_path.name}',
+        cache_habilitada=False,
+        cache_path=tmp_path / 'cache.sqlite',
+        circuito_enfriamiento=0.0,
+        max_retries=1,
+    )
+
+
+def transporte(api_sports):
+    """API-Sports responde con api_sports(); TheSportsDB, con un partido al instante"""
+    async def responder(peticion: httpx.Request) -> httpx.Response:
+        if peticion.url.host == 'api-sports.test':
+            return await api_sports()
+        return httpx.Response(200, json={'events': [EVENTO]})
+    return httpx.MockTransport(responder)
+
+
+def semiabierto(cliente):
+    """Abre el circuito de /fixtures; con enfriamiento 0 la siguiente petición es la prueba"""
+    circuito = cliente.circuitos_api_sports['/fixtures']
+    for _ in range(cliente.config.circuito_umbral_fallos):
+        circuito.registrar(False)
+    return circuito
+
+
+async def lenta():
+    await asyncio.sleep(5)
+    return httpx.Response(200, json={'response': []})
+
+
+async def json_invalido():
+    return httpx.Response(200, content=b'<html>')
+
+
+def test_prueba_cancelada_por_la_cobertura(config):
+    async def ejecutar():
+        async with AsyncAPIClient(config, transport=transporte(lenta)) as cliente:
+            circuito = semiabierto(cliente)
+            partidos = await cliente.get_proximos_partidos(cobertura=0.01)
+            await asyncio.sleep(0)  # Deja terminar la cancelación de API-Sports
+            return circuito, partidos
+    
+    circuito, partidos = asyncio.run(ejecutar())
+    
+    assert [p['fuente'] for p in partidos] == ['thesportsdb']
+    assert circuito.estado == SEMIABIERTO
+    assert not circuito._prueba_en_curso
+    assert circuito.permitir()
+    assert circuito.rechazadas == 0
+
+
+def test_prueba_con_excepcion_no_http(config):
+    """Una respuesta que no es JSON (ValueError) tampoco deja la prueba retenida"""
+    async def ejecutar():
+        async with AsyncAPIClient(replace(config, use_fallback=False), transport=transporte(json_invalido)) as cliente:
+            circuito = semiabierto(cliente)
+            partidos = await cliente.get_proximos_partidos()
+            return circuito, partidos
+    
+    circuito, partidos = asyncio.run(ejecutar())
+    
+    assert partidos == []
+    assert not circuito._prueba_en_curso
+    assert circuito.permitir()
+
+
+def test_circuito_se_cierra_tras_la_cancelacion(config):
+    """La siguiente petición hace de prueba y, si va bien, cierra el circuito"""
+    respuestas = [lenta]
+    
+    async def rapida():
+        return httpx.Response(200, json={'response': []})
+    
+    async def api_sports():
+        return await respuestas.pop(0)()
+    
+    async def ejecutar():
+        async with AsyncAPIClient(config, transport=transporte(api_sports)) as cliente:
+            circuito = semiabierto(cliente)
+            await cliente.get_proximos_partidos(cobertura=0.01)
+            await asyncio.sleep(0)
+            respuestas.append(rapida)
+            await cliente.get_proximos_partidos(cobertura=0.01)
+            return circuito
+    
+    circuito = asyncio.run(ejecutar())
+    
+    assert circuito.estado == CERRADO
+    assert circuito.rechazadas == 0
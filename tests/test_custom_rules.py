@@ -0,0 +1,27 @@
+"""
+Reglas personalizadas: la regla por IDs necesita Local_ID/Visitante_ID
+"""
+
+import pandas as pd
+
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.rules.custom_rules import crear_reglas_personalizadas
+
+
+def regla(nombre):
+    return next(r for r in crear_reglas_personalizadas() if r.nombre == nombre)
+
+
+def test_equipos_grandes_dispara_con_ids():
+    """Con los nombres de football-data (alias incluidos) y IDs añadidos, dispara en los partidos de grandes"""
+    df = pd.DataFrame({
+        'Local': ['Real Madrid CF', 'Getafe', 'Alaves', 'Ath Bilbao'],
+        'Visitante': ['Getafe', 'Barcelona', 'Osasuna', 'Celta'],
+    })
+    gol_2h = regla('Gol_2H_Equipos_Grandes')
+    
+    assert not gol_2h.evaluar_mascara(df).any()
+    
+    df = REGISTRO_EQUIPOS.añadir_ids(df)
+    assert gol_2h.evaluar_mascara(df).tolist() == [True, True, False, False]
+    assert gol_2h.evaluar(df.iloc[0])
@@ -0,0 +1,109 @@
+"""
+DSL de condiciones: datos ausentes y paridad vectorizado / escalar
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rules.dsl import Condicion, ErrorDSL, compilar
+from src.rules.laliga_rules import crear_reglas_laliga
+
+# Filas con A y B nulos, ausentes o con valor; 'Equipo' también con nulos
+PARTIDOS = pd.DataFrame({
+    'A': [1.0, 2.0, np.nan, 1.0, np.nan, 3.0],
+    'B': [1.0, np.nan, 1.0, 2.0, np.nan, 0.0],
+    'Equipo': ['Barcelona', None, 'Sevilla', np.nan, 'Betis', 'Girona'],
+    'N': pd.array([1, None, 2, 3, None, 1], dtype='Int64'),
+})
+
+EXPRESIONES = [
+    'A != 1',
+    'A != B',
+    '1 != A',
+    'A + B != 3',
+    '~(A < 2)',
+    'not A == 1',
+    '~(A > 1 | B > 1)',
+    '~(A > 1) & B == 1',
+    '~~(A == 1)',
+    "Equipo != 'Barcelona'",
+    "Equipo not in ('Barcelona', 'Sevilla')",
+    "~(Equipo in ('Barcelona',))",
+    'N != 1',
+    '~(N >= 2)',
+    'Z != 1',
+    '~(Z > 1)',
+    "Z not in ('x',)",
+    'A != 1 | Z != 1',
+]
+
+
+def escalar(condicion: Condicion, df: pd.DataFrame, como_dict: bool) -> np.ndarray:
+    filas = df.to_dict('records') if como_dict else [fila for _, fila in df.iterrows()]
+    return np.array([condicion(fila) for fila in filas], dtype=bool)
+
+
+@pytest.mark.parametrize('expresion', [e for e in EXPRESIONES if compilar(e).arbol[0] != 'or'])
+def test_falsa_sin_datos(expresion):
+    """Ninguna fila con un operando nulo o ausente dispara (también != y negaciones)"""
+    condicion = compilar(expresion)
+    
+    if condicion.columnas - set(PARTIDOS.columns):
+        sin_datos = np.ones(len(PARTIDOS), dtype=bool)
+    else:
+        sin_datos = PARTIDOS[sorted(condicion.columnas)].isna().any(axis=1).to_numpy()
+    
+    assert not condicion.mascara(PARTIDOS)[sin_datos].any()
+
+
+@pytest.mark.parametrize('expresion', EXPRESIONES)
+def test_paridad_vectorizado_escalar(expresion):
+    condicion = compilar(expresion)
+    mascara = condicion.mascara(PARTIDOS)
+    
+    np.testing.assert_array_equal(escalar(condicion, PARTIDOS, como_dict=True), mascara)
+    np.testing.assert_array_equal(escalar(condicion, PARTIDOS, como_dict=False), mascara)
+
+
+def test_ejemplos_revisados():
+    assert not Condicion('B != 1')({})
+    assert not Condicion('A != 1')({'A': np.nan})
+    assert not Condicion('A != 1')({'A': None})
+    assert Condicion('A != 1')({'A': 2})
+    assert not Condicion("Local not in ('Barcelona',)")({})
+    assert Condicion("Local not in ('Barcelona',)")({'Local': 'Sevilla'})
+    assert not Condicion('B != 1').mascara(pd.DataFrame({'A': [1, 2]})).any()
+
+
+def test_valores_conocidos_sin_cambios():
+    """Con todos los datos presentes, != y ~ conservan su significado habitual"""
+    df = pd.DataFrame({'A': [1.0, 2.0, 3.0], 'B': [1.0, 1.0, 3.0]})
+    np.testing.assert_array_equal(compilar('A != B').mascara(df), [False, True, False])
+    np.testing.assert_array_equal(compilar('~(A >= 2)').mascara(df), [True, False, False])
+    np.testing.assert_array_equal(compilar('A not in (1, 3)').mascara(df), [False, True, False])
+
+
+def test_reglas_pre_partido_no_disparan_sin_features():
+    """Partido de un equipo sin historial (features NaN) y sin cuotas: ninguna regla dispara"""
+    reglas = crear_reglas_laliga()
+    columnas = set().union(*(r.condicion.columnas for r in reglas if isinstance(r.condicion, Condicion)))
+    partido = pd.DataFrame({columna: [np.nan] for columna in columnas})
+    
+    for regla in reglas:
+        assert not regla.evaluar_mascara(partido).any(), regla.nombre
+        assert not regla.evaluar(partido.iloc[0]), regla.nombre
+
+
+def test_nombres_no_ascii():
+    """Columnas y parámetros con letras no ASCII (Año, Campeón...)"""
+    df = pd.DataFrame({'Año': [2019, 2021, 2023], 'Campeón': ['Betis', 'Atlético', 'Betis']})
+    
+    condicion = compilar("Año >= {año_min} & Campeón == 'Betis'")
+    
+    assert condicion.columnas == {'Año', 'Campeón'}
+    np.testing.assert_array_equal(condicion.mascara(df, año_min=2020), [False, False, True])
+    assert condicion({'Año': 2023, 'Campeón': 'Betis'}, año_min=2020)
+    
+    with pytest.raises(ErrorDSL):
+        compilar('2Año > 1')
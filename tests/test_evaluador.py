@@ -0,0 +1,103 @@
+"""
+EvaluadorReglas frente al bucle partido → regla de los monitores
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.feature_engineering import FeatureEngineer
+from src.rules.base import Regla
+from src.rules.evaluador import EvaluadorReglas, filas_disparo, tabla_partidos
+from src.rules.laliga_rules import crear_reglas_laliga
+from tests.datos import partidos_fixture
+
+CUOTA_POR_APUESTA = {'Local': 'Cuota_Local', 'Visitante': 'Cuota_Visitante', 'BTTS': 'Cuota_BTTS'}
+
+
+@pytest.fixture(scope='module')
+def partidos():
+    """Partidos con features, cuotas (parte NaN) y sin columna Cuota_BTTS"""
+    df = FeatureEngineer().generar_todas_features(partidos_fixture(300, semilla=13))
+    rng = np.random.default_rng(17)
+    df['Cuota_Local'] = np.round(1.1 + rng.random(len(df)) * 2.5, 2)
+    df['Cuota_Visitante'] = np.round(1.3 + rng.random(len(df)) * 4, 2)
+    df.loc[rng.random(len(df)) < 0.2, 'Cuota_Local'] = np.nan
+    return df
+
+
+@pytest.fixture(scope='module')
+def reglas():
+    """Reglas de LaLiga más una con condición función (sin máscara vectorizada)"""
+    funcion = Regla(
+        'Funcion_Empate_Previo', '', lambda p: p['Local_Forma_L5'] == p['Visitante_Forma_L5'], 'Empate', 0.3
+    )
+    return crear_reglas_laliga() + [funcion]
+
+
+def disparos_bucle(df, reglas):
+    """Referencia: el bucle original de los monitores (partido → regla, Regla.evaluar por fila)"""
+    return [
+        (fila, indice)
+        for fila, (_, partido) in enumerate(df.iterrows())
+        for indice, regla in enumerate(reglas)
+        if regla.evaluar(partido)
+    ]
+
+
+def test_disparos_igual_que_bucle(partidos, reglas):
+    evaluador = EvaluadorReglas(reglas)
+    
+    disparos = evaluador.disparos(partidos)
+    
+    esperado = disparos_bucle(partidos, reglas)
+    assert len(esperado) > 0
+    assert list(zip(disparos['fila'], disparos['indice_regla'])) == esperado
+    assert disparos['regla'].tolist() == [reglas[i].nombre for _, i in esperado]
+    assert disparos['tipo_apuesta'].tolist() == [reglas[i].tipo_apuesta for _, i in esperado]
+    assert disparos['confianza'].tolist() == [reglas[i].confianza_esperada for _, i in esperado]
+
+
+def test_disparos_sin_partidos_o_sin_reglas(partidos, reglas):
+    vacio = EvaluadorReglas(reglas).disparos(partidos.iloc[:0])
+    assert len(vacio) == 0
+    assert list(vacio.columns) == ['fila', 'indice_regla', 'regla', 'tipo_apuesta', 'confianza']
+    assert len(EvaluadorReglas([]).disparos(partidos)) == 0
+
+
+def test_cuotas_por_tipo_de_apuesta(partidos, reglas):
+    evaluador = EvaluadorReglas(reglas)
+    disparos = evaluador.disparos(partidos)
+    
+    cuotas = evaluador.cuotas(partidos, disparos, CUOTA_POR_APUESTA, defecto=1.5)
+    
+    for fila, tipo, cuota in zip(disparos['fila'], disparos['tipo_apuesta'], cuotas):
+        columna = CUOTA_POR_APUESTA.get(tipo)
+        if columna in partidos.columns:
+            np.testing.assert_equal(cuota, partidos[columna].iloc[fila])
+        else:
+            # Sin columna (Cuota_BTTS) o tipo sin cuota (Over, Empate)
+            assert cuota == 1.5
+    assert set(disparos['tipo_apuesta']) >= {'Local', 'Visitante', 'BTTS', 'Over'}
+
+
+def test_cuotas_sin_disparos(partidos):
+    vacio = EvaluadorReglas([]).disparos(partidos)
+    assert EvaluadorReglas.cuotas(partidos, vacio, CUOTA_POR_APUESTA).shape == (0,)
+
+
+def test_tabla_y_filas_de_disparo():
+    partidos = [{'local': 'Betis', 'cuota': 1.8}, {'local': 'Girona'}]
+    df = tabla_partidos(partidos, {'local': ('Local', ''), 'cuota': ('Cuota_Local', 999)})
+    
+    assert df.to_dict('records') == [
+        {'Local': 'Betis', 'Cuota_Local': 1.8},
+        {'Local': 'Girona', 'Cuota_Local': 999},
+    ]
+    
+    disparos = pd.DataFrame({'fila': [1, 1, 0]})
+    assert filas_disparo(df, disparos) == [
+        {'Local': 'Girona', 'Cuota_Local': 999},
+        {'Local': 'Girona', 'Cuota_Local': 999},
+        {'Local': 'Betis', 'Cuota_Local': 1.8},
+    ]
@@ -0,0 +1,115 @@
+"""
+Equivalencia de las features vectorizadas (TablaEquipos) con el bucle
+original partido a partido
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+from pandas.testing import assert_frame_equal
+
+from src.config import FEATURE_CONFIG
+from src.data.feature_engineering import FeatureEngineer, TablaEquipos
+from tests.datos import EQUIPOS, partidos_fixture
+
+COLUMNAS_FEATURES = [
+    'Local_Forma_L5', 'Visitante_Forma_L5',
+    'Local_Victorias_L3', 'Local_Derrotas_L3', 'Visitante_Victorias_L3', 'Visitante_Derrotas_L3',
+    'Local_Goles_Prom_L5', 'Visitante_Goles_Prom_L5',
+    'Local_BTTS_L4', 'Visitante_BTTS_L4',
+]
+
+
+def features_bucle(df: pd.DataFrame, config=FEATURE_CONFIG) -> pd.DataFrame:
+    """
+    Referencia: bucle por equipo y partido
+    
+    Forma y promedio de goles siguen el bucle original de FeatureEngineer
+    (historial por equipo, asignado ANTES de añadir el partido actual);
+    rachas y BTTS cuentan del mismo modo sobre los últimos N partidos.
+    """
+    salida = {columna: [0.0] * len(df) for columna in COLUMNAS_FEATURES}
+    historial = {equipo: [] for equipo in set(df['Local']) | set(df['Visitante'])}
+    
+    for i, partido in enumerate(df.itertuples(index=False)):
+        btts = int(partido.Goles_Local > 0 and partido.Goles_Visitante > 0)
+        for lado, equipo, marcados, propio, rival in (
+            ('Local', partido.Local, partido.Goles_Local, 'H', 'A'),
+            ('Visitante', partido.Visitante, partido.Goles_Visitante, 'A', 'H'),
+        ):
+            previos = historial[equipo]
+            
+            puntos = [p['puntos'] for p in previos]
+            if len(puntos) >= config.forma_window:
+                forma = sum(puntos[-config.forma_window:])
+            elif len(puntos) > 0:
+                forma = sum(puntos) / len(puntos) * config.forma_window
+            else:
+                forma = 0
+            
+            goles = [p['goles'] for p in previos]
+            if len(goles) >= config.goles_window:
+                promedio = np.mean(goles[-config.goles_window:])
+            elif len(goles) > 0:
+                promedio = np.mean(goles)
+            else:
+                promedio = 0.0
+            
+            racha = previos[-config.racha_window:] if config.racha_window else []
+            ultimos_btts = previos[-config.btts_window:] if config.btts_window else []
+            
+            salida[f'{lado}_Forma_L5'][i] = forma
+            salida[f'{lado}_Goles_Prom_L5'][i] = promedio
+            salida[f'{lado}_Victorias_L3'][i] = sum(p['resultado'] == 'V' for p in racha)
+            salida[f'{lado}_Derrotas_L3'][i] = sum(p['resultado'] == 'D' for p in racha)
+            salida[f'{lado}_BTTS_L4'][i] = sum(p['btts'] for p in ultimos_btts)
+            
+            previos.append({
+                'puntos': 3 if partido.Resultado == propio else 1 if partido.Resultado == 'D' else 0,
+                'goles': marcados,
+                'resultado': 'V' if partido.Resultado == propio else 'D' if partido.Resultado == rival else 'E',
+                'btts': btts,
+            })
+    
+    referencia = pd.DataFrame(salida, index=df.index)
+    enteras = [c for c in COLUMNAS_FEATURES if 'Victorias' in c or 'Derrotas' in c or 'BTTS' in c]
+    return referencia.astype({c: np.int64 if c in enteras else float for c in COLUMNAS_FEATURES})
+
+
+@pytest.mark.parametrize('ventanas', [
+    {},
+    {'forma_window': 1, 'racha_window': 1, 'goles_window': 1, 'btts_window': 1},
+    {'forma_window': 7, 'racha_window': 5, 'goles_window': 3, 'btts_window': 6},
+])
+def test_features_vectorizadas_igual_que_bucle(ventanas):
+    config = replace(FEATURE_CONFIG, **ventanas)
+    df = partidos_fixture()
+    
+    vectorizadas = FeatureEngineer(config).generar_todas_features(df)
+    
+    assert_frame_equal(vectorizadas[COLUMNAS_FEATURES], features_bucle(df, config))
+
+
+def test_generar_todas_features_no_modifica_entrada():
+    df = partidos_fixture(30)
+    columnas = list(df.columns)
+    
+    FeatureEngineer().generar_todas_features(df)
+    
+    assert list(df.columns) == columnas
+
+
+def test_tabla_equipos_agrupa_por_id_si_existe():
+    """Con Local_ID/Visitante_ID, dos alias del mismo club comparten historial"""
+    df = partidos_fixture(40)
+    alias = df.copy()
+    alias['Local'] = alias['Local'].replace('Real Madrid', 'Real Madrid CF')
+    alias['Local_ID'] = pd.factorize(pd.concat([df['Local'], df['Visitante']]))[0][:len(df)]
+    alias['Visitante_ID'] = pd.factorize(pd.concat([df['Local'], df['Visitante']]))[0][len(df):]
+    
+    por_nombre = FeatureEngineer().generar_todas_features(df)
+    por_id = FeatureEngineer().generar_todas_features(alias)
+    
+    assert_frame_equal(por_id[COLUMNAS_FEATURES], por_nombre[COLUMNAS_FEATURES])
+    assert len(TablaEquipos(alias).equipos) == len(EQUIPOS)
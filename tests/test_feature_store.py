@@ -0,0 +1,82 @@
+"""
+FeatureStore: actualización incremental frente a recálculo completo
+"""
+
+import json
+
+import numpy as np
+import pytest
+from dataclasses import replace
+from pandas.testing import assert_frame_equal
+
+from src.config import DATA_CONFIG
+from src.data.equipos import REGISTRO_EQUIPOS
+from src.data.feature_engineering import FeatureEngineer
+from src.data.feature_store import EstadoEquipos, FeatureStore, TablaEstadoEquipos, con_ids
+from tests.datos import partidos_fixture
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(replace(DATA_CONFIG, processed_dir=tmp_path), nombre="test_features")
+
+
+def recalculo_completo(df):
+    return FeatureEngineer().generar_todas_features(con_ids(df)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('corte', [1, 45, 119])
+def test_incremental_igual_que_recalculo_completo(store, corte):
+    df = partidos_fixture(120)
+    
+    store.actualizar(df.iloc[:corte])
+    incremental = store.actualizar(df)
+    
+    assert_frame_equal(incremental, recalculo_completo(df))
+    assert store.verificar(df)
+
+
+def test_incremental_en_varias_jornadas(store):
+    df = partidos_fixture(150)
+    
+    for corte in (30, 31, 90, 150):
+        resultado = store.actualizar(df.iloc[:corte])
+    
+    assert_frame_equal(resultado, recalculo_completo(df))
+
+
+def test_estado_por_id_une_alias(store):
+    """Dos nombres del mismo club comparten un único estado"""
+    df = partidos_fixture(120)
+    alias = df.copy()
+    alias.loc[alias.index % 2 == 0, 'Local'] = alias['Local'].replace('Real Madrid', 'Real Madrid CF')
+    
+    store.actualizar(alias.iloc[:60])
+    incremental = store.actualizar(alias)
+    
+    columnas = store.columnas_features()
+    assert_frame_equal(incremental[columnas], recalculo_completo(df)[columnas])
+    
+    estado = store.cargar_estado()
+    id_madrid = REGISTRO_EQUIPOS.id('Real Madrid')
+    assert id_madrid in estado.equipos
+    assert len(estado.equipos) == len(set(df['Local']) | set(df['Visitante']))
+    
+    tabla = TablaEstadoEquipos(estado)
+    esperado = EstadoEquipos.desde_historial(df).features_equipo(id_madrid)
+    assert tabla.equipo(id_madrid) == pytest.approx(esperado)
+
+
+def test_estado_por_nombre_se_reconstruye(store):
+    df = partidos_fixture(80)
+    store.actualizar(df)
+    
+    # Estado guardado con el formato anterior (claves por nombre)
+    datos = json.loads(store.estado_path.read_text(encoding='utf-8'))
+    datos.pop('clave_equipos')
+    datos['equipos'] = {REGISTRO_EQUIPOS.nombre(int(k)): v for k, v in datos['equipos'].items()}
+    store.estado_path.write_text(json.dumps(datos), encoding='utf-8')
+    
+    assert store.cargar_estado() is None
+    assert_frame_equal(store.actualizar(df), recalculo_completo(df))
+    assert np.all([isinstance(k, int) for k in store.cargar_estado().equipos])
@@ -0,0 +1,72 @@
+"""
+Pico de memoria (tracemalloc) del pipeline limpieza → features → split → backtest
+
+Cada paso comparte las columnas de la tabla anterior y añade arrays
+nuevos: ninguno debe copiar la tabla completa. Los umbrales son fracciones
+del tamaño de la tabla final; una copia completa (df.copy()) los supera.
+"""
+
+import tracemalloc
+import warnings
+
+import pandas as pd
+import pytest
+
+from src.backtest.engine import BacktestEngine
+from src.backtest.validation import DataValidator
+from src.data.cleaner import DataCleaner
+from src.data.feature_engineering import FeatureEngineer
+from src.rules.laliga_rules import crear_reglas_laliga
+from tests.datos import partidos_crudos
+
+# Pico máximo de cada paso / tamaño de la tabla con features
+MAX_RATIO = {
+    'limpieza': 1.0,
+    'features': 1.0,
+    'split': 0.1,
+    'backtest': 1.0,
+}
+
+
+def medir(funcion, *args, **kwargs):
+    """Ejecuta funcion y devuelve (resultado, pico de memoria en bytes)"""
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico
+
+
+@pytest.fixture(scope='module')
+def crudos():
+    return partidos_crudos()
+
+
+def test_pico_memoria_pipeline(crudos):
+    df_clean, pico_limpieza = medir(DataCleaner.limpiar, crudos)
+    df_features, pico_features = medir(FeatureEngineer().generar_todas_features, df_clean)
+    _, pico_split = medir(DataValidator().split_temporal, df_features)
+    _, pico_backtest = medir(
+        lambda: BacktestEngine(df_features, crear_reglas_laliga()).ejecutar(verbose=False, n_procesos=1)
+    )
+    
+    tamaño = df_features.memory_usage(deep=True).sum()
+    ratios = {
+        'limpieza': pico_limpieza / tamaño,
+        'features': pico_features / tamaño,
+        'split': pico_split / tamaño,
+        'backtest': pico_backtest / tamaño,
+    }
+    
+    excedidos = {paso: round(ratio, 2) for paso, ratio in ratios.items() if ratio > MAX_RATIO[paso]}
+    assert not excedidos, f"Pico por encima del umbral: {excedidos}"
+
+
+def test_sin_fragmentacion(crudos):
+    """Las columnas nuevas se añaden de una vez: sin PerformanceWarning en tablas anchas"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', pd.errors.PerformanceWarning)
+        df_clean = DataCleaner.limpiar(crudos)
+        FeatureEngineer().generar_todas_features(df_clean)
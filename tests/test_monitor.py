@@ -0,0 +1,200 @@
+"""
+AlertMonitor: features del estado por equipo, cuotas 1X2 y reglas con cuota
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+from pandas.testing import assert_frame_equal
+
+from src.alerts.monitor import AlertMonitor, preparar_partidos, reglas_con_cuotas
+from src.config import ALERT_CONFIG, DATA_CONFIG
+from src.data.api_sports import APISportsClient
+from src.data.feature_engineering import FeatureEngineer
+from src.data.feature_store import FeatureStore, TablaEstadoEquipos, con_ids
+from src.data.unified_api import UnifiedAPIClient
+from src.rules.laliga_rules import crear_reglas_laliga
+from tests.datos import partidos_fixture
+
+# Jornada siguiente al historial: cada equipo juega una vez
+JORNADA = [('Real Madrid', 'Sevilla'), ('Barcelona', 'Getafe'), ('Celta', 'Girona')]
+
+
+@pytest.fixture(scope='module')
+def historial():
+    return partidos_fixture(400)
+
+
+@pytest.fixture(scope='module')
+def tabla(historial, tmp_path_factory):
+    store = FeatureStore(replace(DATA_CONFIG, processed_dir=tmp_path_factory.mktemp('store')), nombre="test_features")
+    store.actualizar(historial)
+    return store.tabla_estado()
+
+
+def partido(local, visitante, **extra):
+    return {'id': f'{local}-{visitante}', 'fecha': '2025-03-01T18:00:00+00:00',
+            'local': local, 'visitante': visitante, 'fuente': 'api-sports', **extra}
+
+
+def test_preparar_partidos_igual_que_recalculo_completo(historial, tabla):
+    """Features de la jornada desde el estado = las del recálculo con la jornada añadida al historial"""
+    partidos = [partido(local, visitante) for local, visitante in JORNADA]
+    
+    jornada = pd.DataFrame({
+        'Date': historial['Date'].max() + pd.Timedelta(days=1),
+        'Local': [local for local, _ in JORNADA],
+        'Visitante': [visitante for _, visitante in JORNADA],
+        'Goles_Local': 0, 'Goles_Visitante': 0, 'Resultado': 'D',
+    })
+    completo = FeatureEngineer().generar_todas_features(con_ids(pd.concat([historial, jornada], ignore_index=True)))
+    columnas = [f'{lado}_{feature}' for lado in ('Local', 'Visitante') for feature in TablaEstadoEquipos.FEATURES]
+    
+    df = preparar_partidos(partidos, tabla)
+    
+    assert_frame_equal(
+        df[columnas],
+        completo[columnas].iloc[-len(JORNADA):].reset_index(drop=True).astype(float)
+    )
+    assert df['Local_ID'].tolist() == completo['Local_ID'].iloc[-len(JORNADA):].tolist()
+
+
+def test_preparar_partidos_alias_desconocidos_y_cuotas(tabla):
+    partidos = [
+        partido('Real Madrid CF', 'Sevilla FC', cuota_local=1.45, cuota_empate='4.2', cuota_visitante=6.0),
+        partido('Real Madrid', 'Equipo Ascendido'),
+    ]
+    
+    df = preparar_partidos(partidos, tabla)
+    
+    np.testing.assert_array_equal(df['Local_Forma_L5'].iloc[0], df['Local_Forma_L5'].iloc[1])
+    assert df.loc[1, ['Visitante_Forma_L5', 'Visitante_Derrotas_L3']].isna().all()
+    assert df.loc[0, ['Cuota_Local', 'Cuota_Empate', 'Cuota_Visitante']].tolist() == [1.45, 4.2, 6.0]
+    assert df.loc[1, ['Cuota_Local', 'Cuota_Empate', 'Cuota_Visitante', 'Cuota_BTTS']].isna().all()
+
+
+def test_reglas_con_cuotas():
+    reglas = [regla for regla in crear_reglas_laliga() if regla.activa]
+    
+    assert reglas_con_cuotas(reglas) == [
+        'Favorito_Local_Forma', 'Visitante_Invicto', 'Local_Dominante_Casa',
+        'Visitante_Racha_Victorias', 'Local_Invicto_Favorito',
+    ]
+
+
+def test_añadir_cuotas_una_peticion_por_dia(monkeypatch):
+    cliente = UnifiedAPIClient()
+    pedidos = []
+    
+    def cuotas_dia(fecha, prioridad):
+        pedidos.append(fecha)
+        return {1: {'cuota_local': 1.4, 'cuota_empate': 4.5, 'cuota_visitante': 7.0}, 3: {'cuota_local': 2.1}}
+    
+    monkeypatch.setattr(cliente.api_sports, 'get_cuotas_dia', cuotas_dia)
+    partidos = [
+        {'id': 1, 'fecha': '2025-10-25T14:00:00+00:00', 'fuente': 'api-sports'},
+        {'id': 2, 'fecha': '2025-10-25T19:00:00+00:00', 'fuente': 'api-sports'},
+        {'id': 3, 'fecha': '2025-10-26T13:00:00+00:00', 'fuente': 'api-sports'},
+        {'id': '1', 'fecha': '2025-10-26 13:00:00', 'fuente': 'thesportsdb'},
+    ]
+    
+    assert cliente.añadir_cuotas(partidos) == 2
+    assert pedidos == ['2025-10-25', '2025-10-26']
+    assert partidos[0]['cuota_visitante'] == 7.0
+    assert 'cuota_local' not in partidos[1]
+    assert partidos[2]['cuota_local'] == 2.1
+    assert 'cuota_local' not in partidos[3]
+
+
+def test_cuotas_dia_recorre_las_paginas(monkeypatch):
+    cliente = APISportsClient()
+    
+    def entrada(id_partido, local):
+        valores = [{'value': 'Home', 'odd': str(local)}, {'value': 'Draw', 'odd': '3.40'}, {'value': 'Away', 'odd': '4.00'}]
+        return {'fixture': {'id': id_partido}, 'bookmakers': [{'bets': [{'name': 'Match Winner', 'values': valores}]}]}
+    
+    paginas = {
+        1: {'paging': {'current': 1, 'total': 2}, 'response': [entrada(1, 1.5), {'fixture': {'id': 9}, 'bookmakers': []}]},
+        2: {'paging': {'current': 2, 'total': 2}, 'response': [entrada(2, 2.25)]},
+    }
+    peticiones = []
+    
+    def make_request(endpoint, params, prioridad):
+        peticiones.append(params)
+        return paginas[params.get('page', 1)]
+    
+    monkeypatch.setattr(cliente, '_make_request', make_request)
+    cuotas = cliente.get_cuotas_dia('2026-02-14')
+    
+    assert cuotas == {
+        1: {'cuota_local': 1.5, 'cuota_empate': 3.4, 'cuota_visitante': 4.0},
+        2: {'cuota_local': 2.25, 'cuota_empate': 3.4, 'cuota_visitante': 4.0},
+    }
+    assert peticiones[0] == {'league': 140, 'season': 2025, 'date': '2026-02-14'}
+    assert peticiones[1]['page'] == 2
+
+
+class ClienteFalso:
+    """Próximos partidos fijos; cuotas solo si se le dan"""
+    
+    def __init__(self, partidos, cuotas):
+        self.partidos = partidos
+        self.cuotas = cuotas
+    
+    def get_proximos_partidos(self, dias):
+        return [dict(p) for p in self.partidos]
+    
+    def añadir_cuotas(self, partidos):
+        for p in partidos:
+            p.update(self.cuotas.get(p['id'], {}))
+        return sum(p['id'] in self.cuotas for p in partidos)
+
+
+def test_monitor_dispara_reglas_con_cuota(historial, tmp_path):
+    """Con las cuotas de la API, las reglas que comparan cuotas disparan (sin ellas, nunca)"""
+    # Real Madrid llega con 5 victorias seguidas: Local_Derrotas_L3 == 0, forma 15
+    racha = pd.DataFrame({
+        'Date': historial['Date'].max() + pd.to_timedelta(range(1, 6), unit='D'),
+        'Local': 'Real Madrid', 'Visitante': ['Getafe', 'Celta', 'Girona', 'Betis', 'Sevilla'],
+        'Goles_Local': 2, 'Goles_Visitante': 0, 'Resultado': 'H',
+    })
+    store = FeatureStore(replace(DATA_CONFIG, processed_dir=tmp_path), nombre="test_features")
+    store.actualizar(pd.concat([historial, racha], ignore_index=True))
+    
+    config = replace(ALERT_CONFIG, registro_alertas_path=tmp_path / 'alertas.sqlite', min_confidence=1.1)
+    monitor = AlertMonitor(config, feature_store=store)
+    partidos = [partido('Real Madrid', 'Barcelona')]
+    
+    monitor.api_client = ClienteFalso(partidos, {})
+    assert not set(monitor.reglas_cuotas) & {a['regla'] for a in monitor.evaluar_proximos_partidos()}
+    
+    monitor.api_client = ClienteFalso(partidos, {partidos[0]['id']: {'cuota_local': 1.40, 'cuota_visitante': 8.0}})
+    disparadas = {a['regla'] for a in monitor.evaluar_proximos_partidos()}
+    assert {'Local_Invicto_Favorito', 'Favorito_Local_Forma', 'Local_Dominante_Casa'} <= disparadas
+
+
+def test_enhanced_monitor_dispara_reglas_pre_partido(historial, tmp_path):
+    """Las tres reglas pre-partido comparan cuotas: disparan con las cuotas de la API"""
+    from src.alerts.monitor_enhanced import EnhancedMonitor
+    
+    racha = pd.DataFrame({
+        'Date': historial['Date'].max() + pd.to_timedelta(range(1, 6), unit='D'),
+        'Local': 'Real Madrid', 'Visitante': ['Getafe', 'Celta', 'Girona', 'Betis', 'Sevilla'],
+        'Goles_Local': 2, 'Goles_Visitante': 0, 'Resultado': 'H',
+    })
+    store = FeatureStore(replace(DATA_CONFIG, processed_dir=tmp_path), nombre="test_features")
+    store.actualizar(pd.concat([historial, racha], ignore_index=True))
+    
+    config = replace(ALERT_CONFIG, registro_alertas_path=tmp_path / 'alertas.sqlite', email_enabled=False)
+    monitor = EnhancedMonitor(config, feature_store=store)
+    partidos = [partido('Real Madrid', 'Barcelona')]
+    assert monitor.reglas_pre_partido_cuotas == [r.nombre for r in monitor.reglas_pre_partido_activas]
+    
+    monitor.api_client = ClienteFalso(partidos, {})
+    assert monitor.evaluar_proximos_partidos() == []
+    
+    monitor.api_client = ClienteFalso(partidos, {partidos[0]['id']: {'cuota_local': 1.40, 'cuota_visitante': 8.0}})
+    alertas = monitor.evaluar_proximos_partidos()
+    assert {a['regla'] for a in alertas} == {'Local_Invicto_Favorito', 'Favorito_Local_Forma'}
+    assert {a['cuota'] for a in alertas} == {1.40}
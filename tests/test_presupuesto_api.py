@@ -0,0 +1,140 @@
+"""
+Presupuesto de API-Sports: cubo por minuto, reservas por prioridad,
+cabeceras y cambio de día UTC
+"""
+
+from datetime import date, timedelta
+
+import httpx
+import pytest
+from dataclasses import replace
+
+from src.config import API_CONFIG
+from src.data import presupuesto_api
+from src.data.presupuesto_api import ALTA, BAJA, MEDIA, PresupuestoAPI
+
+
+class Reloj:
+    """Reloj manual; time.sleep del módulo lo avanza"""
+    
+    def __init__(self):
+        self.ahora = 1000.0
+        self.esperas = []
+    
+    def __call__(self):
+        return self.ahora
+    
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(presupuesto_api.time, 'sleep', reloj.dormir)
+    return reloj
+
+
+@pytest.fixture
+def presupuesto(reloj):
+    """10 por minuto y 100 al día; reservas ALTA 0, MEDIA 10 %, BAJA 30 %"""
+    config = replace(
+        API_CONFIG,
+        api_sports_limite_dia=100,
+        api_sports_limite_minuto=10,
+        presupuesto_reservas={ALTA: 0.0, MEDIA: 0.1, BAJA: 0.3},
+    )
+    return PresupuestoAPI(config, reloj=reloj)
+
+
+def consumidas(presupuesto, prioridad, intentos=20):
+    return sum(presupuesto.consumir(prioridad) for _ in range(intentos))
+
+
+def test_baja_rechazada_dentro_de_la_reserva_por_minuto(presupuesto):
+    # BAJA deja 3 tokens (30 %), MEDIA 1 (10 %), ALTA gasta el último
+    assert consumidas(presupuesto, BAJA) == 7
+    assert consumidas(presupuesto, MEDIA) == 2
+    assert presupuesto.disponible(ALTA)
+    assert presupuesto.consumir(ALTA)
+    assert presupuesto.rechazadas[BAJA] == 13
+    assert presupuesto.rechazadas[MEDIA] == 18
+    assert presupuesto.estado()['restantes_dia'] == 90
+
+
+def test_baja_rechazada_dentro_de_la_reserva_diaria(presupuesto):
+    presupuesto.sincronizar_estado(usadas=70, limite_dia=100)
+    
+    assert not presupuesto.consumir(BAJA)
+    assert presupuesto.consumir(MEDIA)
+    
+    presupuesto.sincronizar_estado(usadas=90, limite_dia=100)
+    assert not presupuesto.consumir(MEDIA)
+    assert presupuesto.consumir(ALTA)
+
+
+def test_cubo_se_rellena_con_el_tiempo(presupuesto, reloj):
+    assert consumidas(presupuesto, MEDIA) == 9
+    assert not presupuesto.disponible(MEDIA)
+    
+    reloj.ahora += 6  # 10 por minuto: un token cada 6 s
+    assert presupuesto.consumir(MEDIA)
+    assert not presupuesto.consumir(MEDIA)
+
+
+def test_alta_espera_al_relleno(presupuesto, reloj):
+    presupuesto.agotar()
+    
+    assert not presupuesto.consumir(MEDIA)
+    assert reloj.esperas == []
+    
+    assert presupuesto.consumir(ALTA)
+    assert reloj.esperas == [pytest.approx(6.0)]
+    assert presupuesto.rechazadas[ALTA] == 0
+
+
+def test_agotar_diaria_hasta_el_cambio_de_dia_utc(presupuesto, monkeypatch):
+    hoy = date(2026, 10, 18)
+    monkeypatch.setattr(PresupuestoAPI, '_hoy', staticmethod(lambda: hoy))
+    presupuesto.sincronizar_estado(usadas=0, limite_dia=100)
+    
+    presupuesto.agotar(diaria=True)
+    
+    for prioridad in (ALTA, MEDIA, BAJA):
+        assert not presupuesto.consumir(prioridad)
+    assert presupuesto.estado()['restantes_dia'] == 0
+    
+    hoy = hoy + timedelta(days=1)
+    assert presupuesto.estado()['restantes_dia'] == 100
+    assert presupuesto.consumir(ALTA)
+
+
+def test_sincronizar_cabeceras(presupuesto):
+    cabeceras = httpx.Headers({
+        'x-ratelimit-requests-limit': '7500',
+        'x-ratelimit-requests-remaining': '7000',
+        'x-ratelimit-limit': '300',
+        'x-ratelimit-remaining': '2',
+    })
+    
+    presupuesto.sincronizar_cabeceras(cabeceras)
+    
+    assert presupuesto.estado() == {
+        'limite_diario': 7500,
+        'restantes_dia': 7000,
+        'limite_minuto': 300,
+        'restantes_minuto': 2,
+        'rechazadas': {ALTA: 0, MEDIA: 0, BAJA: 0},
+    }
+    # 2 tokens < 1 + 30 % de 300: la BAJA espera a que se rellene
+    assert not presupuesto.consumir(BAJA)
+
+
+def test_cabeceras_ausentes_o_invalidas_no_cambian_nada(presupuesto):
+    antes = presupuesto.estado()
+    
+    presupuesto.sincronizar_cabeceras({})
+    presupuesto.sincronizar_cabeceras({'x-ratelimit-requests-remaining': 'n/a', 'X-RateLimit-Limit': ''})
+    
+    assert presupuesto.estado() == antes
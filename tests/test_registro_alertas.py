@@ -0,0 +1,61 @@
+"""
+Registro de alertas: la clave del partido no depende de la fuente
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.alerts.registro_alertas import RegistroAlertas, clave_alerta
+from src.data.unified_api import UnifiedAPIClient
+
+FIXTURE_API_SPORTS = {
+    'fixture': {'id': 1208345, 'date': '2026-10-18T19:00:00+00:00', 'venue': {'name': 'Metropolitano'},
+                'status': {'long': 'Not Started'}},
+    'teams': {'home': {'id': 530, 'name': 'Atletico Madrid'}, 'away': {'id': 529, 'name': 'Barcelona'}},
+}
+EVENTO_THESPORTSDB = {
+    'idEvent': '2152761', 'dateEvent': '2026-10-18', 'strTime': '19:00:00',
+    'strHomeTeam': 'Atlético Madrid', 'strAwayTeam': 'FC Barcelona', 'idHomeTeam': '133729', 'idAwayTeam': '133739',
+}
+
+
+@pytest.fixture
+def registro(tmp_path):
+    return RegistroAlertas(ruta=tmp_path / 'alertas.sqlite')
+
+
+def test_misma_clave_con_otra_fuente(registro):
+    """Un ciclo servido por API-Sports y el siguiente por TheSportsDB: no se reenvía"""
+    api_sports, = UnifiedAPIClient._normalizar_partidos_api_sports([FIXTURE_API_SPORTS])
+    thesportsdb, = UnifiedAPIClient._normalizar_partidos_thesportsdb([EVENTO_THESPORTSDB])
+    assert api_sports['id'] != thesportsdb['id']
+    
+    clave = clave_alerta(api_sports, 'Local_Invicto_Favorito', 'Local')
+    assert not registro.ya_enviada(clave)
+    registro.registrar(clave)
+    
+    assert clave_alerta(thesportsdb, 'Local_Invicto_Favorito', 'Local') == clave
+    assert registro.ya_enviada(clave_alerta(thesportsdb, 'Local_Invicto_Favorito', 'Local'))
+    
+    # Alerta reconstruida por un monitor (sin fuente, fecha como datetime)
+    monitor = {'id': thesportsdb['id'], 'local': 'Atlético Madrid', 'visitante': 'Barcelona',
+               'fecha': datetime(2026, 10, 18, 19, 0)}
+    assert clave_alerta(monitor, 'Local_Invicto_Favorito', 'Local') == clave
+
+
+def test_claves_distintas():
+    partido = {'id': 1, 'local': 'Atletico Madrid', 'visitante': 'Barcelona', 'fecha': '2026-10-18T19:00:00+00:00'}
+    clave = clave_alerta(partido, 'Regla', 'Local')
+    
+    assert clave_alerta({**partido, 'fecha': '2027-03-07T19:00:00+00:00'}, 'Regla', 'Local') != clave
+    assert clave_alerta({**partido, 'local': 'Barcelona', 'visitante': 'Atletico Madrid'}, 'Regla', 'Local') != clave
+    assert clave_alerta(partido, 'Regla', 'Visitante') != clave
+    assert clave_alerta(partido, 'Otra', 'Local') != clave
+
+
+def test_sin_equipos_usa_id_con_fuente():
+    partido = {'id': 77, 'fuente': 'api-sports', 'local': None, 'visitante': None, 'fecha': None}
+    
+    assert clave_alerta(partido, 'Regla', 'Local') == 'api-sports:77|Regla|Local'
+    assert clave_alerta({**partido, 'fuente': 'thesportsdb'}, 'Regla', 'Local') != clave_alerta(partido, 'Regla', 'Local')
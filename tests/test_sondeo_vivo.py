@@ -0,0 +1,299 @@
+"""
+SondeoDescanso: descansos de la secuencia grabada 1H → HT → 2H, intervalos,
+ventanas del calendario de partidos y cuotas 1X2
+"""
+
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from src.alerts.sondeo_vivo import SondeoDescanso, normalizar_en_vivo
+from src.config import ALERT_CONFIG
+from src.data.api_sports import APISportsClient
+from src.utils.servidor_api import DIRECTORIO_FIXTURES
+
+INICIO = datetime(2025, 10, 25, 14, 0, tzinfo=timezone.utc)
+
+# Tres partidos: 1H (25', 38', 45'), HT, HT, 2H
+SECUENCIA = [
+    paso['response']
+    for paso in json.loads((DIRECTORIO_FIXTURES / 'api_sports' / 'fixtures__live-all.json').read_text())['secuencia']
+]
+IDS = {partido['fixture']['id'] for partido in SECUENCIA[0]}
+
+
+class Reloj:
+    """Reloj del proceso y hora UTC que solo avanzan con avanzar()"""
+    
+    def __init__(self, ahora=INICIO - timedelta(hours=3)):
+        self.segundos = 0.0
+        self.fecha = ahora
+    
+    def __call__(self):
+        return self.segundos
+    
+    def utc(self):
+        return self.fecha
+    
+    def avanzar(self, segundos):
+        self.segundos += segundos
+        self.fecha += timedelta(seconds=segundos)
+
+
+class ClienteFalso:
+    """Partidos en directo fijos, calendario fijo (None: la petición falla); cuenta las peticiones"""
+    
+    def __init__(self, en_vivo=(), calendario=(INICIO,), cuotas=()):
+        self.en_vivo = list(en_vivo)
+        self.calendario = calendario
+        self.cuotas = list(cuotas)  # Respuestas de get_cuotas en orden; después, vacías
+        self.peticiones = []
+    
+    def get_partidos_en_vivo(self, ligas=None, prioridad=None):
+        self.peticiones.append(('en_vivo', ligas))
+        return self.en_vivo
+    
+    def get_calendario(self, ligas, dias=2, prioridad=None):
+        self.peticiones.append(('calendario', ligas))
+        return None if self.calendario is None else list(self.calendario)
+    
+    def get_cuotas(self, fixture_id, prioridad=None):
+        self.peticiones.append(('cuotas', fixture_id))
+        return self.cuotas.pop(0) if self.cuotas else {}
+    
+    def contar(self, tipo):
+        return sum(1 for peticion in self.peticiones if peticion[0] == tipo)
+
+
+class MonitorFalso:
+    def __init__(self):
+        self.partidos = []
+    
+    def procesar_partidos_medio_tiempo(self, partidos):
+        self.partidos.extend(partidos)
+        return []
+
+
+def en_vivo(id_partido, estado='1H', minuto=10):
+    return {
+        'fixture': {'id': id_partido, 'date': INICIO.isoformat(), 'status': {'short': estado, 'elapsed': minuto}},
+        'league': {'id': 140},
+        'teams': {'home': {'name': 'Real Madrid'}, 'away': {'name': 'Sevilla'}},
+        'goals': {'home': 0, 'away': 0},
+        'score': {'halftime': {'home': None, 'away': None}},
+    }
+
+
+def sondeo(cliente, reloj, **config):
+    return SondeoDescanso(MonitorFalso(), cliente, replace(ALERT_CONFIG, **config), reloj=reloj, ahora=reloj.utc)
+
+
+def recorrer(s, pasos):
+    """Un sondeo por paso; devuelve los intervalos resultantes"""
+    intervalos = []
+    for paso in pasos:
+        s.cliente.en_vivo = paso
+        s.sondear()
+        intervalos.append(s.intervalo_actual)
+    return intervalos
+
+
+def test_descanso_dispara_una_vez():
+    s = sondeo(ClienteFalso(), Reloj(INICIO))
+    
+    recorrer(s, SECUENCIA[:3])
+    assert s.monitor.partidos == []
+    
+    recorrer(s, SECUENCIA[3:])
+    assert [partido['id'] for partido in s.monitor.partidos] == [1208301, 1208302, 1208303]
+    assert [(partido['ht_home'], partido['ht_away']) for partido in s.monitor.partidos] == [(1, 0), (2, 1), (0, 0)]
+    assert all(partido['estado'] == 'HT' for partido in s.monitor.partidos)
+    assert len(s.descansos) == 3
+    assert s.disparados == IDS
+
+
+def test_descanso_visto_ya_en_ht():
+    s = sondeo(ClienteFalso(), Reloj(INICIO))
+    
+    recorrer(s, SECUENCIA[3:4])
+    assert {partido['id'] for partido in s.monitor.partidos} == IDS
+    
+    recorrer(s, SECUENCIA[4:])
+    assert len(s.monitor.partidos) == 3
+
+
+def test_partidos_terminados_se_olvidan():
+    s = sondeo(ClienteFalso(), Reloj(INICIO))
+    recorrer(s, SECUENCIA)
+    assert set(s.estados) == IDS
+    
+    # Los terminados (FT) ya no salen en live y se olvidan; si reaparecen, vuelven a disparar
+    recorrer(s, [SECUENCIA[-1][:1]])
+    assert set(s.estados) == {1208301}
+    assert s.disparados == {1208301}
+    
+    recorrer(s, [[]])
+    assert s.estados == {} and s.disparados == set() and s.cuotas == {}
+    
+    recorrer(s, SECUENCIA[3:4])
+    assert len(s.monitor.partidos) == 6
+
+
+def test_intervalos_de_la_secuencia():
+    s = sondeo(ClienteFalso(), Reloj(INICIO))
+    rapido, normal, reposo = (ALERT_CONFIG.sondeo_intervalo_rapido, ALERT_CONFIG.sondeo_intervalo_normal,
+                              ALERT_CONFIG.sondeo_intervalo_reposo)
+    
+    assert recorrer(s, SECUENCIA) == [normal, normal, rapido, reposo, reposo, reposo]
+
+
+def test_intervalo():
+    s = sondeo(ClienteFalso(), Reloj(INICIO), sondeo_intervalo_normal=300.0, sondeo_minuto_rapido=40)
+    
+    def partidos(*minutos, estado='1H'):
+        return [normalizar_en_vivo(en_vivo(i, estado, minuto)) for i, minuto in enumerate(minutos)]
+    
+    assert s.intervalo([]) == ALERT_CONFIG.sondeo_intervalo_reposo
+    assert s.intervalo(partidos(45, estado='HT')) == ALERT_CONFIG.sondeo_intervalo_reposo
+    assert s.intervalo(partidos(10)) == 300.0
+    assert s.intervalo(partidos(10, 38)) == 120.0  # Hasta el minuto rápido del más avanzado
+    assert s.intervalo(partidos(40)) == ALERT_CONFIG.sondeo_intervalo_rapido
+    assert s.intervalo(partidos(45)) == ALERT_CONFIG.sondeo_intervalo_rapido
+    
+    # Las primeras partes ya disparadas no aceleran el sondeo
+    s.disparados.add(0)
+    assert s.intervalo(partidos(42)) == ALERT_CONFIG.sondeo_intervalo_reposo
+
+
+def test_ligas_por_defecto_laliga():
+    assert ALERT_CONFIG.sondeo_ligas == [140]
+
+
+def test_fuera_de_ventana_no_sondea_y_espera_al_inicio():
+    reloj, cliente = Reloj(), ClienteFalso()
+    s = sondeo(cliente, reloj)
+    
+    s.sondear()
+    assert cliente.contar('en_vivo') == 0
+    assert s.sondeos == 0
+    assert s.intervalo_actual == 3 * 3600
+    
+    reloj.avanzar(s.intervalo_actual)
+    s.sondear()
+    assert cliente.peticiones[-1] == ('en_vivo', [140])
+    assert s.intervalo_actual == ALERT_CONFIG.sondeo_intervalo_reposo
+    
+    # Pasada la ventana sin partidos seguidos se vuelve a esperar
+    reloj.avanzar(ALERT_CONFIG.sondeo_ventana_minutos * 60)
+    s.sondear()
+    assert cliente.contar('en_vivo') == 1
+    assert cliente.contar('calendario') == 1
+
+
+def test_partido_seguido_se_sondea_fuera_de_ventana():
+    reloj = Reloj(INICIO)
+    cliente = ClienteFalso([en_vivo(1)])
+    s = sondeo(cliente, reloj)
+    
+    s.sondear()
+    reloj.avanzar(2 * 3600)  # Partido retrasado, aún en juego
+    s.sondear()
+    assert cliente.contar('en_vivo') == 2
+    
+    cliente.en_vivo = []
+    s.sondear()
+    s.sondear()
+    assert cliente.contar('en_vivo') == 3
+
+
+def test_sin_partidos_espera_hasta_releer_el_calendario():
+    reloj, cliente = Reloj(), ClienteFalso(calendario=[])
+    s = sondeo(cliente, reloj, sondeo_calendario_horas=6.0)
+    
+    s.sondear()
+    assert s.intervalo_actual == 6 * 3600
+    
+    reloj.avanzar(6 * 3600)
+    s.sondear()
+    assert cliente.contar('calendario') == 2
+    assert cliente.contar('en_vivo') == 0
+
+
+def test_sin_calendario_sondea_en_reposo():
+    reloj = Reloj()
+    cliente = ClienteFalso(calendario=None)
+    s = sondeo(cliente, reloj)
+    
+    s.sondear()
+    assert cliente.contar('en_vivo') == 1
+    assert s.intervalo_actual == ALERT_CONFIG.sondeo_intervalo_reposo
+    
+    # Todas las ligas: no hay calendario que leer
+    cliente = ClienteFalso()
+    s = sondeo(cliente, reloj, sondeo_ligas=None)
+    s.sondear()
+    assert cliente.peticiones == [('en_vivo', None)]
+
+
+def test_presupuesto_diario_de_una_jornada():
+    """Un sábado con tres partidos escalonados no se acerca al límite diario"""
+    inicios = [INICIO + timedelta(hours=h) for h in (0, 2.25, 4.5)]
+    reloj = Reloj(INICIO.replace(hour=0))
+    cliente = ClienteFalso(calendario=inicios)
+    s = sondeo(cliente, reloj)
+    
+    while reloj.utc() < INICIO.replace(hour=23, minute=59):
+        s.sondear()
+        reloj.avanzar(s.intervalo_actual)
+    
+    assert len(cliente.peticiones) < 25
+
+
+def test_cuotas_vacias_se_reintentan():
+    reloj = Reloj(INICIO)
+    cuotas = {'cuota_local': 1.8, 'cuota_empate': 3.6, 'cuota_visitante': 4.5}
+    cliente = ClienteFalso([en_vivo(1)], cuotas=[{}, cuotas])
+    s = sondeo(cliente, reloj)
+    
+    s.sondear()
+    assert 1 not in s.cuotas
+    s.sondear()
+    s.sondear()
+    assert cliente.contar('cuotas') == 2
+    
+    cliente.en_vivo = [en_vivo(1, 'HT', 45)]
+    s.sondear()
+    assert cliente.contar('cuotas') == 2
+    assert s.monitor.partidos[0]['cuota_local'] == 1.8
+
+
+def test_sin_cuotas_no_se_piden_tras_el_descanso():
+    reloj = Reloj(INICIO)
+    cliente = ClienteFalso([en_vivo(1, 'HT', 45)])
+    s = sondeo(cliente, reloj)
+    
+    s.sondear()
+    s.sondear()
+    assert cliente.contar('cuotas') == 1
+    assert 'cuota_local' not in s.monitor.partidos[0]
+
+
+def test_get_calendario(monkeypatch):
+    cliente = APISportsClient()
+    peticiones = []
+    
+    def make_request(endpoint, params, prioridad):
+        peticiones.append((endpoint, params))
+        fechas = {140: ['2025-10-25T19:00:00+00:00', '2025-10-25T14:00:00+00:00'], 39: ['2025-10-25T16:30:00']}
+        return {'response': [{'fixture': {'date': fecha}} for fecha in fechas[params['league']]]}
+    
+    monkeypatch.setattr(cliente, '_make_request', make_request)
+    inicios = cliente.get_calendario([140, 39])
+    
+    assert [inicio.hour for inicio in inicios] == [14, 16, 19]
+    assert all(inicio.tzinfo is not None for inicio in inicios)
+    assert [endpoint for endpoint, _ in peticiones] == ['/fixtures', '/fixtures']
+    assert set(peticiones[0][1]) == {'league', 'season', 'from', 'to'}
+    
+    monkeypatch.setattr(cliente, '_make_request', lambda endpoint, params, prioridad: None)
+    assert cliente.get_calendario([140]) is None
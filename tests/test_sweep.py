@@ -0,0 +1,57 @@
+"""
+Barrido de parámetros frente a BacktestEngine, con cuotas ausentes
+"""
+
+import numpy as np
+import pytest
+
+from src.backtest.engine import BacktestEngine
+from src.backtest.sweep import BarridoParametros
+from src.data.feature_engineering import FeatureEngineer
+from src.rules.base import Regla
+from tests.datos import partidos_fixture
+
+
+@pytest.fixture(scope='module')
+def partidos():
+    """Partidos con features y cuotas; parte de las cuotas son NaN (también en victorias)"""
+    df = FeatureEngineer().generar_todas_features(partidos_fixture(400, semilla=3))
+    rng = np.random.default_rng(11)
+    df['Cuota_Local'] = np.round(1.2 + rng.random(len(df)) * 2.5, 2)
+    df['Cuota_Visitante'] = np.round(1.5 + rng.random(len(df)) * 4, 2)
+    df.loc[rng.random(len(df)) < 0.15, 'Cuota_Local'] = np.nan
+    df.loc[rng.random(len(df)) < 0.15, 'Cuota_Visitante'] = np.nan
+    assert (df['Cuota_Local'].isna() & (df['Resultado'] == 'H')).any()
+    return df
+
+
+@pytest.mark.parametrize('plantilla, rangos, tipo_apuesta', [
+    ("Local_Forma_L5 >= {x}", {'x': range(0, 16)}, 'Local'),
+    ("Cuota_Local < {cuota_max} & Local_Forma_L5 >= {forma_min}",
+     {'cuota_max': [1.5, 2.0, 2.5, 4.0], 'forma_min': [0, 5, 9]}, 'Local'),
+    ("Visitante_Victorias_L3 >= {v} & Local_Derrotas_L3 >= {d}",
+     {'v': [0, 1, 2], 'd': [0, 1]}, 'Visitante'),
+])
+def test_barrido_igual_que_backtest(partidos, plantilla, rangos, tipo_apuesta):
+    tabla = BarridoParametros(partidos).ejecutar(plantilla, rangos, tipo_apuesta, min_disparos=1)
+    
+    assert len(tabla) > 0
+    assert np.isfinite(tabla[['roi', 'ganancia_total']].to_numpy()).all()
+    
+    for fila in tabla.itertuples(index=False):
+        asignacion = {p: getattr(fila, p) for p in rangos}
+        regla = Regla('barrido', '', plantilla.format(**asignacion), tipo_apuesta, 0.5)
+        resultado = BacktestEngine(partidos, [regla]).ejecutar(verbose=False, n_procesos=1)['barrido']
+        
+        assert fila.disparos == resultado['disparos'], asignacion
+        assert fila.aciertos == resultado['aciertos'], asignacion
+        assert fila.roi == pytest.approx(resultado['roi']), asignacion
+        assert fila.ganancia_total == pytest.approx(resultado['ganancia_total']), asignacion
+
+
+def test_backtest_no_apuesta_sin_cuota(partidos):
+    regla = Regla('todas', '', "Local_Forma_L5 >= 0", 'Local', 0.5)
+    resultado = BacktestEngine(partidos, [regla]).ejecutar(verbose=False, n_procesos=1)['todas']
+    
+    assert resultado['disparos'] == partidos['Cuota_Local'].notna().sum()
+    assert np.isfinite(resultado['roi'])